@@ -10,11 +10,11 @@ Refs:
 """
 
 # Import flask and template operators
-from flask import Flask, jsonify
+from flask import Flask, has_request_context
 from flask.globals import request
 
-# Import SQLAlchemy
-from flask_sqlalchemy import SQLAlchemy
+# Import SQLAlchemy (with read replicas routing)
+from app.services.replicas import RoutingSQLAlchemy
 
 # Define the WSGI application object
 app = Flask(__name__)
@@ -22,9 +22,25 @@ app = Flask(__name__)
 # Configurations
 app.config.from_object('config')
 
+# Import the JSON encoding
+from app.encoding import create_json_provider, jsonify
+# Setting up the JSON provider used to encode the responses (pretty printed in debug mode, like Flask's 'jsonify')
+app.extensions['json_provider'] = create_json_provider(
+    app.config['JSON_PROVIDER'], sort_keys=app.config['JSON_SORT_KEYS'],
+    indent=2 if app.debug or app.config['JSONIFY_PRETTYPRINT_REGULAR'] else None)
+# Setting up a compact one for the streamed exports, since NDJSON requires a value per line
+app.extensions['json_lines_provider'] = create_json_provider(
+    app.config['JSON_PROVIDER'], sort_keys=app.config['JSON_SORT_KEYS'])
+
+# Import the connection pool with checkout waits metrics
+from app.services.pool import TimedQueuePool, get_pool_stats
+# Using it when the connections are pooled (it's not the case of SQLite)
+if 'pool_size' in app.config['SQLALCHEMY_ENGINE_OPTIONS']:
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {**app.config['SQLALCHEMY_ENGINE_OPTIONS'], 'poolclass': TimedQueuePool}
+
 # Define the database object which is imported
 # by modules and controllers
-db = SQLAlchemy(app)
+db = RoutingSQLAlchemy(app)
 
 # Import Flask-Limiter
 from flask_limiter import Limiter
@@ -46,19 +62,37 @@ from flask_babel import Babel, _
 # Adding internationalization and location to app
 babel = Babel(app)
 # Selecting language according to Accept-Language header from the incoming request
+# Background tasks (outside of requests, like sending notifications) use the default language
 @babel.localeselector
 def get_locale():
+    if not has_request_context(): return None
     return request.accept_languages.best_match(app.config['LANGUAGES'].keys())
 
 # Import Socket.IO
 from flask_socketio import SocketIO, emit
 # Creating the Socket.IO server
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='eventlet')
+# With a message queue, emits are shared among all the processes, reaching the clients (and rooms) connected to any of them
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode='eventlet',
+                    message_queue=app.config['SOCKETIO_MESSAGE_QUEUE'], channel=app.config['SOCKETIO_CHANNEL'])
+
+# Import the events queue
+from app.services.events import EventQueue
+from app.services.metrics import register_metrics
+# Setting up the queue of Socket.IO events emitted by a background task, so requests aren't blocked by them
+events = EventQueue(app, socketio, interval=app.config['EVENTS_INTERVAL'])
+register_metrics('eventQueue', events.stats)
+
+# Middlewares
+from app.middleware import ensure_authenticated, get_socket_user_id
+# Socket.IO connection session
+from flask import session as socket_session
 
 # Defining Socket.IO listeners
 # Event listener when client connects to the server
+# Clients sending a valid token (on the auth data or the 'Authorization' header) can join their pools rooms
 @socketio.on("connect")
-def connected():
+def connected(auth=None):
+    socket_session['userId'] = get_socket_user_id(auth)
     print(f"New client has connected (SID: {request.sid})")
 
 # Event listener for when client sends generic data via 'event'
@@ -72,9 +106,6 @@ def handle_message(data):
 def disconnected():
     print(f"Client has disconnected (SID: {request.sid})")
 
-# Middlewares
-from app.middleware import ensure_authenticated
-
 # Setting up sample Socket.IO messages sending route
 @app.route('/send_socketio_message', methods=['POST'])
 @ensure_authenticated
@@ -117,8 +148,15 @@ def send_socketio_message():
         return jsonify({"data": {"message": _("Message sent successfully")},
                         "meta": {"success": True}})
 
-# Import services
-from app.services.push_notification import send_message, send_multicast_message
+# Import the push notifications dispatcher
+from app.services.push_notification import PushDispatcher, create_push_client
+from app.modules.users.models import User
+# Setting up the dispatcher, which sends the queued push notifications from background tasks, so requests only queue them
+push = PushDispatcher(app, socketio, create_push_client(app.config['PUSH_NOTIFICATION_DRIVER']),
+                      on_invalid_tokens=User.remove_fcm_tokens, workers=app.config['PUSH_WORKERS'],
+                      retries=app.config['PUSH_RETRIES'], backoff=app.config['PUSH_BACKOFF'],
+                      max_pending=app.config['PUSH_MAX_PENDING'])
+register_metrics('pushNotifications', push.stats)
 
 # Setting up sample push notification message sending route
 @app.route('/send_push_notification_message', methods=['POST'])
@@ -157,22 +195,31 @@ def send_push_notification_message():
                             "meta": {"success": False,
                                      "errors": error_messages}}), 400
 
-        # If everything is ok, we send the push notification message
+        # If everything is ok, we queue the push notification message (it's sent in background)
         try:
             # If it's a multicast
-            if data['should_multicast']: send_multicast_message(data['tokens'], data['title'], data['body'])
+            if data['should_multicast']: push.enqueue(data['tokens'], data['title'], data['body'])
             # If it's a message for a specific client
-            else: send_message(data['token'], data['title'], data['body'])
+            else: push.enqueue([data['token']], data['title'], data['body'])
 
             # Informing user about success
-            return jsonify({"data": {"message": _("Message sent successfully")},
-                            "meta": {"success": True}})
+            return jsonify({"data": {"message": _("Message queued successfully")},
+                            "meta": {"success": True}}), 202
         # If an error occurs
         except Exception as e:
             return jsonify({"data": [],
                             "meta": {"success": False,
                                      "errors": str(e)}}), 500
 
+# Import metrics
+from app.services.metrics import collect_metrics
+
+# Setting up the application metrics route (like caches hits and misses)
+@app.route('/metrics', methods=['GET'])
+@ensure_authenticated
+def get_metrics():
+    return jsonify({"metrics": collect_metrics()})
+
 # Sample HTTP error handling
 @app.errorhandler(404)
 def not_found(error):
@@ -187,18 +234,25 @@ def ratelimit_handler(e):
     return jsonify({"data": [],
             "meta": {"message": (_('Ratelimit exceeded'), f"{e.description}.")}}), 429
 
-# Engine and Session for executing queries with ORM
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session, sessionmaker
-from config import SQLALCHEMY_DATABASE_URI, DATABASE_CONNECT_OPTIONS
-engine = create_engine(SQLALCHEMY_DATABASE_URI, echo=True,
-                        future=True, connect_args=DATABASE_CONNECT_OPTIONS)
-# Defining a sessionmaker to use on modules routes
-AppSession = sessionmaker(engine)
+# Engine used by the database object, with a single connection pool per process
+engine = db.engine
+# Adding the connection pool usage to the metrics
+register_metrics('databasePool', lambda: get_pool_stats(engine))
+if db.replicas: register_metrics('databaseReplicasPools', lambda: [get_pool_stats(replica) for replica in db.replicas])
+
+# Import the request unit of work (a single session and transaction for each request)
+from app.unit_of_work import after_commit
+# Getting the request session to use on modules routes
+# It's committed once after the request, so it's neither committed nor closed when the block ends
+from contextlib import contextmanager
+@contextmanager
+def AppSession():
+    yield db.session
 
 # Import a module / component using its blueprint handler variable (mod_auth)
 from app.modules.users.controllers import *
 from app.modules.pools.controllers import *
+from app.modules.jobs.controllers import *
 
 # Register blueprint(s)
 # Users modules
@@ -208,7 +262,51 @@ app.register_blueprint(mod_user)
 app.register_blueprint(mod_pool)
 app.register_blueprint(mod_guess)
 app.register_blueprint(mod_game)
+# Jobs modules
+app.register_blueprint(mod_job)
+
+# Building the models serialization plans, now that all models are mapped
+from sqlalchemy.orm import configure_mappers
+from app.serializer import build_plans
+configure_mappers()
+build_plans(db.Model)
 
 # Build the database:
 # This will create the database file using SQLAlchemy or the selected SQL database/driver
 db.create_all()
+
+# Import the database migrations
+from app.migrations import upgrade_database
+import click
+# Setting up the command to upgrade an existing database (like adding the new indexes)
+@app.cli.command('upgrade-db')
+def upgrade_db():
+    upgrade_database(echo=click.echo)
+    click.echo("Database is up to date")
+
+# Import the games schedule import and the unit of work
+from app.modules.pools.games import import_games, iter_json_rows, iter_ndjson_rows, iter_csv_rows
+from app.unit_of_work import unit_of_work
+from app.services.response_cache import invalidate
+import json
+import os
+# Setting up the command to import a games schedule (like a whole tournament) from a JSON, NDJSON or CSV file
+@app.cli.command('import-games')
+@click.argument('file', type=click.Path(exists=True, dir_okay=False))
+def import_games_file(file):
+    extension = os.path.splitext(file)[1].lower()
+    if extension not in ('.json', '.ndjson', '.jsonl', '.csv'):
+        raise click.BadParameter("The schedule must be a .json, .ndjson or .csv file", param_hint='FILE')
+    # Importing every game on a single transaction
+    with open(file, encoding='utf-8-sig', newline='') as lines, unit_of_work() as session:
+        try:
+            if extension == '.json': rows = iter_json_rows(json.load(lines))
+            elif extension == '.csv': rows = iter_csv_rows(lines)
+            else: rows = iter_ndjson_rows(lines)
+        except ValueError as e: raise click.ClickException(str(e))
+        report = import_games(session, rows)
+        if report['created']: after_commit(invalidate, 'games')
+    # Showing the report
+    for error in report['errors']: click.echo(f"Row {error['row']}: {error['message']}")
+    click.echo(f"{report['rows']} rows: {report['created']} games created, {report['duplicates']} duplicates, "
+               f"{report['failed']} errors ({report['rowsPerSecond']} rows/s)")
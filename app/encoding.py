@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 11:02:38 2026
+
+@author: RenatoHenz
+
+Refs:
+    * Flask jsonify: https://flask.palletsprojects.com/en/2.0.x/api/#flask.json.jsonify
+    * orjson: https://github.com/ijl/orjson
+    * Flask JSONEncoder: https://flask.palletsprojects.com/en/2.0.x/api/#flask.json.JSONEncoder
+
+"""
+
+# Required modules
+from flask import current_app
+
+# Other dependencies
+from datetime import datetime, date
+from decimal import Decimal
+import dataclasses
+import json
+import logging
+import uuid
+
+# Logger of the JSON encoding (the application logger, when it's configured)
+logger = logging.getLogger(__name__)
+
+# Define a pre-encoded JSON value, which is spliced into the responses as it is
+# It allows cached sub-documents to be sent without being encoded again
+class Fragment():
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data if isinstance(data, bytes) else data.encode()
+
+    # Creating a fragment from a value, encoding it once with the application JSON provider
+    @classmethod
+    def encode(cls, obj):
+        return cls(current_app.extensions['json_provider'].dumps(obj))
+
+# Define a base JSON provider, which encodes the responses data
+class JSONProvider():
+    mimetype = 'application/json'
+
+    def __init__(self, sort_keys=True, indent=None):
+        self.sort_keys = sort_keys
+        self.indent = indent
+
+    # Function to convert the values which aren't natively supported by the encoder
+    # Besides the dates, the same values as Flask's encoder are supported (decimals as strings, so they're exact)
+    def default(self, obj):
+        if isinstance(obj, datetime): return obj.isoformat()
+        if isinstance(obj, date): return obj.strftime("%Y-%m-%d")
+        if isinstance(obj, (uuid.UUID, Decimal)): return str(obj)
+        if dataclasses.is_dataclass(obj) and not isinstance(obj, type): return dataclasses.asdict(obj)
+        if hasattr(obj, '__html__'): return str(obj.__html__())
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    # Encoding a value to bytes, splicing the fragments on it
+    def dumps(self, obj):
+        fragments = []
+        token = uuid.uuid4().hex
+        # Fragments are replaced by placeholders while encoding, and then by their data
+        def default(value):
+            if isinstance(value, Fragment):
+                fragments.append(value.data)
+                return f"__fragment_{token}_{len(fragments) - 1}__"
+            return self.default(value)
+        data = self._dumps(obj, default)
+        for i, fragment in enumerate(fragments):
+            data = data.replace(f'"__fragment_{token}_{i}__"'.encode(), fragment, 1)
+        return data
+
+    # Creating the response with the encoded data (same arguments as Flask's 'jsonify')
+    def response(self, *args, **kwargs):
+        if args and kwargs: raise TypeError("jsonify() behavior undefined when passed both args and kwargs")
+        obj = (args[0] if len(args) == 1 else list(args)) if args else kwargs
+        return current_app.response_class(self.dumps(obj) + b"\n", mimetype=self.mimetype)
+
+# Define a JSON provider using the standard library encoder
+class StdlibJSONProvider(JSONProvider):
+    def _dumps(self, obj, default):
+        return json.dumps(obj, default=default, sort_keys=self.sort_keys, indent=self.indent,
+                          separators=(',', ': ') if self.indent else (',', ':'),
+                          ensure_ascii=False).encode()
+
+# Define a JSON provider using orjson, which natively encodes datetimes (in ISO 8601) much faster
+class OrjsonProvider(JSONProvider):
+    def __init__(self, sort_keys=True, indent=None):
+        super().__init__(sort_keys, indent)
+        # orjson is only required when this provider is selected
+        import orjson
+        self._orjson = orjson
+        self._options = (orjson.OPT_SORT_KEYS if sort_keys else 0) | \
+            (orjson.OPT_INDENT_2 if indent else 0) | orjson.OPT_NON_STR_KEYS
+
+    def _dumps(self, obj, default):
+        return self._orjson.dumps(obj, default=default, option=self._options)
+
+# Function to create the JSON provider
+#   * 'fast' uses orjson (falling back to the standard library if it isn't installed)
+#   * 'default' uses the standard library encoder
+def create_json_provider(name, sort_keys=True, indent=None):
+    if name == 'fast':
+        try: return OrjsonProvider(sort_keys, indent)
+        except ImportError: logger.warning("orjson is not installed, using the default JSON provider")
+    elif name != 'default':
+        raise ValueError(f"Unsupported JSON provider: {name}")
+    return StdlibJSONProvider(sort_keys, indent)
+
+# Function to create a JSON response with the application JSON provider (replaces Flask's 'jsonify')
+def jsonify(*args, **kwargs):
+    return current_app.extensions['json_provider'].response(*args, **kwargs)
@@ -9,12 +9,59 @@ Created on Thu Aug 19 11:29:11 2021
 from functools import wraps
 
 # Required modules
-from flask import request, g, jsonify
+from flask import request, g
 from flask_babel import _
+from app.encoding import jsonify
+
+# SQLAlchemy events
+from sqlalchemy import event
+
+# Getting config data
+from config import CACHE_URL, USER_CACHE_SIZE, USER_CACHE_TTL
+
+# Import services
+from app.services.cache import create_cache
+from app.services.metrics import register_metrics
 
 # Import module models
 from app.modules.users.models import *
 
+# Cache for the authenticated users data, avoiding a database query on every request
+user_cache = create_cache(CACHE_URL, 'user', maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+register_metrics('userCache', user_cache.stats)
+
+# User columns kept on the cache
+CACHED_USER_COLUMNS = ('id', 'name', 'email', 'googleId', 'avatarUrl', 'fcmToken')
+
+# Define a lightweight user object, built from the cached data
+class CachedUser():
+    def __init__(self, data):
+        self.__dict__.update(data)
+
+    def __repr__(self):
+        return '<CachedUser %r>' % (self.id)
+
+# Function to get a user by its ID, looking for it on the cache first
+def get_authenticated_user(id):
+    data = user_cache.get(id)
+    # If user is not on the cache, we search for it on the database
+    if data is None:
+        user = User.query.filter_by(id=id).first()
+        if user is None: return None
+        data = {c: getattr(user, c) for c in CACHED_USER_COLUMNS}
+        user_cache.set(id, data)
+    return CachedUser(data)
+
+# Removing users from the cache when their changes (or deletion) are committed
+# Removing them on flush would let a concurrent request cache the old data again before the commit,
+# and would be useless if the transaction is rolled back
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def invalidate_cached_user(mapper, connection, target):
+    # The unit of work is imported here, since it's loaded after the middlewares by the main application module
+    from app.unit_of_work import after_commit
+    after_commit(user_cache.delete, target.id)
+
 # Middleware to get user data and check if it is authenticated
 def ensure_authenticated(func):
     @wraps(func)
@@ -27,8 +74,10 @@ def ensure_authenticated(func):
             # If token is not valid
             if type(res) is not str:
                 return jsonify({"message": _("Authentication failed. Please login to access the resource.")}), 401
+            # Keeping the user ID, so the database routing knows who is reading (see 'app.services.replicas')
+            g.userId = res
             # Searching user by ID
-            user = User.query.filter_by(id=res).first()
+            user = get_authenticated_user(res)
             # If no user is found
             if user is None:
                 return jsonify({"message": _("Authentication failed. Please login to access the resource.")}), 401
@@ -42,3 +91,16 @@ def ensure_authenticated(func):
         return func(*args, **kwargs)
 
     return auth_function
+
+# Function to get the authenticated user ID of a Socket.IO connection
+# The token can be sent on the connection auth data ({"token": ...}) or on the 'Authorization' header
+# Returns 'None' if no valid token was provided, or if it doesn't belong to an existing user
+def get_socket_user_id(auth=None):
+    token = auth.get('token') if isinstance(auth, dict) else None
+    if token is None:
+        header = request.headers.get('Authorization', '')
+        token = header.split("Bearer ")[1] if header.startswith("Bearer ") else None
+    if not token: return None
+    # Invalid and expired tokens are decoded to their error messages, which aren't users IDs
+    user = get_authenticated_user(User.decode_auth_token(token))
+    return user.id if user is not None else None
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 13:12:50 2026
+
+@author: RenatoHenz
+
+Refs:
+    * SQLAlchemy Reflection: https://docs.sqlalchemy.org/en/14/core/reflection.html
+    * SQLAlchemy Indexes: https://docs.sqlalchemy.org/en/14/core/constraints.html#indexes
+    * SQLAlchemy CreateColumn: https://docs.sqlalchemy.org/en/14/core/ddl.html#sqlalchemy.schema.CreateColumn
+
+"""
+
+# SQLAlchemy functions
+from sqlalchemy import inspect, func, select, update, delete, exists, text
+from sqlalchemy.dialects import mysql
+from sqlalchemy.schema import CreateColumn
+
+# Import the database object (db) from the main application module
+from app import db
+
+# Responses cache
+from app.services.response_cache import invalidate
+
+# Import module models and rankings
+from app.modules.pools.models import Participant, Guess, Ranking
+from app.modules.pools.ranking import update_pools_rankings, POOLS_BATCH_SIZE
+
+# Function to merge the participants duplicated on a pool (the same user joined it more than once)
+# The oldest participant is kept, receiving the guesses of the others
+# Returns the IDs of the kept participants
+def merge_duplicated_participants(session):
+    groups = session.query(Participant.poolId, Participant.userId).\
+        group_by(Participant.poolId, Participant.userId).\
+        having(func.count(Participant.id) > 1).all()
+    kept = []
+    for poolId, userId in groups:
+        ids = [id for (id,) in session.query(Participant.id).
+            filter(Participant.poolId == poolId, Participant.userId == userId).
+            order_by(Participant.createdAt, Participant.id)]
+        keptId, removedIds = ids[0], ids[1:]
+        session.execute(update(Guess.__table__).
+            where(Guess.__table__.c.participantId.in_(removedIds)).values(participantId=keptId))
+        session.execute(delete(Ranking.__table__).where(Ranking.__table__.c.participantId.in_(removedIds)))
+        session.execute(delete(Participant.__table__).where(Participant.__table__.c.id.in_(removedIds)))
+        kept.append(keptId)
+    return kept
+
+# Function to remove the guesses duplicated for a participant and game
+# The most recently updated guess is kept, since it's the one a user would have last sent
+# Returns the IDs of the participants whose guesses were removed
+def remove_duplicated_guesses(session):
+    groups = session.query(Guess.participantId, Guess.gameId).\
+        group_by(Guess.participantId, Guess.gameId).\
+        having(func.count(Guess.id) > 1).all()
+    for participantId, gameId in groups:
+        ids = [id for (id,) in session.query(Guess.id).
+            filter(Guess.participantId == participantId, Guess.gameId == gameId).
+            order_by(Guess.updatedAt.desc(), Guess.id.desc())]
+        session.execute(delete(Guess.__table__).where(Guess.__table__.c.id.in_(ids[1:])))
+    return [participantId for participantId, _ in groups]
+
+# Function to recalculate the participants scores from their guesses and update their pools rankings
+def recalculate_participants(session, participantIds):
+    if not participantIds: return
+    participant = Participant.__table__
+    guess = Guess.__table__
+    session.execute(update(participant).
+        where(participant.c.id.in_(participantIds)).
+        values(score=select(func.coalesce(func.sum(guess.c.score), 0)).
+            where(guess.c.participantId == participant.c.id).scalar_subquery()))
+    poolIds = [poolId for (poolId,) in session.query(Participant.poolId).
+        filter(Participant.id.in_(participantIds)).distinct()]
+    update_pools_rankings(session, poolIds)
+
+# Function to build the rankings of the pools with participants who aren't on them yet
+# (like pools created before rankings existed), so reading the rankings never writes anything
+# Returns the IDs of the pools
+def build_missing_rankings(session):
+    ranked = exists().where(Ranking.participantId == Participant.id)
+    poolIds = [poolId for (poolId,) in session.query(Participant.poolId).filter(~ranked).distinct()]
+    for i in range(0, len(poolIds), POOLS_BATCH_SIZE):
+        update_pools_rankings(session, poolIds[i:i + POOLS_BATCH_SIZE])
+    return poolIds
+
+# Function to add the columns missing on the existing tables (like the users locale)
+# Only nullable columns can be added, since the existing rows have no value for them
+# Returns the names of the added columns
+def add_missing_columns(inspector):
+    added = []
+    preparer = db.engine.dialect.identifier_preparer
+    for table in db.metadata.sorted_tables:
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing: continue
+            if not column.nullable: raise ValueError(f"Column {table.name}.{column.name} must be added manually")
+            db.session.execute(text(f"ALTER TABLE {preparer.format_table(table)} "
+                                    f"ADD {CreateColumn(column).compile(dialect=db.engine.dialect)}"))
+            added.append(f"{table.name}.{column.name}")
+    return added
+
+# Function to widen the MySQL 'TEXT' columns which are now 'LONGTEXT' (like the jobs payloads)
+# Returns the names of the widened columns
+def widen_long_text_columns(inspector):
+    if db.engine.dialect.name != 'mysql': return []
+    widened = []
+    for table in db.metadata.sorted_tables:
+        existing = {column['name']: column['type'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing or isinstance(existing[column.name], mysql.LONGTEXT): continue
+            if column.type.compile(dialect=db.engine.dialect) != 'LONGTEXT': continue
+            db.session.execute(text(f"ALTER TABLE `{table.name}` MODIFY `{column.name}` LONGTEXT "
+                                    f"{'NULL' if column.nullable else 'NOT NULL'}"))
+            widened.append(f"{table.name}.{column.name}")
+    return widened
+
+# Function to upgrade an existing database to the current models
+# Missing tables, indexes and rankings are created, and the rows which would break the unique indexes
+# (participants and guesses created by concurrent requests) are merged first
+# It can be run many times, since only what's missing is changed
+def upgrade_database(echo=print):
+    # Creating the missing tables (with their indexes)
+    db.create_all()
+
+    # Adding the new columns of the existing tables
+    inspector = inspect(db.engine)
+    for name in add_missing_columns(inspector): echo(f"Added column {name}")
+    db.session.commit()
+
+    # Merging the duplicated rows before creating the unique indexes
+    participantIds = set(merge_duplicated_participants(db.session))
+    participantIds.update(remove_duplicated_guesses(db.session))
+    recalculate_participants(db.session, list(participantIds))
+    db.session.commit()
+    if participantIds: echo(f"Merged duplicated rows of {len(participantIds)} participant(s)")
+
+    # Building the missing rankings (invalidating the cached responses which didn't have them)
+    built = build_missing_rankings(db.session)
+    db.session.commit()
+    if built:
+        invalidate(*(f'pool:{poolId}' for poolId in built))
+        echo(f"Built the rankings of {len(built)} pool(s)")
+
+    # Widening the text columns which might hold more than 64KB
+    inspector = inspect(db.engine)
+    for name in widen_long_text_columns(inspector): echo(f"Widened {name} to LONGTEXT")
+    db.session.commit()
+
+    # Creating the missing indexes on the existing tables
+    for table in db.metadata.sorted_tables:
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        existing.update(constraint['name'] for constraint in inspector.get_unique_constraints(table.name))
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            if index.name in existing: continue
+            index.create(db.engine)
+            echo(f"Created index {index.name} on {table.name}")
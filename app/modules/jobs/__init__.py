@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 23 09:12:05 2026
+
+@author: RenatoHenz
+"""
+
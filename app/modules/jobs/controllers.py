@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 23 10:26:48 2026
+
+@author: RenatoHenz
+"""
+
+# Import flask dependencies
+from flask import Blueprint, request, g, url_for
+from flask_babel import _
+from app.encoding import jsonify
+
+# Session maker to allow database communication
+from app import AppSession
+
+# Middlewares
+from app.middleware import ensure_authenticated
+
+# Import module models and runner
+from app.modules.jobs.models import Job
+from app.modules.jobs.runner import get_job_data, enqueue_job, IdempotencyKeyReused
+
+# Maximum length of the idempotency keys
+MAX_IDEMPOTENCY_KEY_LENGTH = 128
+
+# Define the blueprint: 'job', set its url prefix: app.url/jobs
+mod_job = Blueprint('job', __name__, url_prefix='/jobs')
+
+# Route to get a job status (and its result, once it's finished)
+# Users can only get the jobs they requested
+@mod_job.route('/<string:id>', methods=['GET'])
+@ensure_authenticated
+def get_job(id):
+    # Creating the session for database communication
+    with AppSession() as session:
+        job = session.query(Job).get(id)
+        if job is None or job.userId != g.user.id:
+            return jsonify({"message": _("Job not found")}), 404
+
+        # Returning obtained data
+        return jsonify({"job": get_job_data(job)}), 200
+
+# Function to queue the heavy work of a request as a job, answering it with '202 Accepted' and the job
+# (which can be followed on its 'Location'), along with any other given data
+# Requests sent again with the same 'Idempotency-Key' header get the job queued by the first one,
+# while different requests sent with it are rejected
+def respond_with_job(session, type, payload, **data):
+    key = request.headers.get('Idempotency-Key')
+    if key is not None and not 0 < len(key) <= MAX_IDEMPOTENCY_KEY_LENGTH:
+        return jsonify({"message": _("'Idempotency-Key' must have up to %(max)s characters.",
+                                     max=MAX_IDEMPOTENCY_KEY_LENGTH)}), 400
+    try: job = enqueue_job(session, type, payload, userId=g.user.id, idempotencyKey=key)[0]
+    except IdempotencyKeyReused:
+        return jsonify({"message": _("'Idempotency-Key' was already used for a different request.")}), 422
+    return jsonify({**data, "job": get_job_data(job)}), 202, {"Location": url_for('job.get_job', id=job.id)}
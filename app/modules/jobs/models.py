@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 23 09:14:37 2026
+
+@author: RenatoHenz
+"""
+
+# Import the database object (db) from the main application module
+from app import db
+
+# SQLAlchemy dialect types
+from sqlalchemy.dialects import mysql
+
+# Serializer for the models data
+from app.serializer import serialize
+
+# Other dependencies
+from datetime import datetime
+import cuid
+
+# Text of any size (MySQL 'TEXT' columns hold up to 64KB, which isn't enough for the payloads of big imports)
+LongText = db.Text().with_variant(mysql.LONGTEXT(), 'mysql')
+
+# Status of the jobs
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+# Define a base model for other database tables to inherit
+class Base(db.Model):
+    __abstract__ = True
+
+    # Defining base columns
+    createdAt = db.Column(db.DateTime, default=db.func.current_timestamp())
+    updatedAt = db.Column(db.DateTime, default=db.func.current_timestamp(),
+                                        onupdate=db.func.current_timestamp())
+
+    # Returning data as dict (see 'app.serializer' for the 'fields' and 'include' options)
+    def as_dict(self, fields=None, include=None):
+        return serialize(self, fields=fields, include=include)
+
+# Define a Job model using Base columns
+# Jobs are run by the worker ('worker.py') in the order they're due ('runAt'), with their payload and result as JSON
+class Job(Base):
+    __tablename__ = 'job'
+
+    id = db.Column(db.String(32), primary_key=True)
+
+    type = db.Column(db.String(64), nullable=False)
+    payload = db.Column(LongText, nullable=False)
+    status = db.Column(db.String(16), nullable=False, default=QUEUED)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    maxAttempts = db.Column(db.Integer, nullable=False)
+    runAt = db.Column(db.DateTime, nullable=False)
+    result = db.Column(LongText, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    # User who requested the job, and the key sent to avoid running the same request twice
+    # (hashed along with the user ID and the job type, see 'app.modules.jobs.runner.enqueue_job')
+    userId = db.Column(db.String(32), db.ForeignKey('user.id'), nullable=True)
+    idempotencyKey = db.Column(db.String(192), nullable=True, unique=True)
+    # Worker running the job, and since when
+    lockedBy = db.Column(db.String(64), nullable=True)
+    lockedAt = db.Column(db.DateTime, nullable=True)
+    finishedAt = db.Column(db.DateTime, nullable=True)
+
+    # Indexes
+    __table_args__ = (
+        # Finding the next due job (and the lost running ones)
+        db.Index('ix_job_status_runAt', 'status', 'runAt'),
+    )
+
+    # New instance instantiation procedure
+    def __init__(self, type, payload, maxAttempts, userId=None, idempotencyKey=None):
+        self.id = cuid.cuid()
+        self.type = type
+        self.payload = payload
+        self.status = QUEUED
+        self.attempts = 0
+        self.maxAttempts = maxAttempts
+        self.runAt = datetime.now()
+        self.userId = userId
+        self.idempotencyKey = idempotencyKey
+
+    def __repr__(self):
+        return '<Job %r>' % (self.id)
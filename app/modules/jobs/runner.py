@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 23 09:41:26 2026
+
+@author: RenatoHenz
+
+Refs:
+    * HTTP 202 Accepted: https://developer.mozilla.org/en-US/docs/Web/HTTP/Status/202
+    * Prefer Header (respond-async): https://www.rfc-editor.org/rfc/rfc7240#section-4.1
+    * The Idempotency-Key HTTP Header Field: https://datatracker.ietf.org/doc/draft-ietf-httpapi-idempotency-key-header/
+
+"""
+
+# Required modules
+from flask import current_app, request
+
+# SQLAlchemy functions
+from sqlalchemy import update, func
+from sqlalchemy.exc import IntegrityError
+
+# Other dependencies
+from datetime import datetime, timedelta
+import hashlib
+import json
+import os
+import socket
+import traceback
+
+# Getting config data
+from config import JOBS_ASYNC, JOBS_MAX_ATTEMPTS, JOBS_BACKOFF, JOBS_TIMEOUT
+
+# Import the database object (db), the Socket.IO server, the events queue and the push notifications dispatcher
+# from the main application module
+from app import db, socketio, events, push
+
+# Import the unit of work (to run each job on a single transaction)
+from app.unit_of_work import unit_of_work
+
+# Import services
+from app.services.metrics import register_metrics
+
+# Import module models
+from app.modules.jobs.models import Job, QUEUED, RUNNING, SUCCEEDED, FAILED
+
+# Job table, for the bulk statements
+job_table = Job.__table__
+
+# Functions running each type of job (registered with 'job_handler')
+handlers = {}
+
+# Define the error raised when an idempotency key is sent again for a different job
+class IdempotencyKeyReused(ValueError):
+    pass
+
+# Define the error raised when a job being run was taken by another worker (like after it was considered lost)
+class LostJobError(RuntimeError):
+    pass
+
+# Decorator to register the function running a type of job
+# It receives the session (committed once the job succeeds, along with its status) and the job payload,
+# returning the job result (anything encoded as JSON)
+def job_handler(type):
+    def decorator(func):
+        handlers[type] = func
+        return func
+    return decorator
+
+# Function to check if the current request should run its heavy work as a job
+def wants_async():
+    return JOBS_ASYNC or 'respond-async' in request.headers.get('Prefer', '')
+
+# Function to get the stored key of an idempotency key, scoped by the user and the type of job
+# (hashed, so it has the same length whatever the key is)
+def get_idempotency_key(userId, type, idempotencyKey):
+    return hashlib.sha256(json.dumps([userId, type, idempotencyKey]).encode()).hexdigest()
+
+# Function to check if a job found by its idempotency key was queued for the same payload
+def check_same_payload(job, payload):
+    if json.loads(job.payload) != payload:
+        raise IdempotencyKeyReused("The idempotency key was already used for a different job")
+    return job
+
+# Function to queue a job, to be committed along with the current transaction
+# Jobs requested again with the same idempotency key (by the same user, for the same type of job) aren't
+# queued twice, returning the existing job instead. Reusing a key for a different payload raises
+# 'IdempotencyKeyReused'
+# Returns the job and if it was created
+def enqueue_job(session, type, payload, userId=None, idempotencyKey=None):
+    key = get_idempotency_key(userId, type, idempotencyKey) if idempotencyKey else None
+    if key is not None:
+        existing = session.query(Job).filter(Job.idempotencyKey == key).first()
+        if existing is not None: return check_same_payload(existing, payload), False
+    job = Job(type, json.dumps(payload), JOBS_MAX_ATTEMPTS, userId=userId, idempotencyKey=key)
+    # Concurrent requests with the same key are caught by the unique index
+    try:
+        with session.begin_nested(): session.add(job)
+    except IntegrityError:
+        existing = session.query(Job).filter(Job.idempotencyKey == key).one()
+        return check_same_payload(existing, payload), False
+    return job, True
+
+# Function to get the data of a job, as shown to the users (the payload isn't included)
+def get_job_data(job):
+    return {
+        "id": job.id,
+        "type": job.type,
+        "status": job.status,
+        "attempts": job.attempts,
+        "maxAttempts": job.maxAttempts,
+        "result": json.loads(job.result) if job.result is not None else None,
+        "error": job.error,
+        "createdAt": job.createdAt,
+        "updatedAt": job.updatedAt,
+        "finishedAt": job.finishedAt,
+    }
+
+# Function to claim the next due job for a worker
+# The job is only taken if it's still queued, so concurrent workers never run the same job
+# (it doesn't need locking reads, which SQLite doesn't have)
+# Returns the claimed job, or 'None' if there are no due jobs
+def claim_job(session, workerId):
+    while True:
+        now = datetime.now()
+        jobId = session.query(Job.id).filter(Job.status == QUEUED, Job.runAt <= now).\
+            order_by(Job.runAt, Job.id).limit(1).scalar()
+        if jobId is None:
+            session.commit()
+            return None
+        claimed = session.execute(update(job_table).
+            where(job_table.c.id == jobId, job_table.c.status == QUEUED).
+            values(status=RUNNING, lockedBy=workerId, lockedAt=now, attempts=job_table.c.attempts + 1)).rowcount
+        session.commit()
+        if claimed: return session.query(Job).get(jobId)
+
+# Function to queue again the running jobs lost by their workers (like when they were killed)
+# Jobs which have no attempts left are failed instead
+# Returns the number of lost jobs
+def recover_lost_jobs(session):
+    lostAt = datetime.now() - timedelta(seconds=JOBS_TIMEOUT)
+    lost = (job_table.c.status == RUNNING) & (job_table.c.lockedAt < lostAt)
+    retried = session.execute(update(job_table).
+        where(lost, job_table.c.attempts < job_table.c.maxAttempts).
+        values(status=QUEUED, lockedBy=None, lockedAt=None, error="The worker running the job was lost")).rowcount
+    failed = session.execute(update(job_table).
+        where(lost, job_table.c.attempts >= job_table.c.maxAttempts).
+        values(status=FAILED, lockedBy=None, finishedAt=datetime.now(), error="The worker running the job was lost")).rowcount
+    session.commit()
+    return retried + failed
+
+# Function to update a job only while it's run by the given worker
+# A job taking longer than 'JOBS_TIMEOUT' is considered lost and might be claimed by another worker,
+# so the first one must not finish it. Returns if the job was updated
+def update_running_job(session, jobId, workerId, **values):
+    return session.execute(update(job_table).
+        where(job_table.c.id == jobId, job_table.c.status == RUNNING, job_table.c.lockedBy == workerId).
+        values(lockedBy=None, **values)).rowcount > 0
+
+# Function to run a job claimed by a worker
+# The job work and its success are committed together, so a job is never done without being marked as done.
+# When it fails, everything it wrote is rolled back, and it's queued again (waiting longer before each retry)
+# while it has attempts left. When another worker has taken it meanwhile, its work is rolled back and
+# the job is left to that worker
+def run_job(job, workerId):
+    jobId = job.id
+    try:
+        handler = handlers.get(job.type)
+        if handler is None: raise LookupError(f"Unknown job type: {job.type}")
+        with unit_of_work() as session:
+            result = handler(session, json.loads(job.payload))
+            if not update_running_job(session, jobId, workerId, status=SUCCEEDED, error=None,
+                                      result=current_app.extensions['json_lines_provider'].dumps(result).decode(),
+                                      finishedAt=datetime.now()):
+                raise LostJobError(f"Job {jobId} was taken by another worker")
+        return True
+    except LostJobError:
+        traceback.print_exc()
+        return False
+    except Exception as e:
+        traceback.print_exc()
+        db.session.rollback()
+        job = db.session.query(Job).get(jobId)
+        error = f"{type(e).__name__}: {e}"
+        # Unknown jobs, or jobs without attempts left, aren't retried
+        if isinstance(e, LookupError) or job.attempts >= job.maxAttempts:
+            update_running_job(db.session, jobId, workerId, status=FAILED, error=error, finishedAt=datetime.now())
+        else:
+            update_running_job(db.session, jobId, workerId, status=QUEUED, error=error,
+                               runAt=datetime.now() + timedelta(seconds=JOBS_BACKOFF * 2 ** (job.attempts - 1)))
+        db.session.commit()
+        return False
+
+# Function to get an ID for the current worker
+def get_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+# Function to run the jobs as they're due, until stopped (or until there are no due jobs, if 'once' is set)
+# It sleeps (letting other tasks run, like sending push notifications) while there are no jobs
+# When running once, the Socket.IO events and push notifications queued by the jobs are sent before returning
+def run_worker(interval, once=False, workerId=None):
+    workerId = workerId or get_worker_id()
+    lastRecovery = None
+    while True:
+        # Looking for lost jobs from time to time
+        if lastRecovery is None or (datetime.now() - lastRecovery).total_seconds() >= JOBS_TIMEOUT / 10:
+            lost = recover_lost_jobs(db.session)
+            if lost: print(f"Recovered {lost} lost job(s)")
+            lastRecovery = datetime.now()
+        job = claim_job(db.session, workerId)
+        if job is None:
+            if once:
+                events.drain()
+                push.drain()
+                return
+            socketio.sleep(interval)
+            continue
+        jobId = job.id
+        print(f"Running job {jobId} ({job.type}, attempt {job.attempts} of {job.maxAttempts})")
+        succeeded = run_job(job, workerId)
+        print(f"Job {jobId} {'succeeded' if succeeded else 'failed'}")
+        db.session.remove()
+        socketio.sleep(0)
+
+# Function to count the jobs by status
+def get_jobs_stats():
+    return dict(db.session.query(Job.status, func.count(Job.id)).group_by(Job.status).all())
+
+register_metrics('jobs', get_jobs_stats)
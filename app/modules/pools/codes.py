@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Oct 21 14:05:33 2026
+
+@author: RenatoHenz
+
+Refs:
+    * SQLAlchemy Using SAVEPOINT: https://docs.sqlalchemy.org/en/14/orm/session_transaction.html#using-savepoint
+    * Crockford's Base32: https://www.crockford.com/base32.html
+
+"""
+
+# SQLAlchemy functions
+from sqlalchemy.exc import IntegrityError
+
+# Other dependencies
+from collections import deque
+import random
+
+# Import services
+from app.services.metrics import register_metrics
+
+# Import module models
+from app.modules.pools.models import Pool
+
+# Characters used on the pools codes (uppercase letters and digits, without the ones easily confused: 0, O, 1 and I)
+CODE_ALPHABET = '23456789ABCDEFGHJKLMNPQRSTUVWXYZ'
+CODE_LENGTH = 6
+# Number of codes generated and checked at once
+CODES_BATCH_SIZE = 100
+# Maximum number of codes tried when creating a pool
+MAX_CODE_ATTEMPTS = 5
+
+# Function to normalize a code typed by a user (codes are case insensitive)
+def normalize_code(code):
+    return code.strip().upper()
+
+# Define the pools codes allocator
+# Codes are generated in batches and the ones already taken are removed with a single query (through the unique
+# code index), keeping the others reserved on the process for the next pools. With ~1 billion possible codes,
+# only a small fraction of each batch is taken even with millions of pools, so the cost of each code stays constant.
+# Since other processes might create a pool with a reserved code first, the unique index still has the final word:
+# the pool is inserted on a savepoint, and a conflicting code is replaced by the next one
+class CodeAllocator():
+    def __init__(self, batch_size=CODES_BATCH_SIZE, attempts=MAX_CODE_ATTEMPTS):
+        self.batch_size = batch_size
+        self.attempts = attempts
+        self.batches = 0
+        self.taken = 0
+        self.allocated = 0
+        self.conflicts = 0
+        # Reserved codes, in order and as a set (so a new batch doesn't repeat them)
+        self._reserve = deque()
+        self._reserved = set()
+        self._random = random.SystemRandom()
+
+    # Generating a batch of codes and reserving the ones which aren't taken (nor reserved) yet
+    def _refill(self, session):
+        codes = {''.join(self._random.choices(CODE_ALPHABET, k=CODE_LENGTH)) for _ in range(self.batch_size)}
+        taken = {code for (code,) in session.query(Pool.code).filter(Pool.code.in_(codes))}
+        codes -= taken | self._reserved
+        self._reserve.extend(codes)
+        self._reserved.update(codes)
+        self.batches += 1
+        self.taken += len(taken)
+
+    # Taking the next reserved code
+    def take(self, session):
+        while not self._reserve: self._refill(session)
+        code = self._reserve.popleft()
+        self._reserved.discard(code)
+        self.allocated += 1
+        return code
+
+    # Taking many distinct codes at once (like when creating many pools), which must be inserted before taking others
+    # Since the codes aren't inserted yet, a batch generated meanwhile might reserve some of them again,
+    # so they are removed from the reserve
+    def take_many(self, session, size):
+        codes = {}
+        while len(codes) < size: codes[self.take(session)] = None
+        again = self._reserved.intersection(codes)
+        if again:
+            self._reserve = deque(code for code in self._reserve if code not in again)
+            self._reserved -= again
+        return list(codes)
+
+    # Creating a pool with a free code, replacing the code if another process has just taken it
+    def create_pool(self, session, title, ownerId=None):
+        for _ in range(self.attempts):
+            pool = Pool(title=title, code=self.take(session), ownerId=ownerId)
+            try:
+                with session.begin_nested(): session.add(pool)
+                return pool
+            except IntegrityError: self.conflicts += 1
+        raise RuntimeError(f"No free pool code was found after {self.attempts} attempts")
+
+    # Getting the allocator counters
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "taken": self.taken,
+            "allocated": self.allocated,
+            "conflicts": self.conflicts,
+            "reserved": len(self._reserve),
+        }
+
+# Pools codes allocator of the process
+code_allocator = CodeAllocator()
+register_metrics('poolCodes', code_allocator.stats)
@@ -11,23 +11,29 @@ Refs:
 """
 
 # Import flask dependencies
-from flask import Blueprint, request, jsonify, g
+from flask import Blueprint, request, g, current_app, stream_with_context
 from flask_babel import _
-
-# SQLAlchemy functions
-from sqlalchemy import func
+from app.encoding import jsonify
 
 # Session maker to allow database communication
-from app import AppSession
+from app import AppSession, after_commit, socketio
+
+# SQLAlchemy functions
+from sqlalchemy.orm import joinedload
+from sqlalchemy.exc import IntegrityError
 
 # Other dependencies
 from datetime import datetime
-import pytz
-import shortuuid
+import io
+import itertools
+from config import tz
 
 # Middlewares
 from app.middleware import ensure_authenticated
 
+# Responses cache
+from app.services.response_cache import cached_response, invalidate
+
 # Import module forms
 from app.modules.pools.forms import *
 
@@ -35,6 +41,46 @@ from app.modules.pools.forms import *
 from app.modules.pools.models import *
 from app.modules.users.models import *
 
+# Import module scoring engine
+from app.modules.pools.scoring import MAX_BULK_RESULTS
+
+# Import module results
+from app.modules.pools.results import set_results
+
+# Import module jobs (registering the heavy work which can be queued for the worker)
+from app.modules.pools.jobs import run_games_results, run_import_games
+from app.modules.jobs.runner import wants_async
+from app.modules.jobs.controllers import respond_with_job
+
+# Import module rankings
+from app.modules.pools.ranking import add_participant, \
+    get_pool_with_ranking_size, get_ranking_rows, iter_ranking_chunks
+
+# Import module Socket.IO events
+from app.modules.pools.events import publish_guesses
+
+# Import module pools codes
+from app.modules.pools.codes import code_allocator, normalize_code
+
+# Import module games schedule import
+from app.modules.pools.games import import_games, iter_json_rows, iter_ndjson_rows, iter_csv_rows, \
+    MAX_ASYNC_IMPORT_GAMES
+
+# Import module queries
+from app.modules.pools.queries import get_pools_summaries, get_user_pools, get_pool_participant, \
+    get_games_with_guesses
+
+# Import module guesses
+from app.modules.pools.guesses import get_guess_target, get_games_dates, upsert_guesses, \
+    is_past_game_date, MAX_BULK_GUESSES
+
+# Function to parse a datetime from the request arguments to the database time zone
+def parse_datetime(value):
+    value = datetime.fromisoformat(value)
+    # Aware datetimes are converted, since the database stores them without time zone
+    if value.tzinfo is not None: value = value.astimezone(tz).replace(tzinfo=None)
+    return value
+
 # Define the blueprints
 mod_pool = Blueprint('pool', __name__, url_prefix='/pools')
 mod_guess = Blueprint('guess', __name__, url_prefix='')
@@ -42,6 +88,7 @@ mod_game = Blueprint('game', __name__, url_prefix='/games')
 
 # Route to count number of pools
 @mod_pool.route('/count', methods=['GET'])
+@cached_response('pools')
 def count_pools():
     if request.method == 'GET':
         try:
@@ -66,8 +113,6 @@ def create_pool():
                 try:
                     # Getting title
                     title = form.title.data
-                    # Generating a code for the pool
-                    code = shortuuid.random(length=6).upper()
 
                     # Checking if an authenticated user is creating the pool
                     if 'Authorization' in request.headers.keys():
@@ -75,20 +120,14 @@ def create_pool():
                         token = request.headers['Authorization'].split("Bearer ")[1]
                         res = User.decode_auth_token(token)
                         # If token is valid, we define the pool owner
-                        if type(res) is str: ownerId = res
+                        if type(res) is str: ownerId = g.userId = res
                         # If token is not valid, no pool owner will be set
                         else: ownerId = None
                     # If user is not authenticated, no pool owner will be defined
                     else: ownerId = None
 
-                    # Creating the pool
-                    pool = Pool(
-                        title=title,
-                        code=code,
-                        ownerId=ownerId,
-                        )
-                    session.add(pool)
-                    session.flush()
+                    # Creating the pool with a free code
+                    pool = code_allocator.create_pool(session, title, ownerId=ownerId)
 
                     # If user is authenticated, it will also join the pool
                     if ownerId is not None:
@@ -97,13 +136,16 @@ def create_pool():
                             poolId=pool.id,
                         )
                         session.add(participant)
+                        session.flush()
+                        # Adding the owner to the pool ranking
+                        owner = session.query(User).get(ownerId)
+                        if owner is not None: add_participant(session, participant, owner)
 
-                    # Flushing and comitting the changes
-                    session.flush()
-                    session.commit()
+                    # Invalidating the cached responses depending on the pools, once the request is committed
+                    after_commit(invalidate, 'pools')
 
                     # Returning the data to the request
-                    return jsonify({"code": code}), 201
+                    return jsonify({"code": pool.code}), 201
                 
                 # If something goes wrong
                 except Exception as e: return jsonify({"message": str(e)}), 500
@@ -126,35 +168,37 @@ def join_pool():
             # Validating provided data
             if form.validate():
                 try:
-                    # Getting code
-                    code = form.code.data
+                    # Getting code (codes are case insensitive)
+                    code = normalize_code(form.code.data)
                     
                     # Checking if pool exists
                     pool = session.query(Pool).filter(Pool.code == code).first()
                     if pool is None:
                         return jsonify({"message": _("Pool not found")}), 404
 
-                    # Checking if user has already joined the pool
-                    participant = Participant.query.filter(
-                        Participant.userId == g.user.id,
-                        Participant.poolId == pool.id,
-                    ).first()
-                    if participant:
-                        return jsonify({"message": _("You've already joined this pool")}), 400
-                    
-                    # If pool has no owner, user will be set as the pool owner
-                    if pool.ownerId is None: pool.ownerId = g.user.id
-
                     # Creating the participant object
+                    # The unique (pool, user) index rejects it if the user has already joined the pool,
+                    # even when the same request is sent concurrently
+                    poolId = pool.id
                     participant = Participant(
                         userId=g.user.id,
-                        poolId=pool.id,
+                        poolId=poolId,
                         )
                     session.add(participant)
+                    try: session.flush()
+                    except IntegrityError:
+                        session.rollback()
+                        # Other failures (like a missing user) aren't reported as an existing participant
+                        if not session.query(Participant.id).filter_by(poolId=poolId, userId=g.user.id).first(): raise
+                        return jsonify({"message": _("You've already joined this pool")}), 400
 
-                    # Flushing and comitting the changes
-                    session.flush()
-                    session.commit()
+                    # If pool has no owner, user will be set as the pool owner
+                    if pool.ownerId is None: pool.ownerId = g.user.id
+                    # Adding the user to the pool ranking
+                    add_participant(session, participant, g.user)
+
+                    # Invalidating the cached responses depending on the pool participants, once the request is committed
+                    after_commit(invalidate, f'pool:{pool.id}')
 
                     # Returning the data to the request
                     return '', 201
@@ -171,117 +215,84 @@ def join_pool():
 @mod_pool.route('', methods=['GET'])
 @ensure_authenticated
 def get_pools():
-    # Getting the list of pools IDs of which the user is participating
-    userParticipatesAt = Participant.query.filter(Participant.userId == g.user.id).all()
-
-    # Initializing return data
-    pools = []
-    # For each pool where user is participating
-    for userParticipatingAt in userParticipatesAt:
-        pool = userParticipatingAt.pool
-        # Getting the number of participants in the pool
-        _count = Participant.query.filter(Participant.poolId == pool.id).count()
-        # Getting the first four participants of the pool
-        participants = Participant.query.filter(Participant.poolId == pool.id).\
-            paginate(1, 4, False, 4).items
-        
-        # Appending data to pools list
-        pools.append({
-            "id": pool.id,
-            "title": pool.title,
-            "code": pool.code,
-            "createdAt": pool.createdAt.isoformat(),
-            "ownerId": pool.ownerId,
-            "participants": [{
-                "id": participant.id,
-                "user": {
-                    "avatarUrl": participant.user.avatarUrl,
-                }
-            } for participant in participants],
-            "owner": {
-                "id": pool.owner.id,
-                "name": pool.owner.name,
-            },
-            "_count": {
-                "participants": _count,
-            }
-        })
+    # Getting the pools of which the user is participating
+    pools = get_user_pools(g.user.id)
 
     # Returning obtained data
-    return jsonify({"pools": pools}), 200
+    return jsonify({"pools": get_pools_summaries(pools)}), 200
 
 # Route to get pool participants
 @mod_pool.route('/<string:id>', methods=['GET'])
 @ensure_authenticated
+@cached_response('pool:{id}')
 def get_pool_particpants(id):
     # Getting the pool by its ID
-    pool = Pool.query.get(id)
+    pool = Pool.query.options(joinedload(Pool.owner)).get(id)
 
     # If no pool was found
     if not pool: return jsonify({"message": _("Pool not found")}), 404
 
-    # Getting the number of participants in the pool
-    _count = Participant.query.filter(Participant.poolId == pool.id).count()
-    # Getting the first four participants of the pool
-    participants = Participant.query.filter(Participant.poolId == pool.id).\
-        paginate(1, 4, False, 4).items
-
-    # Setting return data
-    data = {
-        "id": pool.id,
-        "title": pool.title,
-        "code": pool.code,
-        "createdAt": pool.createdAt.isoformat(),
-        "ownerId": pool.ownerId,
-        "participants": [{
-            "id": participant.id,
-            "user": {
-                "avatarUrl": participant.user.avatarUrl,
-            }
-        } for participant in participants],
-        "owner": {
-            "id": pool.owner.id,
-            "name": pool.owner.name,
-        },
-        "_count": {
-            "participants": _count,
-        }
-    }
-
     # Returning obtained data
-    return jsonify({"pool": data}), 200
+    return jsonify({"pool": get_pools_summaries([pool])[0]}), 200
 
 # Route to get pool ranking
 @mod_pool.route('/<string:id>/ranking', methods=['GET'])
 @ensure_authenticated
+@cached_response('pool:{id}', per_user=lambda: request.args.get('around') == 'me')
 def get_pool_ranking(id):
-    # Getting the pool by its ID
-    pool = Pool.query.get(id)
+    # Getting the pool by its ID, along with the number of participants
+    row = get_pool_with_ranking_size(id)
 
     # If no pool was found
-    if not pool: return jsonify({"message": _("Pool not found")}), 404
-
-    # Getting the number of participants in the pool
-    _count = Participant.query.filter(Participant.poolId == pool.id).count()
-    # Getting the participants data including score
-    participants = Participant.query.filter(Participant.poolId == pool.id).\
-        order_by(Participant.score.desc()).all()
+    if not row: return jsonify({"message": _("Pool not found")}), 404
+    pool, _count = row.Pool, row.size or 0
+
+    # Getting the optional filters (as positive integers)
+    args = {}
+    error_messages = []
+    for arg in ('top', 'k', 'page', 'per_page'):
+        value = request.args.get(arg)
+        if value is None: continue
+        if not value.isdigit() or int(value) < 1:
+            error_messages.append(_("'%(arg)s' must be a positive integer.", arg=arg))
+        else: args[arg] = int(value)
+    around = request.args.get('around')
+    if around is not None and around != 'me':
+        error_messages.append(_("'around' must be 'me'."))
+    if ('page' in args) != ('per_page' in args):
+        error_messages.append(_("'page' and 'per_page' must be provided together."))
+    # If there were errors on the request
+    if len(error_messages) > 0:
+        return jsonify({"message": error_messages}), 400
+
+    # Getting the top positions
+    if 'top' in args: rankings = get_ranking_rows(pool.id, last=args['top'])
+    # Getting the positions around the user
+    elif around == 'me': rankings = get_ranking_rows(pool.id, aroundUserId=g.user.id, distance=args.get('k', 5))
+    # Getting a page of positions
+    elif 'page' in args:
+        rankings = get_ranking_rows(pool.id,
+            first=(args['page'] - 1) * args['per_page'] + 1,
+            last=args['page'] * args['per_page'])
+    # Getting the whole ranking
+    else: rankings = get_ranking_rows(pool.id)
 
     # Setting return data
     data = {
         "id": pool.id,
         "title": pool.title,
         "code": pool.code,
-        "createdAt": pool.createdAt.isoformat(),
+        "createdAt": pool.createdAt,
         "ownerId": pool.ownerId,
         "participants": [{
-            "id": participant.id,
-            "score": participant.score,
+            "id": ranking.participantId,
+            "score": ranking.score,
+            "position": ranking.position,
             "user": {
-                "name": participant.user.name,
-                "avatarUrl": participant.user.avatarUrl,
+                "name": ranking.userName,
+                "avatarUrl": ranking.userAvatarUrl,
             }
-        } for participant in participants],
+        } for ranking in rankings],
         "_count": {
             "participants": _count,
         }
@@ -290,8 +301,97 @@ def get_pool_ranking(id):
     # Returning obtained data
     return jsonify({"pool": data}), 200
 
+# Route to export a pool ranking, streamed as NDJSON (a participant per line) or JSON
+# Rows are read from a cursor and sent in chunks, so neither the memory nor the first byte depend on the pool size
+# The ranking can be paginated with a cursor: the score and ID of the last participant read ('after_score'
+# and 'after_id') and the number of participants ('limit'). JSON responses bring the next cursor
+@mod_pool.route('/<string:id>/ranking/export', methods=['GET'])
+@ensure_authenticated
+def export_pool_ranking(id):
+    # Getting the pool by its ID, along with the number of participants
+    row = get_pool_with_ranking_size(id)
+
+    # If no pool was found
+    if not row: return jsonify({"message": _("Pool not found")}), 404
+    pool, _count = row.Pool, row.size or 0
+
+    # Getting the format and the optional cursor and limit
+    error_messages = []
+    dataFormat = request.args.get('format', 'ndjson')
+    if dataFormat not in ('ndjson', 'json'):
+        error_messages.append(_("'format' must be 'ndjson' or 'json'."))
+    afterScore, afterId = request.args.get('after_score'), request.args.get('after_id')
+    if (afterScore is None) != (afterId is None):
+        error_messages.append(_("'after_score' and 'after_id' must be provided together."))
+    elif afterScore is not None:
+        if afterScore.lstrip('-').isdigit(): afterScore = int(afterScore)
+        else: error_messages.append(_("'%(arg)s' must be an integer.", arg='after_score'))
+    limit = request.args.get('limit')
+    if limit is not None:
+        if not limit.isdigit() or int(limit) < 1:
+            error_messages.append(_("'%(arg)s' must be a positive integer.", arg='limit'))
+        else: limit = int(limit)
+    # If there were errors on the request
+    if len(error_messages) > 0:
+        return jsonify({"message": error_messages}), 400
+
+    provider = current_app.extensions['json_lines_provider']
+    # Cursor of the next page, known once the participants were sent
+    cursor = {"next": None}
+
+    # Encoding the participants of each chunk (like on the pool ranking route)
+    def encode_chunks():
+        count, last = 0, None
+        with AppSession() as session:
+            for chunk in iter_ranking_chunks(session, pool.id, afterScore=afterScore, afterId=afterId, limit=limit):
+                yield [provider.dumps({
+                    "id": ranking.participantId,
+                    "score": ranking.score,
+                    "position": ranking.position,
+                    "user": {
+                        "name": ranking.userName,
+                        "avatarUrl": ranking.userAvatarUrl,
+                    }
+                }) for ranking in chunk]
+                count, last = count + len(chunk), chunk[-1]
+                # Letting other requests run between the chunks
+                socketio.sleep(0)
+        # The next page only exists when the limit was reached
+        if limit is not None and count == limit:
+            cursor["next"] = {"after_score": last.score, "after_id": last.participantId}
+
+    # Streaming a participant per line
+    def generate_ndjson():
+        for rows in encode_chunks(): yield b"\n".join(rows) + b"\n"
+
+    # Streaming the pool data, then its participants and finally the next cursor
+    def generate_json():
+        data = provider.dumps({
+            "id": pool.id,
+            "title": pool.title,
+            "code": pool.code,
+            "createdAt": pool.createdAt,
+            "ownerId": pool.ownerId,
+            "_count": {
+                "participants": _count,
+            }
+        })
+        # Opening the participants list on the pool object (removing its closing brace)
+        yield b'{"pool":' + data[:data.rindex(b"}")] + b',"participants":['
+        separator = b""
+        for rows in encode_chunks():
+            yield separator + b",".join(rows)
+            separator = b","
+        yield b']},"next":' + provider.dumps(cursor["next"]) + b"}\n"
+
+    # Returning the streamed data
+    if dataFormat == 'ndjson':
+        return current_app.response_class(stream_with_context(generate_ndjson()), mimetype='application/x-ndjson'), 200
+    return current_app.response_class(stream_with_context(generate_json()), mimetype=provider.mimetype), 200
+
 # Route to count number of guesses
 @mod_guess.route('/guesses/count', methods=['GET'])
+@cached_response('guesses')
 def count_guesses():
     if request.method == 'GET':
         try:
@@ -323,52 +423,36 @@ def create_guess(poolId, gameId):
                     if (firstTeamPoints is None) or (secondTeamPoints is None):
                         return jsonify({"message": _("You must provide both team points")}), 400
                     
+                    # Getting the pool, the game and the user's participant on the pool at once
+                    target = get_guess_target(session, poolId, gameId, g.user.id)
                     # Checking if pool exists
-                    pool = Pool.query.get(poolId)
-                    if pool is None:
+                    if target is None:
                         return jsonify({"message": _("Pool not found")}), 404
-                    
+
                     # Checking if game exists
-                    game = Game.query.get(gameId)
-                    if game is None:
+                    if target.gameId is None:
                         return jsonify({"message": _("Game not found")}), 404
-                    
+
                     # Checking if user is participating at the pool
-                    participant = Participant.query.filter(
-                        Participant.userId == g.user.id,
-                        Participant.poolId == poolId,
-                        ).first()
-                    if participant is None:
+                    if target.participantId is None:
                         return jsonify({"message": _("You're not allowed to create a guess inside this pool")}), 403
-                    
+
                     # User can't place guesses after the game's date
-                    if game.date.replace(tzinfo=pytz.timezone('America/Sao_Paulo')) < datetime.now(pytz.timezone('America/Sao_Paulo')):
+                    if is_past_game_date(target.gameDate):
                         return jsonify({"message": _("You cannot send guesses after the game date")}), 400
-                    
-                    # Checking if the user has already placed a guess for the game on the pool
-                    existingGuess = session.query(Guess).filter(
-                        Guess.participantId == participant.id,
-                        Guess.gameId == game.id,
-                    ).first()
-
-                    # If user has already placed a guess, we'll update the points
-                    if existingGuess:
-                        existingGuess.firstTeamPoints = firstTeamPoints
-                        existingGuess.secondTeamPoints = secondTeamPoints
-                    
-                    # Otherwise, we'll create a new guess
-                    else:
-                        guess = Guess(
-                            firstTeamPoints=firstTeamPoints,
-                            secondTeamPoints=secondTeamPoints,
-                            gameId=game.id,
-                            participantId=participant.id,
-                        )
-                        session.add(guess)
 
-                    # Flushing and comitting the changes
-                    session.flush()
-                    session.commit()
+                    # Creating the guess, or updating its points if the user has already placed it
+                    upsert_guesses(session, [{
+                        "participantId": target.participantId,
+                        "gameId": target.gameId,
+                        "firstTeamPoints": firstTeamPoints,
+                        "secondTeamPoints": secondTeamPoints,
+                    }])
+
+                    # Invalidating the cached responses depending on the guesses, once the request is committed
+                    after_commit(invalidate, 'guesses', f'guesses:{poolId}:{g.user.id}')
+                    # Sending the new guesses count to the pool room, once the request is committed
+                    after_commit(publish_guesses, poolId, [target.gameId])
 
                     # Returning the data to the request
                     return '', 201
@@ -381,46 +465,136 @@ def create_guess(poolId, gameId):
                 # Returning the data to the request
                 return jsonify({"message": form.errors}), 400
 
+# Route to place many guesses at once on a pool (like filling all the group stage games)
+# Expects {"guesses": [{"gameId": ..., "firstTeamPoints": ..., "secondTeamPoints": ...}, ...]} and
+# returns the result of each guess, in the same order, with its status and error message (if any)
+@mod_guess.route('/pools/<string:poolId>/guesses', methods=['POST'])
+@ensure_authenticated
+def create_guesses(poolId):
+    if request.method == 'POST':
+        # Creating the session for database communication
+        with AppSession() as session:
+            # Getting the guesses list
+            data = request.json
+            items = data.get('guesses') if isinstance(data, dict) else None
+            if not isinstance(items, list) or not items:
+                return jsonify({"message": _("You must provide the list of guesses")}), 400
+            if len(items) > MAX_BULK_GUESSES:
+                return jsonify({"message": _("You can send up to %(max)s guesses at once", max=MAX_BULK_GUESSES)}), 400
+
+            try:
+                # Checking if pool exists and if user is participating at it
+                poolParticipant = get_pool_participant(poolId, g.user.id)
+                if poolParticipant is None:
+                    return jsonify({"message": _("Pool not found")}), 404
+                if poolParticipant.participantId is None:
+                    return jsonify({"message": _("You're not allowed to create a guess inside this pool")}), 403
+
+                # Getting the dates of all games at once
+                gamesDates = get_games_dates(session, {item.get('gameId') for item in items
+                                                       if isinstance(item, dict) and isinstance(item.get('gameId'), str)})
+
+                # Validating each guess
+                results = []
+                guesses = {}
+                for item in items:
+                    gameId = item.get('gameId') if isinstance(item, dict) else None
+                    form = CreateGuessForm.from_json(item if isinstance(item, dict) else {})
+                    if not form.validate():
+                        results.append({"gameId": gameId, "status": 400, "message": form.errors})
+                    elif (form.firstTeamPoints.data is None) or (form.secondTeamPoints.data is None):
+                        results.append({"gameId": gameId, "status": 400, "message": _("You must provide both team points")})
+                    elif gameId not in gamesDates:
+                        results.append({"gameId": gameId, "status": 404, "message": _("Game not found")})
+                    elif is_past_game_date(gamesDates[gameId]):
+                        results.append({"gameId": gameId, "status": 400, "message": _("You cannot send guesses after the game date")})
+                    else:
+                        results.append({"gameId": gameId, "status": 201})
+                        # When the same game is sent more than once, the last guess is kept
+                        guesses[gameId] = {
+                            "participantId": poolParticipant.participantId,
+                            "gameId": gameId,
+                            "firstTeamPoints": form.firstTeamPoints.data,
+                            "secondTeamPoints": form.secondTeamPoints.data,
+                        }
+
+                # Creating (or updating) all the valid guesses at once
+                if guesses:
+                    upsert_guesses(session, list(guesses.values()))
+                    # Invalidating the cached responses depending on the guesses, once the request is committed
+                    after_commit(invalidate, 'guesses', f'guesses:{poolId}:{g.user.id}')
+                    # Sending the new guesses counts to the pool room, once the request is committed
+                    after_commit(publish_guesses, poolId, list(guesses.keys()))
+
+                # Returning the data to the request
+                return jsonify({"results": results}), 200
+
+            # If something goes wrong
+            except Exception as e: return jsonify({"message": str(e)}), 500
+
+# Function to check if the pool games request depends on the current time (upcoming games change as they
+# start, with no write invalidating them, and clients polling for the changes 'since' a datetime need the latest ones)
+def is_time_relative():
+    return request.args.get('status') == 'upcoming' or 'since' in request.args
+
 # Route to get pool games
 @mod_pool.route('/<string:id>/games', methods=['GET'])
 @ensure_authenticated
+@cached_response('games', 'guesses:{id}:{user}', per_user=True, unless=is_time_relative)
 def get_pool_games(id):
-    # Getting the pool by its ID
-    pool = Pool.query.get(id)
+    # Getting the pool and the user's participation on it
+    poolParticipant = get_pool_participant(id, g.user.id)
 
     # If no pool was found
-    if not pool: return jsonify({"message": _("Pool not found")}), 404
+    if not poolParticipant: return jsonify({"message": _("Pool not found")}), 404
+
+    # Getting the optional filters
+    since = request.args.get('since')
+    status = request.args.get('status')
+    afterDate = request.args.get('after_date')
+    afterId = request.args.get('after_id')
+    limit = request.args.get('limit')
+
+    # Creating a list with possible errors to be returned to the client
+    error_messages = []
+    try:
+        if since is not None: since = parse_datetime(since)
+    except ValueError:
+        error_messages.append(_("'since' must be an ISO 8601 datetime."))
+    if status is not None and status not in ('upcoming', 'finished'):
+        error_messages.append(_("'status' must be 'upcoming' or 'finished'."))
+    try:
+        if afterDate is not None: afterDate = parse_datetime(afterDate)
+    except ValueError:
+        error_messages.append(_("'after_date' must be an ISO 8601 datetime."))
+    if (afterDate is None) != (afterId is None):
+        error_messages.append(_("'after_date' and 'after_id' must be provided together."))
+    if limit is not None and (not limit.isdigit() or int(limit) < 1):
+        error_messages.append(_("'limit' must be a positive integer."))
+    # If there were errors on the request
+    if len(error_messages) > 0:
+        return jsonify({"message": error_messages}), 400
+
+    # Getting pool games, along with the user's guesses
+    games = get_games_with_guesses(
+        poolParticipant.participantId,
+        since=since,
+        status=status,
+        after=(afterDate, afterId) if afterId is not None else None,
+        limit=int(limit) if limit is not None else None,
+    )
 
-    # Checking if user is participating at the pool
-    participant = Participant.query.filter(
-        Participant.userId == g.user.id,
-        Participant.poolId == id,
-        ).first()
-
-    # Getting pool games
-    games = Game.query.order_by(Game.date.desc()).all()
-
-    # Initializing game data
-    gameData = []
-
-    # For each game, we'll get the user's guess on the pool
-    for game in games:
-        # Initializing current game data
-        currentGame = game.as_dict()
-        # Trying to get user's guess on pool
-        guess = Guess.query.filter(
-            Guess.gameId == game.id,
-            Guess.participantId == participant.id
-            ).first()
-        # If guess was found
-        if guess: currentGame['guess'] = guess.as_dict()
-        else: currentGame['guess'] = None
-
-        # Appending data to games list
-        gameData.append(currentGame)
+    # Setting return data
+    data = {"games": games}
+    # When paginating, the last game is the starting point for the next page
+    if limit is not None:
+        data["next"] = {
+            "after_date": games[-1]["date"],
+            "after_id": games[-1]["id"],
+        } if len(games) == int(limit) else None
 
     # Returning obtained data
-    return jsonify({"games": gameData}), 200
+    return jsonify(data), 200
 
 # Route to create a new game
 @mod_game.route('', methods=['POST'])
@@ -447,10 +621,12 @@ def create_game():
                         secondTeamCountryCode=secondTeamCountryCode,
                     )
                     session.add(game)
-
-                    # Flushing and comitting the changes
+                    # Flushing the changes and reloading the game, so the returned data has the values set by the database
                     session.flush()
-                    session.commit()
+                    session.refresh(game)
+
+                    # Invalidating the cached responses depending on the games, once the request is committed
+                    after_commit(invalidate, 'games')
 
                     # Returning the data to the request
                     return jsonify({"game": game.as_dict()}), 201
@@ -463,32 +639,52 @@ def create_game():
                 # Returning the data to the request
                 return jsonify({"message": form.errors}), 400
 
+# Route to import a games schedule (like a whole tournament), as JSON, NDJSON or CSV
+# JSON schedules are a list of games (or an object with it on 'games'), while NDJSON and CSV ones are read
+# line by line, with a game per line (CSV ones with a header naming the fields)
+# Returns the import report, with the errors of each invalid row (the valid ones are still imported),
+# or the job importing it (see 'app.modules.jobs')
+@mod_game.route('/import', methods=['POST'])
+@ensure_authenticated
+def import_games_schedule():
+    if request.method == 'POST':
+        # Creating the session for database communication
+        with AppSession() as session:
+            # Getting the schedule rows, by its content type
+            if request.mimetype == 'application/json':
+                try: rows = iter_json_rows(request.get_json(silent=True))
+                except ValueError as e: return jsonify({"message": str(e)}), 400
+            elif request.mimetype in ('application/x-ndjson', 'text/csv'):
+                lines = io.TextIOWrapper(request.stream, encoding='utf-8-sig', newline='')
+                rows = iter_csv_rows(lines) if request.mimetype == 'text/csv' else iter_ndjson_rows(lines)
+            else: return jsonify({"message": _("The schedule must be sent as JSON, NDJSON or CSV")}), 415
+
+            try:
+                # Queuing the import as a job, with the games read from the schedule
+                # The schedule is read only up to the limit, rejecting bigger ones without reading the rest
+                if wants_async():
+                    games = [item for number, item in itertools.islice(rows, MAX_ASYNC_IMPORT_GAMES + 1)]
+                    if len(games) > MAX_ASYNC_IMPORT_GAMES:
+                        return jsonify({"message": _("You can import up to %(max)s games at once as a job",
+                                                     max=MAX_ASYNC_IMPORT_GAMES)}), 413
+                    return respond_with_job(session, 'import_games', {"games": games})
+
+                # Importing the games
+                report = import_games(session, rows)
+                # Invalidating the cached responses depending on the games, once the request is committed
+                if report['created']: after_commit(invalidate, 'games')
+
+                # Returning the data to the request
+                return jsonify({"report": report}), 200
+
+            # If something goes wrong
+            except Exception as e: return jsonify({"message": str(e)}), 500
+
 # Route to set a game result
+# Returns the updated game, or the job updating it (see 'app.modules.jobs')
 @mod_game.route('/<string:id>/result', methods=['PUT'])
 @ensure_authenticated
 def set_game_result(id):
-    # Function to calculate guess score
-    def calculate_guess_score(guess, game):
-        # Initializing the user points
-        points = 0
-        # If game already has a result
-        if (game.firstTeamPoints is not None and game.secondTeamPoints is not None):
-            # If participant guesses both team points right
-            if (guess.firstTeamPoints == game.firstTeamPoints and guess.secondTeamPoints == game.secondTeamPoints):
-                return 5
-            # If participant guesses correctly that there was a draw in the match
-            if (guess.firstTeamPoints == guess.secondTeamPoints and game.firstTeamPoints == game.secondTeamPoints):
-                points += 3
-            # If participant guesses correctly which team won the match
-            if ((guess.firstTeamPoints > guess.secondTeamPoints and game.firstTeamPoints > game.secondTeamPoints) or
-                (guess.firstTeamPoints < guess.secondTeamPoints and game.firstTeamPoints < game.secondTeamPoints)):
-                points += 2
-            # If participant guesses correctly one of the teams points
-            if (guess.firstTeamPoints == game.firstTeamPoints or guess.secondTeamPoints == game.secondTeamPoints):
-                points += 1
-        # Returning the user points
-        return points
-
     if request.method == 'PUT':
         # Creating the session for database communication
         with AppSession() as session:
@@ -505,40 +701,22 @@ def set_game_result(id):
                     # Both values must be provided
                     if (firstTeamPoints is None) or (secondTeamPoints is None):
                         return jsonify({"message": _("You must provide both team points")}), 400
-                    
+
+                    # Queuing the result as a job, if the game exists
+                    if wants_async():
+                        if session.query(Game.id).filter(Game.id == id).scalar() is None:
+                            return jsonify({"message": _("Game not found")}), 404
+                        return respond_with_job(session, 'games_results', {"results": [{
+                            "gameId": id, "firstTeamPoints": firstTeamPoints, "secondTeamPoints": secondTeamPoints}]})
+
+                    # Updating the game, rescoring only its guesses and updating the rankings where scores have changed
+                    games = set_results(session, {id: (firstTeamPoints, secondTeamPoints)})
                     # Checking if game exists
-                    game = session.query(Game).get(id)
-                    if game is None:
+                    if not games:
                         return jsonify({"message": _("Game not found")}), 404
-                    
-                    # Updating game object
-                    game.firstTeamPoints = firstTeamPoints
-                    game.secondTeamPoints = secondTeamPoints
-
-                    # Now, we get the game guesses list
-                    guesses = session.query(Guess).filter(Guess.gameId == id).all()
-                    # For each guess, we'll update the score
-                    for guess in guesses: guess.score = calculate_guess_score(guess, game)
-
-                    # Now, we get the participants list
-                    participants = session.query(Participant).all()
-                    # For each participant, we'll update the score
-                    for participant in participants:
-                        # Getting the participant's score
-                        participant_score = session.query(func.sum(Guess.score)).filter(
-                                Guess.participantId == participant.id
-                            ).scalar()
-                        # If no guess was created, score will be 'None'
-                        if participant_score is None: participant.score = 0
-                        # If there were guesses
-                        if participant_score is not None: participant.score = participant_score
-
-                    # Flushing and comitting the changes
-                    session.flush()
-                    session.commit()
 
                     # Returning the data to the request
-                    return jsonify({"updatedGame": game.as_dict()}), 200
+                    return jsonify({"updatedGame": games[0].as_dict()}), 200
 
                 # If something goes wrong
                 except Exception as e: return jsonify({"message": str(e)}), 500
@@ -547,3 +725,69 @@ def set_game_result(id):
             else:
                 # Returning the data to the request
                 return jsonify({"message": form.errors}), 400
+
+# Route to set many games results at once (like games ending at the same time)
+# All of their guesses are rescored in a single pass, and each participant total and pool ranking is updated once
+# Expects {"results": [{"gameId": ..., "firstTeamPoints": ..., "secondTeamPoints": ...}, ...]} and
+# returns the result of each game, in the same order, with its status and error message (if any),
+# along with the updated games or the job updating them (see 'app.modules.jobs')
+@mod_game.route('/results', methods=['PUT'])
+@ensure_authenticated
+def set_games_results():
+    if request.method == 'PUT':
+        # Creating the session for database communication
+        with AppSession() as session:
+            # Getting the results list
+            data = request.json
+            items = data.get('results') if isinstance(data, dict) else None
+            if not isinstance(items, list) or not items:
+                return jsonify({"message": _("You must provide the list of results")}), 400
+            if len(items) > MAX_BULK_RESULTS:
+                return jsonify({"message": _("You can send up to %(max)s results at once", max=MAX_BULK_RESULTS)}), 400
+
+            try:
+                # Validating each result
+                validated = []
+                points = {}
+                for item in items:
+                    gameId = item.get('gameId') if isinstance(item, dict) else None
+                    form = SetGamResultForm.from_json(item if isinstance(item, dict) else {})
+                    if not form.validate():
+                        validated.append((gameId, {"gameId": gameId, "status": 400, "message": form.errors}))
+                    elif (form.firstTeamPoints.data is None) or (form.secondTeamPoints.data is None):
+                        validated.append((gameId, {"gameId": gameId, "status": 400, "message": _("You must provide both team points")}))
+                    elif not isinstance(gameId, str):
+                        validated.append((gameId, {"gameId": gameId, "status": 404, "message": _("Game not found")}))
+                    else:
+                        validated.append((gameId, None))
+                        # When the same game is sent more than once, the last result is kept
+                        points[gameId] = (form.firstTeamPoints.data, form.secondTeamPoints.data)
+
+                # Queuing the results of the existing games as a job
+                isAsync = wants_async()
+                if isAsync:
+                    found = {gameId for (gameId,) in session.query(Game.id).filter(Game.id.in_(list(points)))} \
+                        if points else set()
+                # Setting all the valid results and rescoring their guesses at once
+                else:
+                    games = set_results(session, points) if points else []
+                    found = {game.id for game in games}
+
+                # Getting the status of each result
+                results = []
+                for gameId, result in validated:
+                    if result is None:
+                        result = {"gameId": gameId, "status": 202 if isAsync else 200} if gameId in found else \
+                            {"gameId": gameId, "status": 404, "message": _("Game not found")}
+                    results.append(result)
+
+                # Returning the data to the request
+                if isAsync and found:
+                    return respond_with_job(session, 'games_results', {"results": [{
+                        "gameId": gameId, "firstTeamPoints": points[gameId][0], "secondTeamPoints": points[gameId][1]}
+                        for gameId in points if gameId in found]}, results=results)
+                return jsonify({"results": results, "updatedGames": [] if isAsync else
+                                [game.as_dict() for game in games]}), 200
+
+            # If something goes wrong
+            except Exception as e: return jsonify({"message": str(e)}), 500
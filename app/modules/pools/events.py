@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 11:31:09 2026
+
+@author: RenatoHenz
+
+Refs:
+    * Flask-SocketIO Rooms: https://flask-socketio.readthedocs.io/en/latest/getting_started.html#rooms
+    * Flask-SocketIO Emitting from an External Process: https://flask-socketio.readthedocs.io/en/latest/deployment.html#emitting-from-an-external-process
+
+"""
+
+# Required modules
+from flask import session as socket_session
+from flask_socketio import join_room, leave_room
+from flask_babel import _
+
+# SQLAlchemy functions
+from sqlalchemy import func
+
+# Import the database object (db), the Socket.IO server and the events queue from the main application module
+from app import db, socketio, events
+
+# Import module models
+from app.modules.pools.models import Participant, Guess
+
+# Import module queries
+from app.modules.pools.queries import get_pool_participant
+
+# Each pool is a Socket.IO room, joined by its participants, which receives compact delta events:
+#   * 'game_result' (to everyone): {gameId, firstTeamPoints, secondTeamPoints}
+#   * 'ranking_update' (to the pool room): {poolId, gameId, changes: [{participantId, score, position, previousPosition}]}
+#   * 'guesses_count' (to the pool room): {poolId, gameId, count}
+# Events are emitted by the events queue background task, after the request is committed
+
+# Function to get the room name of a pool
+def pool_room(poolId):
+    return f'pool:{poolId}'
+
+# Event listener for when a client joins a pool room
+# Only authenticated participants of the pool can join it (other pools are reported as not found)
+@socketio.on('join_pool')
+def join_pool_room(data):
+    poolId = data.get('poolId') if isinstance(data, dict) else None
+    userId = socket_session.get('userId')
+    if userId is None: return {"success": False, "message": _("Authentication failed. Please login to access the resource.")}
+    if not isinstance(poolId, str): return {"success": False, "message": _("You must provide the 'poolId'")}
+    try:
+        poolParticipant = get_pool_participant(poolId, userId)
+        if poolParticipant is None or poolParticipant.participantId is None:
+            return {"success": False, "message": _("Pool not found")}
+    finally: db.session.remove()
+    join_room(pool_room(poolId))
+    return {"success": True}
+
+# Event listener for when a client leaves a pool room
+@socketio.on('leave_pool')
+def leave_pool_room(data):
+    poolId = data.get('poolId') if isinstance(data, dict) else None
+    if not isinstance(poolId, str): return {"success": False, "message": _("You must provide the 'poolId'")}
+    leave_room(pool_room(poolId))
+    return {"success": True}
+
+# Function to publish the results of games (one or many set at once), with the rankings changes of all of them
+#   * games: dicts with the game 'id', 'firstTeamPoints' and 'secondTeamPoints'
+#   * changes: rankings changes (see 'app.modules.pools.ranking.update_pools_rankings')
+def publish_games_results(games, changes):
+    events.publish(emit_games_results, games, changes)
+
+# Function to emit the games results to everyone and the rankings changes to each pool room
+# Changes of many games are emitted once for each pool, with all of the games IDs
+def emit_games_results(games, changes):
+    for game in games:
+        socketio.emit('game_result', {
+            "gameId": game['id'],
+            "firstTeamPoints": game['firstTeamPoints'],
+            "secondTeamPoints": game['secondTeamPoints'],
+        })
+    gameIds = {"gameId": games[0]['id']} if len(games) == 1 else {"gameIds": [game['id'] for game in games]}
+    # Grouping the changes by pool
+    pools = {}
+    for change in changes:
+        pools.setdefault(change['poolId'], []).append({
+            "participantId": change['participantId'],
+            "score": change['score'],
+            "position": change['position'],
+            "previousPosition": change['previousPosition'],
+        })
+    for poolId, poolChanges in pools.items():
+        socketio.emit('ranking_update', {
+            "poolId": poolId,
+            **gameIds,
+            "changes": poolChanges,
+        }, to=pool_room(poolId))
+
+# Function to publish the new guesses counts of games on a pool
+# Counts are coalesced: many guesses placed on the same game, before its count is emitted, emit it only once
+def publish_guesses(poolId, gameIds):
+    for gameId in gameIds:
+        events.publish(emit_guesses_count, poolId, gameId, key=('guesses_count', poolId, gameId))
+
+# Function to count the guesses placed on a game by a pool participants and emit it to the pool room
+def emit_guesses_count(poolId, gameId):
+    count = db.session.query(func.count(Guess.id)).\
+        join(Participant, Participant.id == Guess.participantId).\
+        filter(Participant.poolId == poolId, Guess.gameId == gameId).scalar()
+    socketio.emit('guesses_count', {
+        "poolId": poolId,
+        "gameId": gameId,
+        "count": count,
+    }, to=pool_room(poolId))
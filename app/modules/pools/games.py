@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct 22 14:17:52 2026
+
+@author: RenatoHenz
+
+Refs:
+    * SQLAlchemy Multiple VALUES: https://docs.sqlalchemy.org/en/14/core/dml.html#sqlalchemy.sql.expression.Insert.values
+    * Python CSV DictReader: https://docs.python.org/3/library/csv.html#csv.DictReader
+    * NDJSON: http://ndjson.org/
+
+"""
+
+# Required modules
+from flask_babel import _
+
+# SQLAlchemy functions
+from sqlalchemy import select, insert
+
+# Other dependencies
+from datetime import datetime
+import csv
+import json
+import time
+import cuid
+
+# Import module models
+from app.modules.pools.models import Game
+
+# Game table, for the bulk statements
+game = Game.__table__
+
+# Format of the games dates (the same as the create game form), although any ISO 8601 datetime is accepted
+GAME_DATE_FORMAT = '%Y-%m-%dT%H:%M:%S%z'
+# Fields of each game on the schedule
+TEAM_FIELDS = ('firstTeamCountryCode', 'secondTeamCountryCode')
+# Number of games checked against the existing ones at once, and inserted by each statement
+# (inserts are kept small, since some databases limit the number of parameters of a statement)
+IMPORT_CHUNK_SIZE = 1000
+IMPORT_INSERT_SIZE = 100
+# Maximum number of errors shown on the import report (all of them are counted)
+MAX_REPORTED_ERRORS = 100
+# Maximum number of games imported as a job, since they're kept on memory and stored on its payload
+# (bigger schedules are streamed by the inline import or the 'import-games' command)
+MAX_ASYNC_IMPORT_GAMES = 10000
+
+# Function to get the rows of a JSON schedule (a list of games, or an object with it on 'games')
+# Each row is returned along with its number (starting at 1)
+def iter_json_rows(data):
+    if isinstance(data, dict): data = data.get('games')
+    if not isinstance(data, list): raise ValueError(_("You must provide the list of games"))
+    return enumerate(data, start=1)
+
+# Function to get the rows of a NDJSON schedule (a game per line), reading it line by line
+# Lines which aren't valid JSON are returned as 'None'
+def iter_ndjson_rows(lines):
+    number = 0
+    for line in lines:
+        if not line.strip(): continue
+        number += 1
+        try: yield number, json.loads(line)
+        except ValueError: yield number, None
+
+# Function to get the rows of a CSV schedule (with a header naming the fields), reading it line by line
+def iter_csv_rows(lines):
+    return enumerate(csv.DictReader(lines), start=1)
+
+# Function to parse a game date, kept as the local wall-clock time
+# The database stores dates without time zone, so the offset is dropped (like 'POST /games' does),
+# and the same game is found however it was created
+def parse_game_date(value):
+    if not isinstance(value, str): raise ValueError(value)
+    try: date = datetime.strptime(value, GAME_DATE_FORMAT)
+    except ValueError: date = datetime.fromisoformat(value)
+    return date.replace(tzinfo=None)
+
+# Function to validate a game of the schedule
+# Returns its values (ready to be inserted) or the errors of each field
+def validate_game_row(item):
+    if not isinstance(item, dict): return None, _("Each game must be a JSON object")
+    values, errors = {}, {}
+    try: values['date'] = parse_game_date(item.get('date'))
+    except ValueError: errors['date'] = [_("'date' must be an ISO 8601 datetime.")]
+    for field in TEAM_FIELDS:
+        value = item.get(field)
+        value = value.strip() if isinstance(value, str) else ''
+        if not value or len(value) > game.c[field].type.length:
+            errors[field] = [_("'%(arg)s' must be a non-empty text of up to %(max)s characters.",
+                               arg=field, max=game.c[field].type.length)]
+        values[field] = value
+    return (None, errors) if errors else (values, None)
+
+# Function to insert the games which don't exist yet (same date and teams), with multi-row inserts
+# Returns the number of games inserted
+def insert_new_games(session, rows):
+    # Getting the existing games on the same dates (through the games date index)
+    existing = set(session.execute(
+        select(game.c.date, game.c.firstTeamCountryCode, game.c.secondTeamCountryCode).
+            where(game.c.date.in_({row['date'] for row in rows}))
+    ))
+    rows = [{"id": cuid.cuid(), **row} for row in rows
+            if (row['date'], row['firstTeamCountryCode'], row['secondTeamCountryCode']) not in existing]
+    for i in range(0, len(rows), IMPORT_INSERT_SIZE):
+        session.execute(insert(game).values(rows[i:i + IMPORT_INSERT_SIZE]))
+    return len(rows)
+
+# Function to import a games schedule, validating its rows in a single pass (so they can be streamed)
+# Valid games are inserted in chunks, skipping the ones which already exist (or are repeated on the schedule),
+# so importing the same schedule again doesn't create them twice. Everything is written on the given session,
+# to be committed at once by the caller
+# Returns a report with the number of rows, created games, duplicates, errors and throughput (rows per second)
+def import_games(session, rows):
+    start = time.perf_counter()
+    report = {"rows": 0, "created": 0, "duplicates": 0, "failed": 0, "errors": []}
+    seen = set()
+    chunk = []
+
+    # Function to insert the current chunk
+    def flush():
+        created = insert_new_games(session, chunk)
+        report['created'] += created
+        report['duplicates'] += len(chunk) - created
+        chunk.clear()
+
+    for number, item in rows:
+        report['rows'] += 1
+        values, errors = validate_game_row(item)
+        if errors is not None:
+            report['failed'] += 1
+            if len(report['errors']) < MAX_REPORTED_ERRORS:
+                report['errors'].append({"row": number, "message": errors})
+            continue
+        # Games repeated on the schedule are only inserted once
+        key = (values['date'], values['firstTeamCountryCode'], values['secondTeamCountryCode'])
+        if key in seen:
+            report['duplicates'] += 1
+            continue
+        seen.add(key)
+        chunk.append(values)
+        if len(chunk) >= IMPORT_CHUNK_SIZE: flush()
+    if chunk: flush()
+
+    seconds = time.perf_counter() - start
+    report['seconds'] = round(seconds, 3)
+    report['rowsPerSecond'] = round(report['rows'] / seconds, 1) if seconds else None
+    return report
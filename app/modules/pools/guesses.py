@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 15:04:22 2026
+
+@author: RenatoHenz
+
+Refs:
+    * SQLAlchemy MySQL INSERT...ON DUPLICATE KEY UPDATE: https://docs.sqlalchemy.org/en/14/dialects/mysql.html#insert-on-duplicate-key-update-upsert
+    * SQLAlchemy SQLite INSERT...ON CONFLICT: https://docs.sqlalchemy.org/en/14/dialects/sqlite.html#insert-on-conflict-upsert
+    * SQLAlchemy Savepoints: https://docs.sqlalchemy.org/en/14/orm/session_transaction.html#using-savepoint
+
+"""
+
+# SQLAlchemy functions
+from sqlalchemy import and_, func, bindparam
+from sqlalchemy.dialects import mysql, sqlite, postgresql
+from sqlalchemy.exc import IntegrityError
+
+# Other dependencies
+from datetime import datetime
+import pytz
+import cuid
+
+# Import module models
+from app.modules.pools.models import Pool, Participant, Game, Guess
+
+# Guess table, for the bulk statements
+guess = Guess.__table__
+
+# Maximum number of guesses sent at once on the bulk endpoint
+MAX_BULK_GUESSES = 100
+
+# Time zone of the games dates, which are stored as local wall-clock times (without time zone)
+GAMES_TIMEZONE = pytz.timezone('America/Sao_Paulo')
+
+# Function to get the current time on the games time zone, comparable to the stored games dates
+# It's the reference for everything depending on games having started (placing guesses, listing upcoming games)
+def get_games_now():
+    return datetime.now(GAMES_TIMEZONE).replace(tzinfo=None)
+
+# Function to check if guesses can't be placed anymore for a game, since its date has passed
+def is_past_game_date(gameDate):
+    return gameDate < get_games_now()
+
+# Function to get everything needed to place a user's guess with a single query:
+# the pool, the game (and its date) and the user's participant on the pool
+# Returns 'None' if the pool doesn't exist, and 'None' game or participant IDs if they weren't found
+def get_guess_target(session, poolId, gameId, userId):
+    return session.query(
+            Pool.id.label('poolId'),
+            Game.id.label('gameId'),
+            Game.date.label('gameDate'),
+            Participant.id.label('participantId'),
+        ).select_from(Pool).\
+        outerjoin(Game, Game.id == gameId).\
+        outerjoin(Participant, and_(
+            Participant.poolId == Pool.id,
+            Participant.userId == userId,
+        )).\
+        filter(Pool.id == poolId).first()
+
+# Function to get the dates of the given games with a single query, as a dict mapping their IDs to them
+def get_games_dates(session, gameIds):
+    if not gameIds: return {}
+    return dict(session.query(Game.id, Game.date).filter(Game.id.in_(list(gameIds))))
+
+# Function to create the guesses or update their points if the participants already placed them
+# It's a single statement, relying on the unique (participant, game) index, so concurrent requests
+# for the same guess never create duplicates (other databases use 'upsert_guesses_generic')
+#   * guesses: list of dicts with 'participantId', 'gameId', 'firstTeamPoints' and 'secondTeamPoints'
+def upsert_guesses(session, guesses):
+    if not guesses: return
+    rows = [{"id": cuid.cuid(), "score": 0, **row} for row in guesses]
+    dialect = session.connection().dialect.name
+
+    # Updating the points (and the update date) of the existing guesses
+    if dialect == 'mysql':
+        statement = mysql.insert(guess)
+        statement = statement.on_duplicate_key_update(
+            firstTeamPoints=statement.inserted.firstTeamPoints,
+            secondTeamPoints=statement.inserted.secondTeamPoints,
+            updatedAt=func.current_timestamp(),
+        )
+    elif dialect in ('sqlite', 'postgresql'):
+        statement = (sqlite if dialect == 'sqlite' else postgresql).insert(guess)
+        statement = statement.on_conflict_do_update(
+            index_elements=[guess.c.participantId, guess.c.gameId],
+            set_={
+                "firstTeamPoints": statement.excluded.firstTeamPoints,
+                "secondTeamPoints": statement.excluded.secondTeamPoints,
+                "updatedAt": func.current_timestamp(),
+            },
+        )
+    else: return upsert_guesses_generic(session, rows)
+
+    session.execute(statement, rows)
+
+# Function to get the (participant, game) keys of the given guesses which were already placed
+def get_placed_guesses(session, rows):
+    participantIds = {row['participantId'] for row in rows}
+    gameIds = {row['gameId'] for row in rows}
+    keys = {(row['participantId'], row['gameId']) for row in rows}
+    return {key for key in session.query(guess.c.participantId, guess.c.gameId).filter(
+        guess.c.participantId.in_(list(participantIds)), guess.c.gameId.in_(list(gameIds))) if tuple(key) in keys}
+
+# Function to create or update the guesses on databases without an upsert statement
+# The placed guesses are selected first, and the missing ones are inserted on a savepoint: if a concurrent
+# request inserted any of them meanwhile (breaking the unique index), they're selected again and updated instead
+#   * rows: guesses with their 'id' and 'score', as built by 'upsert_guesses'
+def upsert_guesses_generic(session, rows):
+    for attempt in range(2):
+        placed = get_placed_guesses(session, rows)
+        inserts = [row for row in rows if (row['participantId'], row['gameId']) not in placed]
+        try:
+            if inserts:
+                with session.begin_nested(): session.execute(guess.insert(), inserts)
+            break
+        except IntegrityError:
+            if attempt: raise
+
+    updates = [row for row in rows if (row['participantId'], row['gameId']) in placed]
+    if not updates: return
+    session.execute(
+        guess.update().
+        where(and_(guess.c.participantId == bindparam('_participantId'), guess.c.gameId == bindparam('_gameId'))).
+        values(firstTeamPoints=bindparam('_firstTeamPoints'), secondTeamPoints=bindparam('_secondTeamPoints'),
+               updatedAt=func.current_timestamp()),
+        [{"_participantId": row['participantId'], "_gameId": row['gameId'],
+          "_firstTeamPoints": row['firstTeamPoints'], "_secondTeamPoints": row['secondTeamPoints']} for row in updates])
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 23 11:20:44 2026
+
+@author: RenatoHenz
+"""
+
+# Import the unit of work callbacks
+from app.unit_of_work import after_commit
+
+# Responses cache
+from app.services.response_cache import invalidate
+
+# Import the jobs handlers registration
+from app.modules.jobs.runner import job_handler
+
+# Import module results and games schedule import
+from app.modules.pools.results import set_results
+from app.modules.pools.games import import_games, iter_json_rows
+
+# Job setting games results
+#   * payload: {"results": [{"gameId": ..., "firstTeamPoints": ..., "secondTeamPoints": ...}, ...]}
+@job_handler('games_results')
+def run_games_results(session, payload):
+    results = {item['gameId']: (item['firstTeamPoints'], item['secondTeamPoints']) for item in payload['results']}
+    games = set_results(session, results)
+    found = {game.id for game in games}
+    return {
+        "updatedGames": [game.as_dict() for game in games],
+        "notFound": [gameId for gameId in results if gameId not in found],
+    }
+
+# Job importing a games schedule
+#   * payload: {"games": [{"date": ..., "firstTeamCountryCode": ..., "secondTeamCountryCode": ...}, ...]}
+@job_handler('import_games')
+def run_import_games(session, payload):
+    report = import_games(session, iter_json_rows(payload))
+    if report['created']: after_commit(invalidate, 'games')
+    return {"report": report}
@@ -5,23 +5,15 @@ Created on Sat Nov 19 16:31:11 2022
 @author: RenatoHenz
 """
 
-# Getting config data
-from config import tz
-
 # Import the database object (db) from the main application module
 from app import db
 
+# Serializer for the models data
+from app.serializer import serialize
+
 # Other dependencies
 import cuid
 
-# Function to format an object (like datetime/date) to a string
-def default_object_string(object):
-    if str(type(object)) == "<class 'datetime.datetime'>":
-        return object.isoformat()
-    elif str(type(object)) == "<class 'datetime.date'>":
-        return object.strftime("%Y-%m-%d")
-    return object
-
 # Define a base model for other database tables to inherit
 class Base(db.Model):
     __abstract__ = True
@@ -31,6 +23,10 @@ class Base(db.Model):
     updatedAt = db.Column(db.DateTime, default=db.func.current_timestamp(),
                                         onupdate=db.func.current_timestamp())
 
+    # Returning data as dict (see 'app.serializer' for the 'fields' and 'include' options)
+    def as_dict(self, fields=None, include=None):
+        return serialize(self, fields=fields, include=include)
+
 # Define a Pool model using Base columns
 class Pool(Base):
     __tablename__ = 'pool'
@@ -54,22 +50,6 @@ class Pool(Base):
     def __repr__(self):
         return '<Pool %r>' % (self.id)
 
-    # Returning data as dict
-    def as_dict(self, timezone=tz):
-        # We also remove the password
-        data = {c.name: default_object_string(getattr(self, c.name))
-                for c in self.__table__.columns
-                if c.name != "hashpass"}
-        # Adding the related tables
-        for c in self.__dict__:
-            if 'app' in str(type(self.__dict__[c])):
-                data[c] = self.__dict__[c].as_dict(timezone)
-            # For many-to-many relationships
-            if 'InstrumentedList' in str(type(self.__dict__[c])):
-                # Adding the itens IDs
-                data[c+'_ids'] = [i.id for i in self.__dict__[c]]
-        return data
-
 # Define a Participant model using Base columns
 class Participant(Base):
     __tablename__ = 'participant'
@@ -83,6 +63,16 @@ class Participant(Base):
     # Relationships
     guesses = db.relationship('Guess', lazy="select", backref='participant')
 
+    # Indexes
+    __table_args__ = (
+        # A user joins each pool only once (also used to find a user's participant on a pool)
+        db.Index('uq_participant_poolId_userId', 'poolId', 'userId', unique=True),
+        # Finding the pools of which a user is participating
+        db.Index('ix_participant_userId', 'userId'),
+        # Sorting a pool participants by score (for the ranking positions)
+        db.Index('ix_participant_poolId_score', 'poolId', 'score', 'id'),
+    )
+
     # New instance instantiation procedure
     def __init__(self, userId, poolId, score=0):
         self.id = cuid.cuid()
@@ -93,22 +83,6 @@ class Participant(Base):
     def __repr__(self):
         return '<Participant %r>' % (self.id)
 
-    # Returning data as dict
-    def as_dict(self, timezone=tz):
-        # We also remove the password
-        data = {c.name: default_object_string(getattr(self, c.name))
-                for c in self.__table__.columns
-                if c.name != "hashpass"}
-        # Adding the related tables
-        for c in self.__dict__:
-            if 'app' in str(type(self.__dict__[c])):
-                data[c] = self.__dict__[c].as_dict(timezone)
-            # For many-to-many relationships
-            if 'InstrumentedList' in str(type(self.__dict__[c])):
-                # Adding the itens IDs
-                data[c+'_ids'] = [i.id for i in self.__dict__[c]]
-        return data
-
 # Define a Game model using Base columns
 class Game(Base):
     __tablename__ = 'game'
@@ -124,6 +98,12 @@ class Game(Base):
     # Relationships
     guesses = db.relationship('Guess', lazy="select", backref='game')
 
+    # Indexes
+    __table_args__ = (
+        # Listing the games by date (and ID, for the pagination)
+        db.Index('ix_game_date', 'date', 'id'),
+    )
+
     # New instance instantiation procedure
     def __init__(self, date, firstTeamCountryCode, secondTeamCountryCode, firstTeamPoints=None, secondTeamPoints=None):
         self.id = cuid.cuid()
@@ -136,22 +116,6 @@ class Game(Base):
     def __repr__(self):
         return '<Game %r>' % (self.id)
 
-    # Returning data as dict
-    def as_dict(self, timezone=tz):
-        # We also remove the password
-        data = {c.name: default_object_string(getattr(self, c.name))
-                for c in self.__table__.columns
-                if c.name != "hashpass"}
-        # Adding the related tables
-        for c in self.__dict__:
-            if 'app' in str(type(self.__dict__[c])):
-                data[c] = self.__dict__[c].as_dict(timezone)
-            # For many-to-many relationships
-            if 'InstrumentedList' in str(type(self.__dict__[c])):
-                # Adding the itens IDs
-                data[c+'_ids'] = [i.id for i in self.__dict__[c]]
-        return data
-
 # Define a Guess model using Base columns
 class Guess(Base):
     __tablename__ = 'guess'
@@ -164,6 +128,14 @@ class Guess(Base):
     participantId = db.Column(db.String(32), db.ForeignKey('participant.id'), nullable=False)
     score = db.Column(db.Integer, nullable=False, default=0)
 
+    # Indexes
+    __table_args__ = (
+        # A participant has only one guess for each game (also used to find it)
+        db.Index('uq_guess_participantId_gameId', 'participantId', 'gameId', unique=True),
+        # Finding the guesses of a game (like when scoring them)
+        db.Index('ix_guess_gameId', 'gameId'),
+    )
+
     # New instance instantiation procedure
     def __init__(self, firstTeamPoints, secondTeamPoints, gameId, participantId, score=0):
         self.id = cuid.cuid()
@@ -176,18 +148,43 @@ class Guess(Base):
     def __repr__(self):
         return '<Guess %r>' % (self.id)
 
-    # Returning data as dict
-    def as_dict(self, timezone=tz):
-        # We also remove the password
-        data = {c.name: default_object_string(getattr(self, c.name))
-                for c in self.__table__.columns
-                if c.name != "hashpass"}
-        # Adding the related tables
-        for c in self.__dict__:
-            if 'app' in str(type(self.__dict__[c])):
-                data[c] = self.__dict__[c].as_dict(timezone)
-            # For many-to-many relationships
-            if 'InstrumentedList' in str(type(self.__dict__[c])):
-                # Adding the itens IDs
-                data[c+'_ids'] = [i.id for i in self.__dict__[c]]
-        return data
+# Define a Ranking model using Base columns
+# It keeps the pools rankings already sorted, so they can be read without sorting the participants
+class Ranking(Base):
+    __tablename__ = 'ranking'
+
+    participantId = db.Column(db.String(32), db.ForeignKey('participant.id'), primary_key=True)
+
+    poolId = db.Column(db.String(32), db.ForeignKey('pool.id'), nullable=False)
+    userId = db.Column(db.String(32), db.ForeignKey('user.id'), nullable=False)
+    position = db.Column(db.Integer, nullable=False)
+    score = db.Column(db.Integer, nullable=False, default=0)
+    # Denormalized user data, to avoid loading the users when showing the ranking
+    userName = db.Column(db.String(256), nullable=False)
+    userAvatarUrl = db.Column(db.String(1024), nullable=True)
+
+    # Indexes
+    __table_args__ = (
+        # Reading the ranking by position (top, page or around a participant)
+        db.Index('ix_ranking_poolId_position', 'poolId', 'position'),
+        # Finding a user's position on the pool
+        db.Index('ix_ranking_poolId_userId', 'poolId', 'userId'),
+    )
+
+    # New instance instantiation procedure
+    def __init__(self, participantId, poolId, userId, position, userName, userAvatarUrl=None, score=0):
+        self.participantId = participantId
+        self.poolId = poolId
+        self.userId = userId
+        self.position = position
+        self.userName = userName
+        self.userAvatarUrl = userAvatarUrl
+        self.score = score
+
+    def __repr__(self):
+        return '<Ranking %r>' % (self.participantId)
+
+# Reading the ranking by score from a cursor (like when exporting it), on the same order as the positions
+# It's declared with the columns, since the score is sorted in descending order
+db.Index('ix_ranking_poolId_score_participantId', Ranking.poolId, Ranking.score.desc(), Ranking.participantId)
+
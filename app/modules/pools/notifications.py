@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Oct 21 09:26:51 2026
+
+@author: RenatoHenz
+
+Refs:
+    * Flask-SocketIO Background Tasks: https://flask-socketio.readthedocs.io/en/latest/api.html#flask_socketio.SocketIO.start_background_task
+    * Keyset Pagination: https://use-the-index-luke.com/no-offset
+    * Flask-Babel force_locale: https://python-babel.github.io/flask-babel/#flask_babel.force_locale
+
+"""
+
+# Required modules
+from flask_babel import _, force_locale
+
+# Other dependencies
+from contextlib import nullcontext
+import time
+
+# Import the application, the database object (db) and the push notifications dispatcher
+from app import app, db, push
+
+# Import services
+from app.services.metrics import register_metrics
+
+# Import module models
+from app.modules.pools.models import Pool, Participant, Game, Guess, Ranking
+from app.modules.users.models import User
+
+# Number of recipients read at once
+RECIPIENTS_PAGE_SIZE = 1000
+
+# Counters of the results notifications, with their throughput
+notification_stats = {"results": 0, "notifications": 0, "seconds": 0.0}
+register_metrics('resultNotifications', lambda: {
+    **notification_stats,
+    "perSecond": round(notification_stats['notifications'] / notification_stats['seconds'], 1)
+        if notification_stats['seconds'] else None,
+})
+
+# Function to get the recipients of a game result notification, page by page, keeping the memory bounded
+# Recipients are the participants who placed a guess on the game (and have a push notification token),
+# along with their points on the game, their pool and their new position on its ranking
+def iter_result_recipients(session, gameId, pageSize=RECIPIENTS_PAGE_SIZE):
+    after = ''
+    while True:
+        page = session.query(
+                Guess.id, Guess.score, User.fcmToken, User.locale,
+                Pool.id.label('poolId'), Pool.title, Ranking.position,
+            ).join(Participant, Participant.id == Guess.participantId).\
+            join(User, User.id == Participant.userId).\
+            join(Pool, Pool.id == Participant.poolId).\
+            outerjoin(Ranking, Ranking.participantId == Participant.id).\
+            filter(Guess.gameId == gameId, Guess.id > after, User.fcmToken.isnot(None)).\
+            order_by(Guess.id).limit(pageSize).all()
+        # Releasing the connection between the pages, since sending them might take a while
+        session.commit()
+        yield from page
+        if len(page) < pageSize: return
+        after = page[-1].id
+
+# Function to get the texts of the result notifications (with and without the ranking position) in a locale
+# Recipients without a locale get the default one
+def get_result_texts(locale):
+    with force_locale(locale) if locale else nullcontext():
+        return (_("You scored %(points)s points on %(pool)s"),
+                _("You scored %(points)s points on %(pool)s and you're now #%(position)s"))
+
+# Function to queue the personalized result notifications for the given recipients
+# It waits while the dispatcher has too many pending messages, so any number of recipients can be notified
+# Returns the number of notifications queued and their throughput (notifications per second)
+def queue_result_notifications(game, recipients):
+    start = time.perf_counter()
+    count = 0
+    # Translating the texts once for each locale of the recipients, filling them for each one
+    title = f"{game.firstTeamCountryCode} {game.firstTeamPoints} x {game.secondTeamPoints} {game.secondTeamCountryCode}"
+    texts = {}
+    for recipient in recipients:
+        if count % RECIPIENTS_PAGE_SIZE == 0: push.wait_for_capacity()
+        if recipient.locale not in texts: texts[recipient.locale] = get_result_texts(recipient.locale)
+        body, rankedBody = texts[recipient.locale]
+        values = {"points": recipient.score, "pool": recipient.title, "position": recipient.position}
+        push.enqueue([recipient.fcmToken], title, (body if recipient.position is None else rankedBody) % values,
+                     {"type": "game_result", "gameId": game.id, "poolId": recipient.poolId})
+        count += 1
+    seconds = time.perf_counter() - start
+    return {"gameId": game.id, "notifications": count, "seconds": round(seconds, 3),
+            "perSecond": round(count / seconds, 1) if seconds else None}
+
+# Function to notify the participants of a game result, after it was committed
+# The notifications are queued by a background task, so the request isn't blocked by them
+def publish_result_notifications(gameId):
+    if push.client is None: return
+    push.start_producer(notify_game_result, gameId)
+
+# Function to notify the participants of a game result (with the application context)
+# Returns the number of notifications queued and their throughput (see 'queue_result_notifications')
+def notify_game_result(gameId):
+    with app.app_context():
+        try:
+            game = db.session.query(Game).get(gameId)
+            if game is None: return None
+            result = queue_result_notifications(game, iter_result_recipients(db.session, gameId))
+        except Exception:
+            app.logger.exception("Game %s result notifications failed", gameId)
+            return None
+        notification_stats['results'] += 1
+        notification_stats['notifications'] += result['notifications']
+        notification_stats['seconds'] += result['seconds']
+        app.logger.info("Game %s result notifications: %s", gameId, result)
+        return result
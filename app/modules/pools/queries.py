@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 11:20:48 2026
+
+@author: RenatoHenz
+
+Refs:
+    * SQLAlchemy Window Functions: https://docs.sqlalchemy.org/en/14/core/tutorial.html#window-functions
+    * SQLAlchemy Relationship Loading Techniques: https://docs.sqlalchemy.org/en/14/orm/loading_relationships.html
+
+"""
+
+# SQLAlchemy functions
+from sqlalchemy import func, and_, or_
+from sqlalchemy.orm import joinedload
+
+# Import the database object (db) from the main application module
+from app import db
+
+# Import module models
+from app.modules.pools.models import Pool, Participant, Game, Guess
+from app.modules.users.models import User
+
+# Import the games reference time, shared with the guesses
+from app.modules.pools.guesses import get_games_now
+
+# Number of participants shown on the pools summaries
+SUMMARY_PARTICIPANTS = 4
+
+# Function to get the summary data of a list of pools
+# It takes a fixed number of queries, no matter how many pools are requested:
+# one for the pools (with their owners) and one for the participants count and first participants
+def get_pools_summaries(pools):
+    # If there are no pools, there's nothing else to query
+    if not pools: return []
+    poolIds = [pool.id for pool in pools]
+
+    # Numbering the participants of each pool, also counting them
+    numbered = db.session.query(
+            Participant.id.label('id'),
+            Participant.poolId.label('poolId'),
+            User.avatarUrl.label('avatarUrl'),
+            func.row_number().over(
+                partition_by=Participant.poolId,
+                order_by=(Participant.createdAt, Participant.id),
+            ).label('rowNumber'),
+            func.count(Participant.id).over(partition_by=Participant.poolId).label('count'),
+        ).join(User, User.id == Participant.userId).\
+        filter(Participant.poolId.in_(poolIds)).subquery()
+
+    # Getting only the first participants of each pool
+    rows = db.session.query(numbered).\
+        filter(numbered.c.rowNumber <= SUMMARY_PARTICIPANTS).\
+        order_by(numbered.c.poolId, numbered.c.rowNumber).all()
+
+    # Grouping the participants and counts by pool
+    participants = {poolId: [] for poolId in poolIds}
+    counts = {}
+    for row in rows:
+        participants[row.poolId].append({
+            "id": row.id,
+            "user": {
+                "avatarUrl": row.avatarUrl,
+            }
+        })
+        counts[row.poolId] = row.count
+
+    # Returning the pools data
+    return [{
+        "id": pool.id,
+        "title": pool.title,
+        "code": pool.code,
+        "createdAt": pool.createdAt,
+        "ownerId": pool.ownerId,
+        "participants": participants[pool.id],
+        "owner": {
+            "id": pool.owner.id,
+            "name": pool.owner.name,
+        } if pool.owner is not None else None,
+        "_count": {
+            "participants": counts.get(pool.id, 0),
+        }
+    } for pool in pools]
+
+# Function to get the pools of which a user is participating, with their owners already loaded
+def get_user_pools(userId):
+    return Pool.query.\
+        join(Participant, Participant.poolId == Pool.id).\
+        filter(Participant.userId == userId).\
+        options(joinedload(Pool.owner)).\
+        order_by(Participant.createdAt, Participant.id).all()
+
+# Function to get the pool and the user's participant ID on it with a single query
+# Returns 'None' if the pool doesn't exist, and a 'None' participant ID if the user isn't participating
+def get_pool_participant(poolId, userId):
+    return db.session.query(Pool.id.label('poolId'), Participant.id.label('participantId')).\
+        outerjoin(Participant, and_(
+            Participant.poolId == Pool.id,
+            Participant.userId == userId,
+        )).\
+        filter(Pool.id == poolId).first()
+
+# Columns returned for each game and guess on the games listing
+GAME_COLUMNS = [Game.id, Game.date, Game.firstTeamCountryCode, Game.secondTeamCountryCode,
+    Game.firstTeamPoints, Game.secondTeamPoints, Game.createdAt, Game.updatedAt]
+GUESS_COLUMNS = [Guess.id, Guess.firstTeamPoints, Guess.secondTeamPoints, Guess.gameId,
+    Guess.participantId, Guess.score, Guess.createdAt, Guess.updatedAt]
+
+# Function to get the games along with the participant's guesses with a single query
+# Games are listed from the latest to the earliest date, and can be filtered by:
+#   * since: games (or the participant's guesses on them) changed since the given datetime
+#   * status: 'upcoming' games (not started yet) or 'finished' games (with a result)
+#   * after: (date, id) of the last game of the previous page, for keyset pagination
+#   * limit: maximum number of games to be returned
+def get_games_with_guesses(participantId, since=None, status=None, after=None, limit=None):
+    # Joining the games with the participant's guesses (if any)
+    query = db.session.query(
+            *[column.label('game_' + column.key) for column in GAME_COLUMNS],
+            *[column.label('guess_' + column.key) for column in GUESS_COLUMNS],
+        ).outerjoin(Guess, and_(
+            Guess.gameId == Game.id,
+            Guess.participantId == participantId,
+        ))
+
+    # Getting only what changed since the given datetime
+    if since is not None:
+        query = query.filter(or_(Game.updatedAt >= since, Guess.updatedAt >= since))
+    # Filtering games by their status
+    if status == 'upcoming':
+        query = query.filter(Game.date > get_games_now())
+    elif status == 'finished':
+        query = query.filter(Game.firstTeamPoints.isnot(None), Game.secondTeamPoints.isnot(None))
+    # Starting right after the last game of the previous page
+    if after is not None:
+        afterDate, afterId = after
+        query = query.filter(or_(
+            Game.date < afterDate,
+            and_(Game.date == afterDate, Game.id < afterId),
+        ))
+
+    # Sorting by date (and ID, so games on the same date have a stable order)
+    query = query.order_by(Game.date.desc(), Game.id.desc())
+    if limit is not None: query = query.limit(limit)
+
+    # Building each game (and guess), with the datetimes encoded by the JSON provider
+    games = []
+    for row in query:
+        game = {column.key: getattr(row, 'game_' + column.key) for column in GAME_COLUMNS}
+        # If guess was found
+        if row.guess_id is not None:
+            game['guess'] = {column.key: getattr(row, 'guess_' + column.key) for column in GUESS_COLUMNS}
+        else: game['guess'] = None
+        games.append(game)
+
+    # Returning the games data
+    return games
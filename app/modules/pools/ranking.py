@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 13:05:31 2026
+
+@author: RenatoHenz
+
+Refs:
+    * SQLAlchemy Window Functions: https://docs.sqlalchemy.org/en/14/core/tutorial.html#window-functions
+    * SQLAlchemy ORM Events: https://docs.sqlalchemy.org/en/14/orm/events.html#sqlalchemy.orm.MapperEvents.after_update
+
+"""
+
+# SQLAlchemy functions
+from sqlalchemy import func, event, update, delete, insert, bindparam, select, inspect, or_, and_
+
+# Other dependencies
+import itertools
+
+# Import the database object (db) from the main application module
+from app import db
+
+# Import module models
+from app.modules.pools.models import Pool, Participant, Ranking
+from app.modules.users.models import User
+
+# Ranking table, for the bulk statements
+ranking = Ranking.__table__
+
+# Maximum number of pools whose rankings are read at once
+POOLS_BATCH_SIZE = 500
+
+# Function to get the ordering used for the rankings positions
+# Participants with the same score are sorted by their IDs, so positions are always unique and stable
+def ranking_order():
+    return (Participant.score.desc(), Participant.id.asc())
+
+# Function to lock the given pools until the transaction ends, so their rankings are written by a single
+# transaction at a time (and positions are never repeated or skipped). SQLite, which has no row locks,
+# already runs a single writing transaction at a time
+def lock_pools(session, poolIds):
+    session.query(Pool.id).filter(Pool.id.in_(list(poolIds))).order_by(Pool.id).with_for_update().all()
+
+# Function to add a new participant at the end of a pool ranking
+def add_participant(session, participant, user):
+    # Getting the last position on the pool ranking, once the pool is locked
+    # It's a locking read, which gets the latest position instead of the one on the transaction snapshot
+    lock_pools(session, [participant.poolId])
+    last = session.execute(
+        select(ranking.c.position).where(ranking.c.poolId == participant.poolId).
+            order_by(ranking.c.position.desc()).limit(1).with_for_update()
+    ).scalar()
+    # Adding the participant right after it
+    session.execute(insert(ranking).values(
+        participantId=participant.id,
+        poolId=participant.poolId,
+        userId=user.id,
+        position=(last or 0) + 1,
+        score=participant.score or 0,
+        userName=user.name,
+        userAvatarUrl=user.avatarUrl,
+    ))
+
+# Function to position a pool participants (sorted by the ranking order), starting at the given position
+# Only the rows whose position or score changed are added to the updates (and participants who aren't on the
+# ranking yet to the inserts), along with their changes
+def rank_participants(rows, start, stored, inserts, updates, changes):
+    for position, row in enumerate(rows, start):
+        previous = stored.get(row.id)
+        # New participants on the ranking
+        if previous is None:
+            inserts.append({
+                "participantId": row.id, "poolId": row.poolId, "userId": row.userId,
+                "position": position, "score": row.score,
+                "userName": row.name, "userAvatarUrl": row.avatarUrl,
+            })
+        # Participants who kept their position and score don't need to be written again
+        elif previous.position == position and previous.score == row.score: continue
+        else: updates.append({"_participantId": row.id, "_position": position, "_score": row.score})
+        changes.append({
+            "participantId": row.id,
+            "poolId": row.poolId,
+            "score": row.score,
+            "position": position,
+            "previousPosition": previous.position if previous is not None else None,
+        })
+
+# Function to write the rankings changes with bulk statements
+def write_rankings(session, inserts, updates):
+    if updates:
+        session.execute(
+            update(ranking).
+                where(ranking.c.participantId == bindparam('_participantId')).
+                values(position=bindparam('_position'), score=bindparam('_score')),
+            updates
+        )
+    if inserts: session.execute(insert(ranking), inserts)
+
+# Function to update the rankings of the pools where the given participants (whose scores have changed) are
+# Only the positions within the scores band of the changed participants are updated: from the lowest to
+# the highest of their previous and current scores. Participants above it keep their positions, so the ones
+# on the band take the same positions they had, sorted by their current scores, and the ones below it
+# keep theirs too
+# The changes are returned as a list (see 'update_pools_rankings')
+def update_participants_rankings(session, participantIds):
+    participantIds = list(participantIds)
+    if not participantIds: return []
+    # Locking the pools of the participants
+    poolIds = sorted(poolId for (poolId,) in session.query(Participant.poolId).
+        filter(Participant.id.in_(participantIds)).distinct())
+    lock_pools(session, poolIds)
+
+    # Getting the current and the stored (previous) scores of the participants, with locking reads
+    current = session.query(Participant.id, Participant.poolId, Participant.score).\
+        filter(Participant.id.in_(participantIds)).with_for_update().all()
+    stored = dict(session.execute(select(ranking.c.participantId, ranking.c.score).
+        where(ranking.c.participantId.in_(participantIds)).with_for_update()).all())
+
+    # Getting the band of each pool
+    # Pools with participants who aren't on their ranking yet are fully updated instead
+    bands = {}
+    missing = set()
+    for row in current:
+        previous = stored.get(row.id)
+        if previous is None: missing.add(row.poolId)
+        elif previous != row.score:
+            low, high = bands.get(row.poolId, (row.score, row.score))
+            bands[row.poolId] = (min(low, row.score, previous), max(high, row.score, previous))
+    for poolId in missing: bands.pop(poolId, None)
+
+    # Updating the bands, a batch of pools at a time
+    changes = update_pools_rankings(session, sorted(missing))
+    bands = list(bands.items())
+    for i in range(0, len(bands), POOLS_BATCH_SIZE):
+        changes.extend(update_rankings_bands(session, dict(bands[i:i + POOLS_BATCH_SIZE])))
+    return changes
+
+# Function to update the positions within the scores bands of the given pools (see 'update_participants_rankings')
+#   * bands: dict mapping the pools IDs to their (lowest, highest) scores
+def update_rankings_bands(session, bands):
+    # Getting the participants currently on the bands, sorted like the positions
+    rows = session.query(
+            Participant.id, Participant.poolId, Participant.userId, Participant.score,
+            User.name, User.avatarUrl,
+        ).join(User, User.id == Participant.userId).\
+        filter(or_(*(and_(Participant.poolId == poolId, Participant.score.between(low, high))
+                     for poolId, (low, high) in bands.items()))).\
+        order_by(Participant.poolId, *ranking_order()).with_for_update().all()
+    # Getting the stored rows on the bands (by pool), which are the same participants with their previous scores
+    stored = {}
+    for row in session.execute(
+        select(ranking.c.participantId, ranking.c.poolId, ranking.c.position, ranking.c.score).
+            where(or_(*(and_(ranking.c.poolId == poolId, ranking.c.score.between(low, high))
+                        for poolId, (low, high) in bands.items()))).with_for_update()
+    ): stored.setdefault(row.poolId, {})[row.participantId] = row
+
+    inserts = []
+    updates = []
+    changes = []
+    rebuild = []
+    for poolId, poolRows in itertools.groupby(rows, key=lambda row: row.poolId):
+        poolRows = list(poolRows)
+        poolStored = stored.get(poolId, {})
+        # Pools whose stored rows don't match their participants (like when other participants have changed
+        # their scores too) are fully updated instead
+        if {row.id for row in poolRows} != poolStored.keys():
+            rebuild.append(poolId)
+            continue
+        # The band starts at the first position it had
+        rank_participants(poolRows, min(row.position for row in poolStored.values()), poolStored,
+                          inserts, updates, changes)
+    write_rankings(session, inserts, updates)
+    return changes + update_pools_rankings(session, rebuild)
+
+# Function to update the whole rankings of the given pools (like when building them, or after participants
+# were removed). Rankings of pools with many participants should be kept up to date with
+# 'update_participants_rankings', which only updates the positions which might have changed
+# Only the rows whose position or score changed are written, and the changes are returned as a list
+# with the participant, pool, new score, new position and previous position (if any) of each one
+def update_pools_rankings(session, poolIds):
+    if not poolIds: return []
+    lock_pools(session, poolIds)
+
+    # Getting the participants, sorted like the positions, with a locking read
+    rows = session.query(
+            Participant.id, Participant.poolId, Participant.userId, Participant.score,
+            User.name, User.avatarUrl,
+        ).join(User, User.id == Participant.userId).\
+        filter(Participant.poolId.in_(poolIds)).\
+        order_by(Participant.poolId, *ranking_order()).with_for_update().all()
+
+    # Getting the stored positions
+    stored = {row.participantId: row for row in session.execute(
+        select(ranking.c.participantId, ranking.c.position, ranking.c.score).
+            where(ranking.c.poolId.in_(poolIds)).with_for_update()
+    )}
+
+    # Positioning the participants of each pool
+    inserts = []
+    updates = []
+    changes = []
+    for poolId, poolRows in itertools.groupby(rows, key=lambda row: row.poolId):
+        poolRows = list(poolRows)
+        rank_participants(poolRows, 1, stored, inserts, updates, changes)
+        for row in poolRows: stored.pop(row.id, None)
+
+    # Removing participants who are no longer on the pools
+    if stored:
+        session.execute(delete(ranking).where(ranking.c.participantId.in_(list(stored.keys()))))
+    write_rankings(session, inserts, updates)
+
+    # Returning the changes
+    return changes
+
+# Function to get a pool along with the number of participants on its ranking
+# Since positions are never repeated or skipped, the number of participants is the last position, found through
+# the ranking index. It only reads: pools whose ranking wasn't built yet (like pools created before rankings existed)
+# have no participants on it until 'flask upgrade-db' builds it
+def get_pool_with_ranking_size(poolId):
+    size = select(func.max(Ranking.position)).where(Ranking.poolId == Pool.id).scalar_subquery()
+    return db.session.query(Pool, size.label('size')).filter(Pool.id == poolId).first()
+
+# Function to get the rows of a pool ranking, sorted by position
+# Rows can be limited to a range of positions (from 'first' to 'last') or to the positions around a user
+def get_ranking_rows(poolId, first=None, last=None, aroundUserId=None, distance=None):
+    query = Ranking.query.filter(Ranking.poolId == poolId)
+    # Getting the positions from 'first' to 'last'
+    if first is not None: query = query.filter(Ranking.position >= first)
+    if last is not None: query = query.filter(Ranking.position <= last)
+    # Getting the positions around the user's one
+    if aroundUserId is not None:
+        userPosition = select(Ranking.position).\
+            where(Ranking.poolId == poolId, Ranking.userId == aroundUserId).\
+            scalar_subquery()
+        query = query.filter(Ranking.position.between(userPosition - distance, userPosition + distance))
+    # Returning the ranking rows
+    return query.order_by(Ranking.position).all()
+
+# Function to iterate over a pool ranking in chunks of rows, sorted like the positions (score, then participant ID)
+# Rows are read from a server-side cursor, so the memory stays bounded no matter how big the pool is
+# The ranking can start after a cursor (the score and participant ID of the last row read), and be limited
+def iter_ranking_chunks(session, poolId, afterScore=None, afterId=None, limit=None, chunkSize=1000):
+    statement = select(
+            ranking.c.participantId, ranking.c.score, ranking.c.position,
+            ranking.c.userName, ranking.c.userAvatarUrl,
+        ).where(ranking.c.poolId == poolId).\
+        order_by(ranking.c.score.desc(), ranking.c.participantId.asc())
+    # Rows after the cursor: lower scores, or the same score with greater IDs
+    # (the first condition alone bounds the index range, so the rows before the cursor aren't read)
+    if afterScore is not None:
+        statement = statement.where(ranking.c.score <= afterScore,
+            or_(ranking.c.score < afterScore, ranking.c.participantId > afterId))
+    if limit is not None: statement = statement.limit(limit)
+    result = session.execute(statement, execution_options={"stream_results": True})
+    try: yield from result.partitions(chunkSize)
+    finally: result.close()
+
+# Keeping the denormalized user data on the rankings up to date
+@event.listens_for(User, 'after_update')
+def update_rankings_user_data(mapper, connection, target):
+    # Checking if the user data shown on the rankings has changed
+    state = inspect(target)
+    if not (state.attrs.name.history.has_changes() or state.attrs.avatarUrl.history.has_changes()): return
+    # Updating the user data on all of its rankings rows
+    connection.execute(
+        update(ranking).
+            where(ranking.c.userId == target.id).
+            values(userName=target.name, userAvatarUrl=target.avatarUrl)
+    )
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 23 11:03:19 2026
+
+@author: RenatoHenz
+"""
+
+# Import the unit of work callbacks
+from app.unit_of_work import after_commit
+
+# Responses cache
+from app.services.response_cache import invalidate
+
+# Import module scoring engine, rankings, Socket.IO events and push notifications
+from app.modules.pools.scoring import update_games_results
+from app.modules.pools.ranking import update_participants_rankings
+from app.modules.pools.events import publish_games_results
+from app.modules.pools.notifications import publish_result_notifications
+
+# Function to set games results (used by the routes and by the jobs), rescoring their guesses and updating the
+# rankings of the pools where scores have changed, once for all games
+# Once the transaction is committed, the cached responses are invalidated, the results and rankings changes are
+# sent to the pools rooms and the participants are notified
+#   * results: dict mapping the games IDs to their (first team, second team) points
+# Returns the updated games (games which weren't found are left out)
+def set_results(session, results):
+    games, deltas = update_games_results(session, results)
+    if not games: return games
+    changes = update_participants_rankings(session, deltas.keys())
+    # Flushing the changes and reloading the games, so the returned data has the values set by the database
+    session.flush()
+    for game in games: session.refresh(game)
+
+    after_commit(invalidate, 'games', *{f"pool:{change['poolId']}" for change in changes})
+    after_commit(publish_games_results, [{
+        "id": game.id,
+        "firstTeamPoints": game.firstTeamPoints,
+        "secondTeamPoints": game.secondTeamPoints,
+    } for game in games], changes)
+    for game in games: after_commit(publish_result_notifications, game.id)
+    return games
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 09:12:40 2026
+
+@author: RenatoHenz
+
+Refs:
+    * SQLAlchemy Core Update: https://docs.sqlalchemy.org/en/14/core/dml.html#sqlalchemy.sql.expression.update
+    * Executing Multiple Statements: https://docs.sqlalchemy.org/en/14/tutorial/dbapi_transactions.html#sending-multiple-parameters
+    * NumPy Broadcasting: https://numpy.org/doc/stable/user/basics.broadcasting.html
+
+"""
+
+# SQLAlchemy functions
+from sqlalchemy import update, bindparam
+
+# NumPy for scoring guesses as arrays
+import numpy as np
+
+# Getting config data
+from config import SCORING_RULES
+
+# Import module models
+from app.modules.pools.models import Participant, Game, Guess
+
+# Maximum number of games results set at once on the bulk endpoint
+MAX_BULK_RESULTS = 100
+
+# Default points given for each kind of hit on a guess
+DEFAULT_SCORING_RULES = {
+    # Both team points guessed right (replaces every other rule)
+    'exact': 5,
+    # Draw guessed right
+    'draw': 3,
+    # Match winner guessed right
+    'winner': 2,
+    # One of the teams points guessed right
+    'oneSide': 1,
+}
+
+# Function to get a complete rules table, filling the missing rules with the default ones
+def get_scoring_rules(rules=None):
+    if rules is None: rules = SCORING_RULES
+    return {**DEFAULT_SCORING_RULES, **(rules or {})}
+
+# Function to calculate guess score
+def calculate_guess_score(guess, game, rules=None):
+    # Getting the rules table
+    rules = get_scoring_rules(rules)
+    # Initializing the user points
+    points = 0
+    # If game already has a result
+    if (game.firstTeamPoints is not None and game.secondTeamPoints is not None):
+        # If participant guesses both team points right
+        if (guess.firstTeamPoints == game.firstTeamPoints and guess.secondTeamPoints == game.secondTeamPoints):
+            return rules['exact']
+        # If participant guesses correctly that there was a draw in the match
+        if (guess.firstTeamPoints == guess.secondTeamPoints and game.firstTeamPoints == game.secondTeamPoints):
+            points += rules['draw']
+        # If participant guesses correctly which team won the match
+        if ((guess.firstTeamPoints > guess.secondTeamPoints and game.firstTeamPoints > game.secondTeamPoints) or
+            (guess.firstTeamPoints < guess.secondTeamPoints and game.firstTeamPoints < game.secondTeamPoints)):
+            points += rules['winner']
+        # If participant guesses correctly one of the teams points
+        if (guess.firstTeamPoints == game.firstTeamPoints or guess.secondTeamPoints == game.secondTeamPoints):
+            points += rules['oneSide']
+    # Returning the user points
+    return points
+
+# Function to calculate the scores of many guesses at once
+# Guesses points are given as arrays, while the game result can be given either as single values
+# (all guesses for the same game) or as arrays aligned with the guesses (guesses for different games)
+# A missing result ('None' or a negative value) scores zero points, as in 'calculate_guess_score'
+def score_guesses(firstTeamPoints, secondTeamPoints, gameFirstTeamPoints, gameSecondTeamPoints, rules=None):
+    # Getting the rules table
+    rules = get_scoring_rules(rules)
+
+    # Converting the inputs to integer arrays
+    first = np.asarray(firstTeamPoints, dtype=np.int16)
+    second = np.asarray(secondTeamPoints, dtype=np.int16)
+    gameFirst = np.asarray(-1 if gameFirstTeamPoints is None else gameFirstTeamPoints, dtype=np.int16)
+    gameSecond = np.asarray(-1 if gameSecondTeamPoints is None else gameSecondTeamPoints, dtype=np.int16)
+
+    # Checking each kind of hit for all guesses
+    hasResult = (gameFirst >= 0) & (gameSecond >= 0)
+    exact = (first == gameFirst) & (second == gameSecond)
+    draw = (first == second) & (gameFirst == gameSecond)
+    winner = (np.sign(first - second) == np.sign(gameFirst - gameSecond)) & (gameFirst != gameSecond)
+    oneSide = (first == gameFirst) | (second == gameSecond)
+
+    # Summing up the points of the partial hits, replacing them when the guess is exact
+    scores = draw * rules['draw'] + winner * rules['winner'] + oneSide * rules['oneSide']
+    scores = np.where(exact, rules['exact'], scores)
+
+    # Returning the scores (zero for games without a result)
+    return np.where(hasResult, scores, 0).astype(np.int32)
+
+# Function to rescore the guesses of a single game
+def rescore_game(session, game):
+    return rescore_games(session, [game])
+
+# Function to rescore the guesses of a set of games, updating the participants totals
+# It only touches the guesses placed on the given games and the participants who placed them,
+# applying the difference between the new and the stored guess score to the participant total
+def rescore_games(session, games):
+    # Mapping the games by their IDs
+    games = {game.id: game for game in games}
+    if not games: return {}
+
+    # Getting only the guesses placed on the changed games (with their current score)
+    guesses = session.query(
+            Guess.id, Guess.participantId, Guess.gameId,
+            Guess.firstTeamPoints, Guess.secondTeamPoints, Guess.score,
+        ).filter(Guess.gameId.in_(games.keys())).all()
+
+    if not guesses: return {}
+
+    # Calculating the new scores for all guesses in a single pass
+    columns = list(zip(*guesses))
+    results = [games[gameId] for gameId in columns[2]]
+    scores = score_guesses(
+        columns[3], columns[4],
+        [-1 if game.firstTeamPoints is None else game.firstTeamPoints for game in results],
+        [-1 if game.secondTeamPoints is None else game.secondTeamPoints for game in results],
+    )
+    oldScores = np.asarray(columns[5], dtype=np.int32)
+
+    # Guesses which keep the same score don't need to be written again
+    guessScores = []
+    deltas = {}
+    for i in np.flatnonzero(scores != oldScores):
+        guess = guesses[i]
+        guessScores.append({"_id": guess.id, "_score": int(scores[i])})
+        deltas[guess.participantId] = deltas.get(guess.participantId, 0) + int(scores[i] - oldScores[i])
+
+    # Updating the guesses scores with a single bulk statement
+    # Rows are sorted by ID so concurrent rescorings lock the guesses in the same order
+    if guessScores:
+        guessScores.sort(key=lambda row: row["_id"])
+        session.execute(
+            update(Guess.__table__).
+                where(Guess.__table__.c.id == bindparam('_id')).
+                values(score=bindparam('_score')),
+            guessScores
+        )
+
+    # Removing participants whose total didn't change
+    deltas = {participantId: delta for participantId, delta in deltas.items() if delta != 0}
+
+    # Applying the differences to the participants totals with a single bulk statement
+    # Rows are sorted by ID so concurrent rescorings lock the participants in the same order
+    if deltas:
+        session.execute(
+            update(Participant.__table__).
+                where(Participant.__table__.c.id == bindparam('_id')).
+                values(score=Participant.__table__.c.score + bindparam('_delta')),
+            [{"_id": participantId, "_delta": deltas[participantId]} for participantId in sorted(deltas)]
+        )
+
+    # Returning the score difference for each affected participant
+    return deltas
+
+# Function to set the results of many games at once, rescoring all of their guesses in a single pass
+# and updating each participant total once (no matter on how many of the games they placed guesses)
+#   * results: dict mapping the games IDs to their (first team, second team) points
+# Everything is read and calculated before writing (without flushing the games early), so the rows are
+# only locked by the writes at the end of the transaction
+# Returns the updated games and the score difference for each affected participant
+def update_games_results(session, results):
+    with session.no_autoflush:
+        games = session.query(Game).filter(Game.id.in_(list(results))).all()
+        for game in games: game.firstTeamPoints, game.secondTeamPoints = results[game.id]
+        deltas = rescore_games(session, games)
+    return games, deltas
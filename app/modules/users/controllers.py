@@ -11,11 +11,12 @@ Refs:
 """
 
 # Import flask dependencies
-from flask import Blueprint, request, jsonify, g
+from flask import Blueprint, request, g
 from flask_babel import _
+from app.encoding import jsonify
 
 # Session maker to allow database communication
-from app import AppSession
+from app import app, AppSession, after_commit
 
 # Other dependencies
 import requests
@@ -24,6 +25,10 @@ import json
 # Middlewares
 from app.middleware import ensure_authenticated
 
+# Responses cache
+from app.services.response_cache import cached_response, invalidate
+from app.services.replicas import stick_to_primary
+
 # Import module forms
 from app.modules.users.forms import *
 
@@ -36,6 +41,7 @@ mod_user = Blueprint('users', __name__, url_prefix='/users')
 
 # Route to count number of users
 @mod_user.route('/count', methods=['GET'])
+@cached_response('users')
 def count_users():
     if request.method == 'GET':
         try:
@@ -98,9 +104,14 @@ def sign_up_in():
                         avatarUrl=userInfo['picture'],
                         )
                     session.add(user)
-                    # Flushing and comitting the changes
-                    session.flush()
-                    session.commit()
+                    # Invalidating the cached responses depending on the users, once the request is committed
+                    after_commit(invalidate, 'users')
+                    # The new user must be found right after signing up, even if the replicas haven't received it yet
+                    after_commit(stick_to_primary, user.id)
+
+                # Keeping the user's language for the push notifications sent outside the requests
+                locale = request.accept_languages.best_match(app.config['LANGUAGES'].keys())
+                if locale is not None: user.locale = locale
 
                 # Generating user's token
                 token = user.encode_auth_token(user.id)
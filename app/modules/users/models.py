@@ -5,15 +5,15 @@ Created on Sat Nov 19 16:31:11 2022
 @author: RenatoHenz
 """
 
-# Import flask dependencies
-import os
-
 # Getting config data
-from config import tz
+from config import AUTH_SECRETS, TOKEN_CACHE_SIZE
 
 # Import the database object (db) from the main application module
 from app import db
 
+# Serializer for the models data
+from app.serializer import serialize
+
 # JWT for token generation
 import jwt
 
@@ -22,14 +22,17 @@ from datetime import datetime, timedelta
 
 # Other dependencies
 import cuid
+import hashlib
+import time
 
-# Function to format an object (like datetime/date) to a string
-def default_object_string(object):
-    if str(type(object)) == "<class 'datetime.datetime'>":
-        return object.isoformat()
-    elif str(type(object)) == "<class 'datetime.date'>":
-        return object.strftime("%Y-%m-%d")
-    return object
+# Import services
+from app.services.cache import LRUCache
+from app.services.metrics import register_metrics
+
+# Cache for the already verified tokens, mapping the token digest to its subject and expiration
+# It's kept on the process memory, since looking for it on a shared cache would cost as much as verifying it
+token_cache = LRUCache('token', maxsize=TOKEN_CACHE_SIZE)
+register_metrics('tokenCache', token_cache.stats)
 
 # Define a base model for other database tables to inherit
 class Base(db.Model):
@@ -40,6 +43,10 @@ class Base(db.Model):
     updatedAt = db.Column(db.DateTime, default=db.func.current_timestamp(),
                                         onupdate=db.func.current_timestamp())
 
+    # Returning data as dict (see 'app.serializer' for the 'fields' and 'include' options)
+    def as_dict(self, fields=None, include=None):
+        return serialize(self, fields=fields, include=include)
+
 # Define a User model using Base columns
 class User(Base):
     __tablename__ = 'user'
@@ -52,6 +59,8 @@ class User(Base):
     googleId = db.Column(db.String(512), nullable=True, unique=True)
     avatarUrl = db.Column(db.String(1024), nullable=True)
     fcmToken = db.Column(db.String(512), nullable=True)
+    # Language of the push notifications (from the last sign in), the default one when it's not set
+    locale = db.Column(db.String(16), nullable=True)
 
     # Relationships
     participatingAt = db.relationship('Participant', lazy="select", backref='user')
@@ -69,22 +78,6 @@ class User(Base):
     def __repr__(self):
         return '<User %r>' % (self.id)
 
-    # Returning data as dict
-    def as_dict(self, timezone=tz):
-        # We also remove the password
-        data = {c.name: default_object_string(getattr(self, c.name))
-                for c in self.__table__.columns
-                if c.name != "hashpass"}
-        # Adding the related tables
-        for c in self.__dict__:
-            if 'app' in str(type(self.__dict__[c])):
-                data[c] = self.__dict__[c].as_dict(timezone)
-            # For many-to-many relationships
-            if 'InstrumentedList' in str(type(self.__dict__[c])):
-                # Adding the itens IDs
-                data[c+'_ids'] = [i.id for i in self.__dict__[c]]
-        return data
-
     # Enconding the authentication token
     def encode_auth_token(self, id):
         try:
@@ -93,22 +86,47 @@ class User(Base):
                 'iat': datetime.utcnow(),
                 'sub': id
             }
+            # Tokens are always signed with the current secret
             return jwt.encode(
                 payload,
-                os.environ.get('APP_SECRET'),
+                AUTH_SECRETS[0],
                 algorithm='HS256'
             )
         except Exception as e:
             return e
 
+    # Removing the FCM tokens rejected by the push notifications (like from uninstalled apps), so they aren't used again
+    # Users are updated one by one on a unit of work, so their cached data is also removed once committed
+    @staticmethod
+    def remove_fcm_tokens(tokens):
+        from app.unit_of_work import unit_of_work
+        with unit_of_work():
+            for user in User.query.filter(User.fcmToken.in_(list(tokens))): user.fcmToken = None
+
     # Decoding the authentication JWT
     @staticmethod
     def decode_auth_token(token):
-        try:
-            # For newer versions of PyJWT (>= 2.0.0), we must add the 'algorithms' arg
-            payload = jwt.decode(token, os.environ.get('APP_SECRET'), algorithms=['HS256'])
+        # Checking if the token has already been verified
+        digest = hashlib.sha256(token.encode()).digest()
+        cached = token_cache.get(digest)
+        if cached is not None:
+            subject, expiration = cached
+            # Expired tokens are removed from the cache and verified again (to get the right error)
+            if expiration > time.time(): return subject
+            token_cache.delete(digest)
+
+        # Trying each of the active secrets (the current one and the previous ones, after a rotation)
+        for secret in AUTH_SECRETS:
+            try:
+                # For newer versions of PyJWT (>= 2.0.0), we must add the 'algorithms' arg
+                payload = jwt.decode(token, secret, algorithms=['HS256'])
+            except jwt.ExpiredSignatureError:
+                return 'Token expired. Please log in again.'
+            except jwt.InvalidSignatureError:
+                continue
+            except jwt.InvalidTokenError:
+                return 'Invalid token. Please log in again.'
+            # Keeping the verified token on the cache until it expires
+            token_cache.set(digest, (payload['sub'], payload['exp']), ttl=payload['exp'] - time.time())
             return payload['sub']
-        except jwt.ExpiredSignatureError:
-            return 'Token expired. Please log in again.'
-        except jwt.InvalidTokenError:
-            return 'Invalid token. Please log in again.'
+        return 'Invalid token. Please log in again.'
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 09:34:02 2026
+
+@author: RenatoHenz
+
+Refs:
+    * SQLAlchemy Runtime Inspection API: https://docs.sqlalchemy.org/en/14/core/inspection.html
+    * Python operator.attrgetter: https://docs.python.org/3/library/operator.html#operator.attrgetter
+
+"""
+
+# SQLAlchemy functions
+from sqlalchemy import inspect, types
+
+# Other dependencies
+from operator import attrgetter
+
+# Function to format a datetime to a string
+def format_datetime(value):
+    return value.isoformat() if value is not None else None
+
+# Function to format a date to a string
+def format_date(value):
+    return value.strftime("%Y-%m-%d") if value is not None else None
+
+# Function to get the formatter for a column type ('None' when values are returned as they are)
+def get_formatter(columnType):
+    if isinstance(columnType, types.DateTime): return format_datetime
+    if isinstance(columnType, types.Date): return format_date
+    return None
+
+# Define a serialization plan for a model
+# Columns accessors, formatters and relationships are found once, so serializing an object
+# only reads its attributes, with no reflection
+class SerializationPlan():
+    def __init__(self, model):
+        mapper = inspect(model)
+        # Columns, with their accessors and formatters
+        self.columns = [(prop.key, attrgetter(prop.key), get_formatter(prop.columns[0].type))
+                        for prop in mapper.column_attrs]
+        # Relationships, and whether they hold a list of objects
+        self.relationships = {rel.key: rel.uselist for rel in mapper.relationships}
+
+    # Serializing an object
+    #   * fields: names of the columns to be returned (all of them by default)
+    #   * include: relationships to be returned, as a list of names or a dict mapping each name to the
+    #     options ('fields' and 'include') for the related objects. When it's not provided, the
+    #     relationships already loaded are returned (objects as dicts and lists as their IDs)
+    def serialize(self, obj, fields=None, include=None):
+        # Adding the columns, reading the loaded values straight from the object state
+        # (expired or deferred ones go through the attribute, so they're loaded as usual)
+        state = obj.__dict__
+        data = {}
+        for key, getter, formatter in self.columns:
+            if fields is not None and key not in fields: continue
+            value = state[key] if key in state else getter(obj)
+            data[key] = formatter(value) if formatter is not None else value
+
+        # Adding the relationships already loaded
+        if include is None:
+            for key, uselist in self.relationships.items():
+                if key not in obj.__dict__: continue
+                related = obj.__dict__[key]
+                if uselist: data[key + '_ids'] = [item.id for item in related]
+                elif related is not None: data[key] = serialize(related)
+            return data
+
+        # Adding the requested relationships
+        if not isinstance(include, dict): include = {key: {} for key in include}
+        for key, options in include.items():
+            if key not in self.relationships: raise KeyError(f"Unknown relationship: {key}")
+            related = getattr(obj, key)
+            options = options if isinstance(options, dict) else {}
+            if self.relationships[key]:
+                data[key] = [serialize(item, options.get('fields'), options.get('include', ()))
+                             for item in related]
+            else:
+                data[key] = serialize(related, options.get('fields'), options.get('include', ())) \
+                    if related is not None else None
+        return data
+
+# Serialization plans for each model
+plans = {}
+
+# Function to get the serialization plan for a model
+def get_plan(model):
+    plan = plans.get(model)
+    if plan is None: plan = plans[model] = SerializationPlan(model)
+    return plan
+
+# Function to build the serialization plans for all models of a declarative base
+def build_plans(base):
+    for mapper in base.registry.mappers: get_plan(mapper.class_)
+
+# Function to serialize an object according to its model plan
+def serialize(obj, fields=None, include=None):
+    return get_plan(type(obj)).serialize(obj, fields, include)
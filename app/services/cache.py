@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 14:21:09 2026
+
+@author: RenatoHenz
+
+Refs:
+    * Python OrderedDict: https://docs.python.org/3/library/collections.html#collections.OrderedDict
+    * Redis Python Client: https://redis-py.readthedocs.io/en/stable/
+
+"""
+
+# Other dependencies
+from collections import OrderedDict
+import threading
+import pickle
+import time
+
+# Sentinel for values not found on the cache (since 'None' might be a cached value)
+MISSING = object()
+
+# Define a base cache, with the hit/miss counters
+class Cache():
+    def __init__(self, namespace, ttl=None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # Getting a value or the 'default' one if it's not found (or expired)
+    def get(self, key, default=None):
+        value = self._get(key)
+        if value is MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    # Getting the cache counters
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hitRatio": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+# Define a cache stored on the process memory, with a maximum size and a time to live for its entries
+# The least recently used entries are evicted when the cache is full
+class LRUCache(Cache):
+    def __init__(self, namespace, maxsize=1024, ttl=None):
+        super().__init__(namespace, ttl)
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            item = self._data.get(key, MISSING)
+            if item is MISSING: return MISSING
+            value, expiresAt = item
+            # Removing expired entries
+            if expiresAt is not None and expiresAt <= time.monotonic():
+                del self._data[key]
+                return MISSING
+            # Marking the entry as recently used
+            self._data.move_to_end(key)
+            return value
+
+    # Setting a value, with an optional time to live (in seconds) which replaces the default one
+    def set(self, key, value, ttl=None):
+        ttl = ttl if ttl is not None else self.ttl
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl if ttl is not None else None)
+            self._data.move_to_end(key)
+            # Evicting the least recently used entries
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        return {**super().stats(), "size": len(self._data), "maxsize": self.maxsize}
+
+# Define a cache stored on a Redis server, which can be shared by many processes (like gunicorn workers)
+# A client with the same interface (like a local stand-in for tests) can be provided instead of the URL
+# Hit/miss counters are kept by each process
+class RedisCache(Cache):
+    def __init__(self, namespace, url=None, ttl=None, client=None):
+        super().__init__(namespace, ttl)
+        if client is None:
+            # Redis is only required when this backend is selected
+            import redis
+            client = redis.Redis.from_url(url)
+        self._client = client
+
+    def _key(self, key):
+        return f"{self.namespace}:{key}"
+
+    def _get(self, key):
+        value = self._client.get(self._key(key))
+        return pickle.loads(value) if value is not None else MISSING
+
+    # Setting a value, with an optional time to live (in seconds) which replaces the default one
+    def set(self, key, value, ttl=None):
+        ttl = ttl if ttl is not None else self.ttl
+        self._client.set(self._key(key), pickle.dumps(value), ex=max(int(ttl), 1) if ttl is not None else None)
+
+    def delete(self, key):
+        self._client.delete(self._key(key))
+
+    def clear(self):
+        for key in self._client.scan_iter(match=self._key('*')):
+            self._client.delete(key)
+
+# Function to create a cache according to its URL
+#   * memory:// for a cache on the process memory
+#   * redis://host:port/db for a cache on a Redis server
+def create_cache(url, namespace, maxsize=1024, ttl=None):
+    if url is None or url.startswith('memory://'):
+        return LRUCache(namespace, maxsize=maxsize, ttl=ttl)
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisCache(namespace, url, ttl=ttl)
+    raise ValueError(f"Unsupported cache URL: {url}")
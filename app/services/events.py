@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 11:02:45 2026
+
+@author: RenatoHenz
+
+Refs:
+    * Flask-SocketIO Background Tasks: https://flask-socketio.readthedocs.io/en/latest/api.html#flask_socketio.SocketIO.start_background_task
+    * Python deque: https://docs.python.org/3/library/collections.html#collections.deque
+
+"""
+
+# Other dependencies
+from collections import deque
+import time
+import traceback
+
+# Define a queue of tasks (like Socket.IO events to be emitted) run by a background task,
+# so the requests which publish them aren't blocked
+# Tasks published with a key are coalesced: while one is waiting, the same key isn't queued again
+class EventQueue():
+    def __init__(self, app=None, socketio=None, interval=0.05):
+        self.interval = interval
+        self.published = 0
+        self.coalesced = 0
+        self.processed = 0
+        self.failed = 0
+        self._tasks = deque()
+        self._pending = set()
+        self._running = False
+        self._worker = None
+        if app is not None: self.init_app(app, socketio)
+
+    def init_app(self, app, socketio):
+        self.app = app
+        self.socketio = socketio
+
+    # Adding a task to the queue, starting the background task on the first one (on each process)
+    def publish(self, function, *args, key=None):
+        if key is not None:
+            if key in self._pending:
+                self.coalesced += 1
+                return
+            self._pending.add(key)
+        self._tasks.append((function, args, key))
+        self.published += 1
+        if self._worker is None: self._worker = self.socketio.start_background_task(self._run)
+
+    # Running the queued tasks, sleeping (and letting other tasks run) while there are none
+    def _run(self):
+        while True:
+            while self._tasks:
+                function, args, key = self._tasks.popleft()
+                # New tasks with the same key can be queued again, since this one will run now
+                if key is not None: self._pending.discard(key)
+                self._running = True
+                try:
+                    with self.app.app_context(): function(*args)
+                    self.processed += 1
+                except Exception:
+                    self.failed += 1
+                    traceback.print_exc()
+                finally: self._running = False
+            self.socketio.sleep(self.interval)
+
+    # Waiting (and letting the background task run) until the queued tasks have run, like before the process exits
+    # Returns if the queue was drained before the timeout (in seconds)
+    def drain(self, timeout=None):
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while self._tasks or self._running:
+            if deadline is not None and time.monotonic() >= deadline: return False
+            self.socketio.sleep(self.interval)
+        return True
+
+    # Getting the queue counters
+    def stats(self):
+        return {
+            "published": self.published,
+            "coalesced": self.coalesced,
+            "processed": self.processed,
+            "failed": self.failed,
+            "queued": len(self._tasks),
+        }
@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 14:40:52 2026
+
+@author: RenatoHenz
+"""
+
+# Registered metrics sources (functions returning a dict with their current values)
+sources = {}
+
+# Function to register a metrics source under a name
+def register_metrics(name, source):
+    sources[name] = source
+
+# Function to collect the current values of all registered metrics
+def collect_metrics():
+    return {name: source() for name, source in sources.items()}
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 17:05:13 2026
+
+@author: RenatoHenz
+
+Refs:
+    * SQLAlchemy Connection Pooling: https://docs.sqlalchemy.org/en/14/core/pooling.html
+    * SQLAlchemy QueuePool: https://docs.sqlalchemy.org/en/14/core/pooling.html#sqlalchemy.pool.QueuePool
+
+"""
+
+# SQLAlchemy connection pool
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.exc import TimeoutError
+
+# Other dependencies
+import threading
+import time
+
+# Define a connection pool which measures how long each checkout waits for a connection
+# When the waits grow, the pool (size and overflow) is too small for the number of concurrent requests
+class TimedQueuePool(QueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.totalWait = 0.0
+        self.maxWait = 0.0
+        self._statsLock = threading.Lock()
+
+    # Getting a connection from the pool, measuring the time waited for it
+    def _do_get(self):
+        start = time.perf_counter()
+        try: return super()._do_get()
+        except TimeoutError:
+            with self._statsLock: self.timeouts += 1
+            raise
+        finally:
+            wait = time.perf_counter() - start
+            with self._statsLock:
+                self.checkouts += 1
+                self.totalWait += wait
+                self.maxWait = max(self.maxWait, wait)
+
+    # Getting the pool usage and checkout waits (in milliseconds)
+    def stats(self):
+        return {
+            "size": self.size(),
+            "maxOverflow": self._max_overflow,
+            "checkedOut": self.checkedout(),
+            "overflow": self.overflow(),
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "averageWait": round(self.totalWait / self.checkouts * 1000, 3) if self.checkouts else None,
+            "maxWait": round(self.maxWait * 1000, 3),
+        }
+
+# Function to get the metrics of an engine connection pool
+# Pools without measures (like the one used by SQLite) only show their status
+def get_pool_stats(engine):
+    pool = engine.pool
+    if isinstance(pool, TimedQueuePool): return pool.stats()
+    return {"status": pool.status()}
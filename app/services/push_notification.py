@@ -3,77 +3,231 @@
 Created on Fri Oct 28 11:04:22 2022
 
 @author: RenatoHenz
+
+Refs:
+    * FCM Send Messages in Batches: https://firebase.google.com/docs/cloud-messaging/send-message#send-a-batch-of-messages
+    * FCM Error Codes: https://firebase.google.com/docs/reference/fcm/rest/v1/ErrorCode
+    * Firebase Admin Messaging: https://firebase.google.com/docs/reference/admin/python/firebase_admin.messaging
+    * Python Logging: https://docs.python.org/3/library/logging.html
+
 """
 
 # Module to get the environment variables
 import os
 
-# Modules for Firebase
-from firebase_admin import messaging, credentials
-import firebase_admin
+# Other dependencies
+from collections import namedtuple
+import itertools
+import logging
+import time
 
 # Getting the required variables
 from config import BASE_DIR
 
-# Firebase Cloud Messaging
-if os.environ.get('PUSH_NOTIFICATION_DRIVER') == 'fcm':
-    # Getting Firebase credentials
-    creds = credentials.Certificate(BASE_DIR + os.sep + os.environ.get('FCM_CREDS_JSON_FILE'))
-    
-    # Initializing the Firebase app
-    default_app = firebase_admin.initialize_app(creds)
-
-    # Function to send a push notification for a specific token
-    def send_message(token, title, body, data=None):
-        # Creating the FCM message
-        message = messaging.Message(
-            notification=messaging.Notification(
-                title=title,
-                body=body,
-            ),
-            data=data,
-            token=token
-        )
-        # Sending the defined message
-        response = messaging.send(message)
-        # Showing server response and returning to the user
-        print(response)
-        return response
-
-    # Function to send a push notification for a set of tokens
-    def send_multicast_message(tokens, title, body, data=None):
-        # Checking if user has provided a lista of tokens
-        try: assert isinstance(tokens, list)
-        # If not, we'll inform about the error and return
-        except Exception as e:
-            print(e)
+# Logger of the push notifications (the application logger, when it's configured)
+logger = logging.getLogger(__name__)
+
+# Maximum number of messages sent by FCM at once
+FCM_BATCH_SIZE = 500
+
+# Status of each message sent, besides 'None' (success)
+# Invalid tokens (like from uninstalled apps) must not be used again, while temporary failures can be retried
+INVALID = 'invalid'
+RETRY = 'retry'
+FAILED = 'failed'
+
+# Define a push notification message (its data must be a tuple of string items, so equal messages can be coalesced)
+PushMessage = namedtuple('PushMessage', ['token', 'title', 'body', 'data'])
+
+# Define the Firebase Cloud Messaging client
+class FCMClient():
+    def __init__(self, credentialsFile):
+        # Modules for Firebase
+        from firebase_admin import messaging, credentials, exceptions
+        import firebase_admin
+        self.messaging = messaging
+        self.invalidErrors = (messaging.UnregisteredError, messaging.SenderIdMismatchError)
+        self.retryErrors = (exceptions.UnavailableError, exceptions.InternalError, messaging.QuotaExceededError)
+
+        # Initializing the Firebase app
+        firebase_admin.initialize_app(credentials.Certificate(credentialsFile))
+        # Newer SDKs replaced the batch endpoint by one request per message
+        self._send = getattr(messaging, 'send_each', None) or messaging.send_all
+
+    # Sending a batch of messages (up to 500), returning the status of each one
+    def send(self, messages):
+        response = self._send([self.messaging.Message(
+            notification=self.messaging.Notification(title=message.title, body=message.body),
+            data=dict(message.data) if message.data else None,
+            token=message.token,
+        ) for message in messages])
+        return [None if result.success else
+                INVALID if isinstance(result.exception, self.invalidErrors) else
+                RETRY if isinstance(result.exception, self.retryErrors) else FAILED
+                for result in response.responses]
+
+# Define a local client, which keeps the messages instead of sending them (like on tests)
+# Tokens on 'invalid' are rejected, and the first 'unavailable' calls fail, as if FCM was temporarily down
+# With 'keep' disabled, the messages are only counted (like on load tests)
+class FakePushClient():
+    def __init__(self, invalid=(), unavailable=0, keep=True):
+        self.invalid = set(invalid)
+        self.unavailable = unavailable
+        self.keep = keep
+        self.calls = 0
+        self.count = 0
+        self.sent = []
+
+    def send(self, messages):
+        self.calls += 1
+        if self.calls <= self.unavailable: raise ConnectionError("FCM is unavailable")
+        statuses = [INVALID if message.token in self.invalid else None for message in messages]
+        self.count += statuses.count(None)
+        if self.keep: self.sent.extend(message for message, status in zip(messages, statuses) if status is None)
+        return statuses
+
+# Function to create the push notification client for a driver ('fcm', 'fake', or 'none' to disable them)
+# Returns 'None' when they're disabled (also for an unknown driver), logging a warning so it isn't missed
+def create_push_client(driver):
+    if driver == 'fcm':
+        credentialsFile = os.environ.get('FCM_CREDS_JSON_FILE')
+        if not credentialsFile: raise ValueError("FCM_CREDS_JSON_FILE must be set to use the 'fcm' push driver")
+        return FCMClient(BASE_DIR + os.sep + credentialsFile)
+    if driver == 'fake': return FakePushClient()
+    if driver in (None, '', 'none'):
+        logger.warning("Push notifications are disabled (set PUSH_NOTIFICATION_DRIVER to enable them)")
+    else: logger.warning("Unknown push notifications driver %r, push notifications are disabled", driver)
+    return None
+
+# Define the push notifications dispatcher, which sends the queued messages from background tasks,
+# so requests only queue them. Messages are coalesced (the same message to the same token is sent once)
+# and sent in batches of up to 500 messages by a pool of workers. Failed messages are retried with
+# exponential backoff, and invalid tokens are handed to 'on_invalid_tokens' to be removed
+# Producers of many messages wait while there are 'max_pending' messages, keeping the memory bounded
+class PushDispatcher():
+    def __init__(self, app=None, socketio=None, client=None, on_invalid_tokens=None, workers=4,
+                 batch_size=FCM_BATCH_SIZE, retries=3, backoff=1.0, interval=0.05, max_pending=10000):
+        self.client = client
+        self.on_invalid_tokens = on_invalid_tokens
+        self.workers = workers
+        self.batch_size = min(batch_size, FCM_BATCH_SIZE)
+        self.retries = retries
+        self.backoff = backoff
+        self.interval = interval
+        self.max_pending = max_pending
+        self.queued = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.invalid = 0
+        # Pending messages, kept on a dict as an ordered set
+        self._pending = {}
+        self._sending = 0
+        self._producers = 0
+        self._workers = []
+        if app is not None: self.init_app(app, socketio)
+
+    def init_app(self, app, socketio):
+        self.app = app
+        self.socketio = socketio
+
+    # Queuing a message to a list of tokens, starting the workers on the first one (on each process)
+    # Messages are dropped when the push notifications are disabled
+    def enqueue(self, tokens, title, body, data=None):
+        if self.client is None:
+            logger.debug("Push notifications are disabled, dropping %s message(s)", len(tokens))
             return
+        data = tuple(sorted(data.items())) if data else None
+        for token in tokens:
+            message = PushMessage(token, title, body, data)
+            if message in self._pending: self.coalesced += 1
+            else:
+                self._pending[message] = None
+                self.queued += 1
+        if not self._workers:
+            self._workers = [self.socketio.start_background_task(self._run) for _ in range(self.workers)]
+
+    # Starting a background task which queues messages (like the notifications of a game result),
+    # which draining the dispatcher also waits for
+    def start_producer(self, function, *args):
+        self._producers += 1
+        def produce():
+            try: function(*args)
+            finally: self._producers -= 1
+        return self.socketio.start_background_task(produce)
+
+    # Waiting (and letting the workers run) while there are too many pending messages
+    def wait_for_capacity(self):
+        while len(self._pending) >= self.max_pending: self.socketio.sleep(self.interval)
+
+    # Taking the next batch of pending messages
+    def _take_batch(self):
+        batch = list(itertools.islice(self._pending, self.batch_size))
+        for message in batch: del self._pending[message]
+        return batch
+
+    # Sending the batches while there are pending messages, sleeping (and letting other tasks run) otherwise
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                self.socketio.sleep(self.interval)
+                continue
+            self._sending += 1
+            try: self._send(batch)
+            except Exception: logger.exception("Push notifications batch of %s message(s) failed", len(batch))
+            finally: self._sending -= 1
+
+    # Waiting (and letting the workers run) until the pending messages (and the ones being queued by the
+    # producers) were sent, like before the process exits. Returns if they were sent before the timeout (in seconds)
+    def drain(self, timeout=None):
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while self._pending or self._sending or self._producers:
+            if deadline is not None and time.monotonic() >= deadline: return False
+            self.socketio.sleep(self.interval)
+        return True
+
+    # Sending a batch, retrying the temporary failures and removing the invalid tokens
+    def _send(self, batch):
+        invalid = []
+        for attempt in range(self.retries + 1):
+            self.batches += 1
+            # When the whole batch fails (like a network error), all messages are retried
+            try: statuses = self.client.send(batch)
+            except Exception:
+                logger.warning("Push notifications batch failed (attempt %s of %s)", attempt + 1, self.retries + 1,
+                               exc_info=True)
+                statuses = [RETRY] * len(batch)
+
+            retry = []
+            for message, status in zip(batch, statuses):
+                if status is None: self.sent += 1
+                elif status == INVALID: invalid.append(message.token)
+                elif status == RETRY: retry.append(message)
+                else: self.failed += 1
+            batch = retry
+            if not batch or attempt == self.retries: break
+            self.retried += len(batch)
+            self.socketio.sleep(self.backoff * 2 ** attempt)
+        # Messages still failing after all retries are given up
+        self.failed += len(batch)
+
+        if invalid:
+            self.invalid += len(invalid)
+            if self.on_invalid_tokens is not None:
+                with self.app.app_context(): self.on_invalid_tokens(invalid)
 
-        # Creating the FCM message
-        message = messaging.MulticastMessage(
-            notification=messaging.Notification(
-                title=title,
-                body=body,
-            ),
-            data=data,
-            tokens=tokens
-        )
-        # Sending the defined message
-        response = messaging.send_multicast(message)
-        # Showing server response and returning to the user
-        print(response)
-        return response
-
-# If no driver was provided
-else:
-    # Function to send a push notification for a specific token
-    def send_message(token, title, body, data=None):
-        # Informing user about no driver provided
-        print('No driver provided')
-        return
-
-    # Function to send a push notification for a set of tokens
-    def send_multicast_message(tokens, title, body, data=None):
-        # Informing user about no driver provided
-        print('No driver provided')
-        return
+    # Getting the dispatcher counters
+    def stats(self):
+        return {
+            "queued": self.queued,
+            "coalesced": self.coalesced,
+            "pending": len(self._pending),
+            "batches": self.batches,
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            "invalid": self.invalid,
+        }
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 09:14:28 2026
+
+@author: RenatoHenz
+
+Refs:
+    * Flask-SQLAlchemy Customizing: https://flask-sqlalchemy.palletsprojects.com/en/2.x/customizing/
+    * SQLAlchemy Session.get_bind: https://docs.sqlalchemy.org/en/14/orm/session_api.html#sqlalchemy.orm.Session.get_bind
+    * Partitioning Strategies (custom get_bind): https://docs.sqlalchemy.org/en/14/orm/persistence_techniques.html#custom-vertical-partitioning
+
+"""
+
+# Required modules
+from flask import request, g, has_request_context
+
+# Flask-SQLAlchemy and SQLAlchemy functions
+from flask_sqlalchemy import SQLAlchemy, SignallingSession
+from sqlalchemy import create_engine, orm
+
+# Other dependencies
+import itertools
+
+# Getting config data
+from config import CACHE_URL, READ_YOUR_WRITES_SECONDS, USER_CACHE_SIZE, SQLALCHEMY_REPLICA_URIS
+
+# Import services
+from app.services.cache import create_cache
+from app.services.metrics import register_metrics
+
+# HTTP methods which don't change data, so they can read from the replicas
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Function to check if the stickiness is shared by every process, since the next requests of a user who
+# has just written something might be handled by another worker: replicas require a shared cache
+def check_sticky_cache(replicaUris, cacheUrl):
+    if replicaUris and (cacheUrl is None or cacheUrl.startswith('memory://')):
+        raise ValueError("Read replicas (SQL_REPLICAS) require a shared cache (CACHE_URL like redis://host:port/db)")
+
+# Users who have just written something, whose requests are sent to the primary database for a while,
+# so they read their own writes even if the replicas haven't received them yet
+check_sticky_cache(SQLALCHEMY_REPLICA_URIS, CACHE_URL)
+sticky_users = create_cache(CACHE_URL, 'sticky-user', maxsize=USER_CACHE_SIZE, ttl=READ_YOUR_WRITES_SECONDS)
+register_metrics('stickyUsers', sticky_users.stats)
+
+# Function to send a user's requests to the primary database during the stickiness window
+# (only needed when there are replicas)
+def stick_to_primary(userId):
+    if SQLALCHEMY_REPLICA_URIS and userId is not None: sticky_users.set(userId, True)
+
+# Function to check if the current request is from a user within the stickiness window
+def is_sticky_request():
+    userId = g.get('userId') if has_request_context() else None
+    return bool(SQLALCHEMY_REPLICA_URIS) and userId is not None and sticky_users.get(userId) is not None
+
+# Define a session which sends the reads of safe requests to a replica, and everything else to the primary
+# The database is chosen on the first statement and kept for the whole session, unless it writes something
+# (from then on, everything goes to the primary)
+class RoutingSession(SignallingSession):
+    def __init__(self, db, **options):
+        self.db = db
+        super().__init__(db, **options)
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or self.info.get('writes'): return super().get_bind(mapper, clause)
+        if 'replica' not in self.info: self.info['replica'] = self.db.choose_replica()
+        if self.info['replica'] is None: return super().get_bind(mapper, clause)
+        return self.info['replica']
+
+# Define the database object, with optional read replicas
+# Replicas are created from the 'SQLALCHEMY_REPLICA_URIS' config, with the same options as the primary
+class RoutingSQLAlchemy(SQLAlchemy):
+    def __init__(self, app=None, **kwargs):
+        self.replicas = []
+        self._nextReplica = None
+        super().__init__(app, **kwargs)
+
+    def init_app(self, app):
+        super().init_app(app)
+        self.replicas = [create_engine(uri, echo=app.config.get('SQLALCHEMY_ECHO', False),
+                                       **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+                         for uri in app.config.get('SQLALCHEMY_REPLICA_URIS', [])]
+        self._nextReplica = itertools.cycle(self.replicas) if self.replicas else None
+
+    def create_session(self, options):
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
+    # Function to choose the replica for the current request ('None' for the primary)
+    # Replicas are only used by safe requests from users without recent writes, and they're chosen in turns
+    def choose_replica(self):
+        if self._nextReplica is None or not has_request_context(): return None
+        if request.method not in SAFE_METHODS: return None
+        if is_sticky_request(): return None
+        g.readFromReplica = True
+        return next(self._nextReplica)
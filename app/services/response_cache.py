@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 15:48:26 2026
+
+@author: RenatoHenz
+
+Refs:
+    * HTTP Conditional Requests: https://developer.mozilla.org/en-US/docs/Web/HTTP/Conditional_requests
+    * Werkzeug Response: https://werkzeug.palletsprojects.com/en/2.0.x/wrappers/#werkzeug.wrappers.Response.make_conditional
+
+"""
+
+# Functools module
+from functools import wraps
+
+# Required modules
+from flask import request, g, make_response, Response
+from flask_babel import get_locale
+
+# Other dependencies
+import hashlib
+import uuid
+
+# Getting config data
+from config import CACHE_URL, RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL, READ_YOUR_WRITES_SECONDS
+
+# Import services
+from app.services.cache import create_cache
+from app.services.metrics import register_metrics
+from app.services.replicas import is_sticky_request
+
+# Cache for the read endpoints responses
+response_cache = create_cache(CACHE_URL, 'response', maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+register_metrics('responseCache', response_cache.stats)
+
+# Current version of each tag, which is part of the responses cache keys
+# Invalidating a tag changes its version, so every response cached with the previous one is never read again
+tag_versions = create_cache(CACHE_URL, 'response-tag', maxsize=RESPONSE_CACHE_SIZE)
+
+# Function to get the current version of a tag
+def get_tag_version(tag):
+    version = tag_versions.get(tag)
+    # Tags without a version (never used, or evicted from the cache) get a new one
+    if version is None:
+        version = uuid.uuid4().hex
+        tag_versions.set(tag, version)
+    return version
+
+# Function to invalidate every cached response depending on the given tags
+def invalidate(*tags):
+    for tag in tags: tag_versions.set(tag, uuid.uuid4().hex)
+
+# Decorator to cache the responses of a read endpoint
+# Tags are formatted with the route arguments (and '{user}' with the authenticated user ID),
+# so writes can invalidate only the responses depending on the changed data
+# Responses which depend on the authenticated user must be cached per user ('per_user' as 'True',
+# or as a function checking it for the current request)
+# Requests whose responses depend on the current time (which no write invalidates) skip the cache when
+# 'unless' (a function checking the current request) returns 'True'
+def cached_response(*tags, per_user=False, unless=None):
+    def decorator(func):
+        @wraps(func)
+        def cached_function(*args, **kwargs):
+            if unless is not None and unless(): return func(*args, **kwargs)
+
+            # Getting the tags for the current request
+            userId = g.user.id if 'user' in g else None
+            tagNames = [tag.format(user=userId, **kwargs) for tag in tags]
+            isPerUser = per_user() if callable(per_user) else per_user
+
+            # Building the cache key from the route, arguments, user, locale and tags versions
+            key = hashlib.sha1(repr((
+                request.path,
+                sorted(request.args.items(multi=True)),
+                userId if isPerUser else None,
+                str(get_locale()),
+                [get_tag_version(tag) for tag in tagNames],
+            )).encode()).hexdigest()
+
+            # Looking for the response on the cache
+            # Users who have just written something skip it, since it might have been read from a replica
+            entry = response_cache.get(key) if not is_sticky_request() else None
+            if entry is not None:
+                body, mimetype, etag = entry
+                response = Response(body, mimetype=mimetype)
+            # If it's not cached yet, we get it from the endpoint
+            else:
+                response = make_response(func(*args, **kwargs))
+                # Only successful responses are cached
+                if response.status_code != 200: return response
+                body = response.get_data()
+                etag = hashlib.sha1(body).hexdigest()
+                # Responses read from a replica might miss the latest writes, so they're kept only for the
+                # replication lag window (otherwise they could outlive the invalidation of those writes)
+                ttl = READ_YOUR_WRITES_SECONDS if g.get('readFromReplica') else None
+                response_cache.set(key, (body, response.mimetype, etag), ttl=ttl)
+
+            # Clients must revalidate the response, getting a '304 Not Modified' if it didn't change
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'private, no-cache' if isPerUser else 'no-cache'
+            return response.make_conditional(request)
+
+        return cached_function
+
+    return decorator
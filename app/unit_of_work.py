@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 18:20:37 2026
+
+@author: RenatoHenz
+
+Refs:
+    * Flask-SQLAlchemy Sessions: https://flask-sqlalchemy.palletsprojects.com/en/2.x/api/#sessions
+    * SQLAlchemy Session Events: https://docs.sqlalchemy.org/en/14/orm/events.html#session-events
+    * Flask Request Callbacks: https://flask.palletsprojects.com/en/2.0.x/api/#flask.Flask.after_request
+
+"""
+
+# SQLAlchemy events
+from sqlalchemy import event
+
+# Required modules
+from flask import g
+
+# Other dependencies
+from contextlib import contextmanager
+
+# Import the application and the database object (db) from the main application module
+from app import app, db
+
+# Import the JSON encoding
+from app.encoding import jsonify
+
+# Import the read replicas stickiness
+from app.services.replicas import stick_to_primary
+
+# Each request has a single session (Flask-SQLAlchemy's 'db.session'), shared by the middlewares and
+# controllers, and a single transaction, which is committed (or rolled back) once, after the request
+# Requests which haven't written anything (read only) aren't committed at all
+
+# Marking the session as written when objects are flushed
+@event.listens_for(db.session, 'after_flush')
+def mark_flushed(session, flush_context):
+    session.info['writes'] = True
+
+# Marking the session as written when insert, update or delete statements are executed (like the bulk ones)
+@event.listens_for(db.session, 'do_orm_execute')
+def mark_executed(state):
+    if state.is_insert or state.is_update or state.is_delete: state.session.info['writes'] = True
+
+# Forgetting the writes (and what should happen after them) when the transaction is rolled back
+@event.listens_for(db.session, 'after_rollback')
+def clear_writes(session):
+    session.info.pop('writes', None)
+    session.info.pop('afterCommit', None)
+
+# Function to run a function once the current transaction is committed (like invalidating cached responses)
+# It doesn't run if the transaction is rolled back
+def after_commit(function, *args, **kwargs):
+    db.session.info.setdefault('afterCommit', []).append((function, args, kwargs))
+
+# Function to commit the session, if it has written anything, and run the functions waiting for it
+def commit():
+    session = db.session
+    if not (session.info.get('writes') or session.new or session.dirty or session.deleted):
+        return False
+    session.commit()
+    callbacks = session.info.pop('afterCommit', [])
+    session.info.pop('writes', None)
+    for function, args, kwargs in callbacks: function(*args, **kwargs)
+    return True
+
+# Function to use the session as a unit of work outside of requests (like on commands)
+# It's committed when the block ends, or rolled back if something goes wrong
+@contextmanager
+def unit_of_work():
+    try:
+        yield db.session
+        commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+# Committing the request transaction, when it succeeded, before the response is sent
+# Failed requests (error status) are rolled back instead
+# Users who have written something read from the primary database for a while (see 'app.services.replicas')
+@app.after_request
+def commit_request(response):
+    if response.status_code >= 400:
+        db.session.rollback()
+        return response
+    try:
+        if commit(): stick_to_primary(g.get('userId'))
+    except Exception as e:
+        db.session.rollback()
+        response = jsonify({"message": str(e)})
+        response.status_code = 500
+    return response
+
+# Releasing the request session (rolling back anything left, like when an error wasn't handled)
+@app.teardown_request
+def remove_session(exception=None):
+    db.session.remove()
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 10:02:15 2026
+
+@author: RenatoHenz
+
+Benchmarks and load tests, which run against a temporary SQLite database (created when the package is
+imported and removed at exit), so they never write to the database set on '.env'. The other variables
+(like 'CACHE_URL' or 'SOCKETIO_MESSAGE_QUEUE') are still read from it.
+
+"""
+
+# Other dependencies
+import atexit
+import os
+import shutil
+import tempfile
+
+# Pointing the application to the temporary database before it's imported, since the config is read on import
+# ('.env' doesn't override the variables which are already set). Processes started by the benchmarks
+# (like the Socket.IO workers) inherit it
+BENCHMARK_DIR = tempfile.mkdtemp(prefix='nlw-copa-benchmarks-')
+atexit.register(shutil.rmtree, BENCHMARK_DIR, ignore_errors=True)
+os.environ.update({
+    'SQL_DRIVER': 'sqlite',
+    'SQL_DB': os.path.join(BENCHMARK_DIR, 'benchmark'),
+    'SQL_REPLICAS': '',
+})
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 15:10:37 2026
+
+@author: RenatoHenz
+
+Benchmark comparing the authentication token decoding with and without the verified tokens cache.
+It must be executed from the root directory, with the '.env' file set up:
+
+    (env) $ python -m benchmarks.auth [number of requests]
+
+"""
+
+# Other dependencies
+import os
+import sys
+import time
+
+# JWT for token verification
+import jwt
+
+# Import the user model and its tokens cache
+from app.modules.users.models import User, token_cache
+
+# Decoding the token as it was done before the cache (reading the secret and verifying it every time)
+def decode_without_cache(token):
+    payload = jwt.decode(token, os.environ.get('APP_SECRET'), algorithms=['HS256'])
+    return payload['sub']
+
+# Running the benchmark
+if __name__ == "__main__":
+    # Getting the number of requests to be simulated
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    # Generating a token, as done on login
+    token = User.encode_auth_token(None, 'ckbenchmarkuser0000000000')
+    token_cache.clear()
+
+    # Verifying the token on every request
+    start = time.perf_counter()
+    for _ in range(size): decode_without_cache(token)
+    uncached = time.perf_counter() - start
+
+    # Verifying it only once and then reading it from the cache
+    start = time.perf_counter()
+    for _ in range(size): User.decode_auth_token(token)
+    cached = time.perf_counter() - start
+
+    # Showing the results
+    print(f"Requests: {size}")
+    print(f"Without cache: {uncached / size * 1e6:.2f}us per request")
+    print(f"With cache: {cached / size * 1e6:.2f}us per request")
+    print(f"Speedup: {uncached / cached:.1f}x")
+    print(f"Cache: {token_cache.stats()}")
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 14:40:05 2026
+
+@author: RenatoHenz
+
+Load test of the Socket.IO delivery across many worker processes sharing the message queue.
+It starts the workers (each one serving the application on its own port), connects the clients spread among
+them (half of them joining a pool room) and emits from different processes:
+    * broadcasts, sent through the '/send_socketio_message' route of each worker in turns;
+    * pool room events, sent by this process as an external emitter (like a background job would do).
+Every client must receive every broadcast, and only the clients on the room must receive the room events,
+no matter which worker they're connected to. The deliveries and their latencies are shown at the end.
+When 'SOCKETIO_MESSAGE_QUEUE' isn't set, the local broker ('broker.py', which requires 'pyzmq') is used.
+The rows created for the test are removed at the end.
+It must be executed from the root directory, with the '.env' file set up (it runs on a temporary database):
+
+    (env) $ python -m benchmarks.broadcast [workers] [clients per worker] [messages]
+
+"""
+
+# Other dependencies
+from collections import defaultdict
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import cuid
+import requests
+import socketio as socketio_client
+
+# Flask-SocketIO, used as an external emitter
+from flask_socketio import SocketIO
+
+# Getting config data
+from config import SOCKETIO_MESSAGE_QUEUE, SOCKETIO_CHANNEL
+
+# Import the database object and the models
+from app import db
+from app.modules.pools.models import Pool, Participant
+from app.modules.pools.events import pool_room
+from app.modules.users.models import User
+
+# Code run by each worker: the application served by eventlet (patched, as gunicorn's eventlet workers do),
+# without the debug reloader, which would leave the served process behind when the worker is stopped
+WORKER = ("import eventlet; eventlet.monkey_patch(); import os; from app import app, socketio; "
+          "socketio.run(app, host='127.0.0.1', port=int(os.environ['PORT']), use_reloader=False, log_output=False)")
+
+# Function to get a free local port
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+# Function to wait for a worker to answer the HTTP requests
+def wait_for(url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(url, timeout=1).status_code == 200: return
+        except requests.RequestException: pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Worker didn't start: {url}")
+
+# Function to get a latency percentile (in milliseconds)
+def percentile(latencies, p):
+    return latencies[max(int(len(latencies) * p) - 1, 0)] * 1000
+
+# Running the test
+if __name__ == "__main__":
+    # Getting the number of workers, clients per worker and messages
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    clientsPerWorker = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    messages = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+
+    processes = []
+    clients = []
+
+    # Creating the user, pool and participant for the test
+    user = User("Broadcast check", f"{cuid.cuid()}@benchmark.local")
+    pool = Pool("Broadcast check", cuid.cuid()[-6:].upper(), user.id)
+    participant = Participant(user.id, pool.id)
+    db.session.add_all([user, pool, participant])
+    db.session.commit()
+    token = User.encode_auth_token(None, user.id)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    try:
+        # Starting the local broker, if no message queue was set
+        url = SOCKETIO_MESSAGE_QUEUE
+        if url is None:
+            url = f"zmq+tcp://127.0.0.1:{free_port()}+{free_port()}"
+            processes.append(subprocess.Popen([sys.executable, 'broker.py', url], stdout=subprocess.DEVNULL))
+
+        # Starting the workers, all of them sharing the message queue
+        ports = [free_port() for _ in range(workers)]
+        for port in ports:
+            env = {**os.environ, "PORT": str(port), "SOCKETIO_MESSAGE_QUEUE": url}
+            processes.append(subprocess.Popen([sys.executable, '-c', WORKER], env=env,
+                                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+        for port in ports: wait_for(f"http://127.0.0.1:{port}/users/count")
+
+        # Connecting the clients, spread among the workers, with half of them joining the pool room
+        received = defaultdict(list)
+        lock = threading.Lock()
+        def connect(i):
+            client = socketio_client.Client(reconnection=False)
+            def on_check(data):
+                with lock: received[(data['kind'], data['n'])].append((i, time.time() - data['sentAt']))
+            client.on('broadcast_check', on_check)
+            client.connect(f"http://127.0.0.1:{ports[i % workers]}", auth={"token": token})
+            if i % 2 == 0:
+                assert client.call('join_pool', {"poolId": pool.id})['success'], "Client couldn't join the room"
+            return client
+        clients = [connect(i) for i in range(workers * clientsPerWorker)]
+        members = {i for i in range(len(clients)) if i % 2 == 0}
+
+        # Sending the broadcasts through the workers in turns (below their rate limit)
+        for n in range(messages):
+            response = requests.post(f"http://127.0.0.1:{ports[n % workers]}/send_socketio_message", headers=headers, json={
+                "event": "broadcast_check",
+                "should_broadcast": True,
+                "message": {"kind": "broadcast", "n": n, "sentAt": time.time()},
+            })
+            assert response.status_code == 200, f"Broadcast failed: {response.status_code}"
+            time.sleep(0.1)
+
+        # Sending the room events from this process, which has no clients
+        emitter = SocketIO(message_queue=url, channel=SOCKETIO_CHANNEL)
+        for n in range(messages):
+            emitter.emit('broadcast_check', {"kind": "room", "n": n, "sentAt": time.time()}, to=pool_room(pool.id))
+            time.sleep(0.01)
+
+        # Waiting for the deliveries
+        expected = messages * (len(clients) + len(members))
+        deadline = time.time() + 10
+        while time.time() < deadline and sum(len(d) for d in received.values()) < expected: time.sleep(0.1)
+
+        # Checking the deliveries
+        broadcasts = [received[('broadcast', n)] for n in range(messages)]
+        rooms = [received[('room', n)] for n in range(messages)]
+        missing = sum(len(clients) - len(d) for d in broadcasts) + sum(len(members) - len(d) for d in rooms)
+        outsiders = sum(1 for d in rooms for i, _ in d if i not in members)
+        latencies = sorted(latency for d in broadcasts + rooms for _, latency in d)
+
+        # Showing the results
+        print(f"Workers: {workers}, clients: {len(clients)} ({len(members)} on the room), messages: {messages} of each kind")
+        print(f"Message queue: {url}")
+        print(f"Deliveries: {len(latencies)} of {expected} (missing {missing}, outside the room {outsiders})")
+        if latencies:
+            print(f"Latency: median {statistics.median(latencies) * 1000:.1f}ms, "
+                  f"p95 {percentile(latencies, 0.95):.1f}ms, max {latencies[-1] * 1000:.1f}ms")
+        assert missing == 0, "Some clients didn't receive the events"
+        assert outsiders == 0, "Clients outside the room received its events"
+        print("Every event reached its clients on all workers")
+
+    # Stopping the clients and processes and removing the rows created for the test
+    finally:
+        for client in clients: client.disconnect()
+        for process in processes: process.terminate()
+        for process in processes: process.wait()
+        db.session.rollback()
+        Participant.query.filter(Participant.id == participant.id).delete()
+        Pool.query.filter(Pool.id == pool.id).delete()
+        User.query.filter(User.id == user.id).delete()
+        db.session.commit()
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct 22 15:02:44 2026
+
+@author: RenatoHenz
+
+Compares creating games one request at a time (POST /games) with importing a whole schedule at once
+(POST /games/import), as CSV and JSON, showing the rows per second of each one. The schedule has a few invalid and
+repeated rows, which must be reported and skipped. Importing the same schedule again must not create any game.
+The games created for the benchmark are removed at the end.
+It must be executed from the root directory, with the '.env' file set up (it runs on a temporary database):
+
+    (env) $ python -m benchmarks.games_import [number of games]
+
+"""
+
+# Other dependencies
+from datetime import datetime, timedelta
+import csv
+import io
+import json
+import sys
+import time
+import cuid
+
+# Import the application, the database object and the models
+from app import app, db, limiter
+from app.modules.pools.models import Game
+from app.modules.users.models import User
+
+# First team of the games created for the benchmark (used to remove them)
+TEAM = "IMPORT BENCHMARK"
+# Number of games created one request at a time
+SINGLE_GAMES = 200
+
+# Function to generate the games of a schedule, starting at the given date
+def generate_games(size, start):
+    return [{
+        "date": (start + timedelta(hours=i)).strftime('%Y-%m-%dT%H:%M:%S+0000'),
+        "firstTeamCountryCode": TEAM,
+        "secondTeamCountryCode": f"TEAM {i % 32}",
+    } for i in range(size)]
+
+# Function to encode a schedule as CSV
+def to_csv(games):
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=["date", "firstTeamCountryCode", "secondTeamCountryCode"])
+    writer.writeheader()
+    writer.writerows(games)
+    return output.getvalue()
+
+# Running the benchmark
+if __name__ == "__main__":
+    # Getting the number of games
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    # Disabling the rate limit, since all requests come from the same address
+    limiter.enabled = False
+
+    # Creating the user who sends the requests
+    user = User("Games import", f"{cuid.cuid()}@benchmark.local")
+    db.session.add(user)
+    db.session.commit()
+    userId = user.id
+    headers = {"Authorization": f"Bearer {User.encode_auth_token(None, userId)}"}
+    start = datetime(2030, 1, 1)
+
+    try:
+        with app.test_client() as client:
+            # Creating games one request at a time
+            games = generate_games(SINGLE_GAMES, start - timedelta(days=365))
+            began = time.perf_counter()
+            for item in games:
+                assert client.post('/games', json=item, headers=headers).status_code == 201
+            seconds = time.perf_counter() - began
+            print(f"{'Single requests':<16} {SINGLE_GAMES:>7} rows {seconds:>7.2f}s {SINGLE_GAMES / seconds:>9.0f} rows/s")
+
+            # Importing the schedules, with an invalid row and a repeated one on every 1000 rows
+            for name, offset in (("CSV", 0), ("JSON", 2 * size)):
+                games = generate_games(size, start + timedelta(hours=offset))
+                for i in range(0, size, 1000):
+                    games[i] = {**games[i], "date": "not a date"}
+                    games[i + 1] = games[i + 2]
+                body, contentType = (to_csv(games), 'text/csv') if name == "CSV" else \
+                    (json.dumps({"games": games}), 'application/json')
+                began = time.perf_counter()
+                response = client.post('/games/import', data=body, content_type=contentType, headers=headers)
+                seconds = time.perf_counter() - began
+                report = response.get_json()["report"]
+                print(f"{'Import (' + name + ')':<16} {size:>7} rows {seconds:>7.2f}s {size / seconds:>9.0f} rows/s "
+                      f"(created {report['created']}, duplicates {report['duplicates']}, errors {report['failed']})")
+                assert report['failed'] == len(range(0, size, 1000)), "Invalid rows weren't reported"
+                assert report['created'] + report['duplicates'] + report['failed'] == size
+
+            # Importing the last schedule again
+            response = client.post('/games/import', data=body, content_type=contentType, headers=headers)
+            report = response.get_json()["report"]
+            print(f"Import again: created {report['created']}, duplicates {report['duplicates']}")
+            assert report['created'] == 0, "Existing games were created again"
+            print("Existing games were skipped")
+
+    # Removing the games and user created for the benchmark
+    finally:
+        db.session.rollback()
+        Game.query.filter(Game.firstTeamCountryCode == TEAM).delete()
+        User.query.filter(User.id == userId).delete()
+        db.session.commit()
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 23 14:02:31 2026
+
+@author: RenatoHenz
+
+Compares setting the results of many games inline (PUT /games/results) with queuing them as a job
+('Prefer: respond-async'), showing the request latency of both and how long the worker takes to run the job.
+Both must end with the same participants scores and rankings. It also checks that a request sent again with
+the same 'Idempotency-Key' gets the same job, and that a failing job is retried and then failed.
+The rows created for the benchmark are removed at the end.
+It must be executed from the root directory, with the '.env' file set up (it runs on a temporary database):
+
+    (env) $ python -m benchmarks.jobs [number of participants] [number of games]
+
+"""
+
+# Other dependencies
+from datetime import datetime, timedelta
+import sys
+import time
+import cuid
+
+# Import the application, the database object and the models
+from app import app, db, limiter
+from app.modules.pools.models import Pool, Participant, Game, Guess, Ranking
+from app.modules.pools.ranking import update_pools_rankings
+from app.modules.users.models import User
+from app.modules.jobs.models import Job, QUEUED, SUCCEEDED, FAILED
+from app.modules.jobs.runner import job_handler, enqueue_job, run_worker
+
+# Reusing the results benchmark helpers
+from benchmarks.results import POOL_SIZE, reset_scores, get_scores
+
+# Job which always fails, to check the retries
+@job_handler('benchmark_failure')
+def run_benchmark_failure(session, payload):
+    raise RuntimeError("Benchmark failure")
+
+# Running the benchmark
+if __name__ == "__main__":
+    # Getting the number of participants and games
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    gamesCount = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    # Disabling the rate limit, since all requests come from the same address
+    limiter.enabled = False
+
+    # Creating the users, pools, participants, games and a guess of each participant on each game
+    now = datetime.now()
+    users = [{"id": cuid.cuid(), "name": f"Jobs {i}", "email": f"{cuid.cuid()}@benchmark.local",
+              "createdAt": now, "updatedAt": now} for i in range(size)]
+    pools = [{"id": cuid.cuid(), "title": "Jobs benchmark", "code": cuid.cuid()[-6:].upper(),
+              "createdAt": now, "updatedAt": now} for _ in range(max(size // POOL_SIZE, 1))]
+    participants = [{"id": cuid.cuid(), "userId": user["id"], "poolId": pools[i % len(pools)]["id"], "score": 0,
+                     "createdAt": now, "updatedAt": now} for i, user in enumerate(users)]
+    games = [{"id": cuid.cuid(), "date": now - timedelta(hours=2), "firstTeamCountryCode": "JOBS",
+              "secondTeamCountryCode": f"TEAM {i}", "createdAt": now, "updatedAt": now} for i in range(gamesCount)]
+    db.session.execute(User.__table__.insert(), users)
+    db.session.execute(Pool.__table__.insert(), pools)
+    db.session.execute(Participant.__table__.insert(), participants)
+    db.session.execute(Game.__table__.insert(), games)
+    for game in games:
+        db.session.execute(Guess.__table__.insert(), [
+            {"id": cuid.cuid(), "participantId": participant["id"], "gameId": game["id"], "firstTeamPoints": i % 4,
+             "secondTeamPoints": (i // 4) % 3, "score": 0, "createdAt": now, "updatedAt": now}
+            for i, participant in enumerate(participants)])
+    poolIds = [pool["id"] for pool in pools]
+    gameIds = [game["id"] for game in games]
+    userId = users[0]["id"]
+    update_pools_rankings(db.session, poolIds)
+    db.session.commit()
+    headers = {"Authorization": f"Bearer {User.encode_auth_token(None, userId)}"}
+    results = [{"gameId": gameId, "firstTeamPoints": i % 3, "secondTeamPoints": (i + 1) % 2}
+               for i, gameId in enumerate(gameIds)]
+
+    try:
+        print(f"{len(participants)} participants on {len(pools)} pools, with guesses on {gamesCount} games")
+        with app.test_client() as client:
+            # Setting the results inline
+            start = time.perf_counter()
+            response = client.put("/games/results", headers=headers, json={"results": results})
+            seconds = time.perf_counter() - start
+            assert response.status_code == 200
+            print(f"{'Inline':<14} {seconds * 1000:>9.1f}ms request")
+            inline = get_scores(poolIds)
+            db.session.commit()
+
+            # Queuing them as a job, and running it
+            reset_scores(gameIds, poolIds)
+            asyncHeaders = {**headers, "Prefer": "respond-async", "Idempotency-Key": cuid.cuid()}
+            start = time.perf_counter()
+            response = client.put("/games/results", headers=asyncHeaders, json={"results": results})
+            seconds = time.perf_counter() - start
+            assert response.status_code == 202
+            assert all(result["status"] == 202 for result in response.get_json()["results"])
+            jobId = response.get_json()["job"]["id"]
+            # Sending it again with the same key
+            response = client.put("/games/results", headers=asyncHeaders, json={"results": results})
+            assert response.status_code == 202 and response.get_json()["job"]["id"] == jobId
+            assert db.session.query(Job).filter(Job.userId == userId).count() == 1
+            db.session.commit()
+            start = time.perf_counter()
+            with app.app_context(): run_worker(0, once=True)
+            workerSeconds = time.perf_counter() - start
+            print(f"{'As a job':<14} {seconds * 1000:>9.1f}ms request {workerSeconds * 1000:>9.1f}ms on the worker")
+            job = client.get(f"/jobs/{jobId}", headers=headers).get_json()["job"]
+            assert job["status"] == SUCCEEDED and len(job["result"]["updatedGames"]) == gamesCount
+            asynchronous = get_scores(poolIds)
+
+        assert asynchronous == inline, "Scores differ between both ways"
+        print("Both ways ended with the same scores and rankings")
+
+        # Checking a failing job is retried until it has no attempts left
+        job, created = enqueue_job(db.session, 'benchmark_failure', {}, userId=userId)
+        failureId = job.id
+        db.session.commit()
+        statuses = []
+        for attempt in range(job.maxAttempts):
+            with app.app_context(): run_worker(0, once=True)
+            job = db.session.query(Job).get(failureId)
+            statuses.append(job.status)
+            # Making the retry due now
+            job.runAt = datetime.now()
+            db.session.commit()
+        assert statuses == [QUEUED] * (len(statuses) - 1) + [FAILED], statuses
+        print(f"Failing job: {' -> '.join(statuses)} after {len(statuses)} attempts")
+
+    # Removing the rows created for the benchmark
+    finally:
+        db.session.rollback()
+        Job.query.filter(Job.userId == userId).delete(synchronize_session=False)
+        Guess.query.filter(Guess.gameId.in_(gameIds)).delete(synchronize_session=False)
+        participantIds = [participant["id"] for participant in participants]
+        for i in range(0, len(participantIds), 500):
+            chunk = participantIds[i:i + 500]
+            Ranking.query.filter(Ranking.participantId.in_(chunk)).delete(synchronize_session=False)
+            Participant.query.filter(Participant.id.in_(chunk)).delete(synchronize_session=False)
+            User.query.filter(User.id.in_([user["id"] for user in users[i:i + 500]])).delete(synchronize_session=False)
+        Pool.query.filter(Pool.id.in_(poolIds)).delete(synchronize_session=False)
+        Game.query.filter(Game.id.in_(gameIds)).delete(synchronize_session=False)
+        db.session.commit()
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 11:40:26 2026
+
+@author: RenatoHenz
+
+Benchmark comparing the responses encoding with Flask's 'jsonify' and the application JSON providers.
+It must be executed from the root directory, with the '.env' file set up:
+
+    (env) $ python -m benchmarks.json [number of rows]
+
+"""
+
+# Other dependencies
+from datetime import datetime, timedelta
+import json
+import sys
+import time
+
+# Import the application, Flask's 'jsonify' and the JSON providers
+from flask import jsonify as flask_jsonify
+from app import app
+from app.encoding import StdlibJSONProvider, OrjsonProvider, Fragment
+
+# Function to measure the time taken to encode the data with a function
+def measure(function, data):
+    start = time.perf_counter()
+    body = function(data)
+    return time.perf_counter() - start, body
+
+# Running the benchmark
+if __name__ == "__main__":
+    # Getting the number of rows to be encoded
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    # Creating a games listing, with the datetimes pre-formatted (as previously done) and as they are
+    now = datetime.now().replace(microsecond=0)
+    games = [{
+        "id": f"ckgame{i:019d}",
+        "date": now + timedelta(minutes=i),
+        "firstTeamCountryCode": "BR",
+        "secondTeamCountryCode": "AR",
+        "firstTeamPoints": i % 5,
+        "secondTeamPoints": i % 3,
+        "createdAt": now,
+        "updatedAt": now,
+        "guess": None,
+    } for i in range(size)]
+    formatted = [{key: value.isoformat() if isinstance(value, datetime) else value
+                  for key, value in game.items()} for game in games]
+
+    # Same options as the application responses, without pretty printing
+    stdlib = StdlibJSONProvider(sort_keys=True)
+    fast = OrjsonProvider(sort_keys=True)
+    with app.app_context():
+        app.config['JSONIFY_PRETTYPRINT_REGULAR'] = False
+        app.debug = False
+        results = {
+            "Flask jsonify (pre-formatted)": measure(
+                lambda data: flask_jsonify({"games": data}).get_data(), formatted),
+            "Standard library provider": measure(lambda data: stdlib.dumps({"games": data}), games),
+            "Fast provider": measure(lambda data: fast.dumps({"games": data}), games),
+        }
+
+        # A cached sub-document (like a pool header) spliced into every response instead of encoded again
+        header = {"title": "Benchmark pool", "code": "BENCH1", "createdAt": now,
+                  "participants": [{"id": f"ckpart{i:019d}", "score": i} for i in range(100)]}
+        fragment = Fragment(fast.dumps(header))
+        responses = range(size // 10)
+        encoded = measure(lambda data: [fast.dumps({"pool": header, "page": i}) for i in data], responses)
+        spliced = measure(lambda data: [fast.dumps({"pool": fragment, "page": i}) for i in data], responses)
+
+    # All approaches must give the same data
+    expected = json.loads(results["Flask jsonify (pre-formatted)"][1])
+    for name, (_, body) in results.items():
+        assert json.loads(body) == expected, f"{name} data doesn't match"
+    assert encoded[1] == spliced[1], "Spliced data doesn't match"
+
+    # Showing the results
+    print(f"Rows encoded: {size}")
+    baseline = results["Flask jsonify (pre-formatted)"][0]
+    for name, (elapsed, _) in results.items():
+        print(f"{name}: {elapsed:.3f}s ({size / elapsed:,.0f} rows/s, {baseline / elapsed:.1f}x)")
+    print(f"Responses with a pool header: {len(responses)}")
+    print(f"Header encoded every time: {encoded[0]:.3f}s")
+    print(f"Header spliced as a fragment: {spliced[0]:.3f}s ({encoded[0] / spliced[0]:.1f}x)")
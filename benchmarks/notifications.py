@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Oct 21 10:12:40 2026
+
+@author: RenatoHenz
+
+Load test of the game result notifications, sent to a local fake client (nothing reaches FCM):
+    * from the database: the recipients of a game (participants who placed guesses on it) are read page by page,
+      and their personalized notifications are queued and sent in batches;
+    * in memory: 1M generated recipients go through the same queuing and sending, checking that the memory
+      stays bounded by the dispatcher pending messages, no matter how many recipients there are.
+The throughput (notifications per second) is shown for both of them. The memory peak is measured on another run
+of the recipients generated in memory, since tracing the memory makes it a few times slower.
+The rows created for the test are removed at the end.
+It must be executed from the root directory, with the '.env' file set up (it runs on a temporary database):
+
+    (env) $ python -m benchmarks.notifications [database recipients] [memory recipients]
+
+"""
+
+# Other dependencies
+from collections import namedtuple
+from datetime import datetime, timedelta
+import sys
+import time
+import tracemalloc
+import cuid
+
+# Import the application, the database object, the dispatcher and the models
+from app import db, socketio, push
+from app.services.push_notification import FakePushClient
+from app.modules.pools.models import Pool, Participant, Game, Guess, Ranking
+from app.modules.pools.ranking import update_pools_rankings
+from app.modules.pools.notifications import iter_result_recipients, queue_result_notifications
+from app.modules.users.models import User
+
+# Recipient generated in memory, with the same fields as the ones read from the database
+Recipient = namedtuple('Recipient', ['id', 'score', 'fcmToken', 'poolId', 'title', 'position'])
+
+# Function to queue the notifications and wait until all of them are sent, measuring the throughput
+# (or the memory peak, when tracing it)
+def measure(name, game, recipients, trace=False):
+    start = push.client.count
+    if trace: tracemalloc.start()
+    began = time.perf_counter()
+    result = queue_result_notifications(game, recipients)
+    while push.client.count - start < result['notifications']: socketio.sleep(push.interval)
+    seconds = time.perf_counter() - began
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{name}: {result['notifications']} notifications, memory peak {peak / 2 ** 20:.1f}MB")
+    else:
+        print(f"{name}: {result['notifications']} notifications in {seconds:.2f}s "
+              f"({result['notifications'] / seconds:.0f} notifications/s)")
+    return result['notifications']
+
+# Function to generate the recipients in memory
+def generate_recipients(size):
+    return (Recipient(str(i), i % 7, f"token-{i}", "pool", "Notifications check", i % 1000 + 1) for i in range(size))
+
+# Running the test
+if __name__ == "__main__":
+    # Getting the number of recipients
+    databaseRecipients = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    memoryRecipients = int(sys.argv[2]) if len(sys.argv) > 2 else 1000000
+
+    # Using the fake client, only counting the notifications
+    push.client = FakePushClient(keep=False)
+
+    # Creating the users (with tokens), pools, participants and guesses on a finished game
+    game = Game(datetime.now() - timedelta(hours=2), 'BR', 'AR', 2, 1)
+    pools = [Pool(f"Notifications check {i}", cuid.cuid()[-6:].upper()) for i in range(max(databaseRecipients // 1000, 1))]
+    users = [{"id": cuid.cuid(), "name": f"Notifications check {i}", "email": f"{cuid.cuid()}@benchmark.local",
+              "fcmToken": f"token-{i}"} for i in range(databaseRecipients)]
+    participants = [{"id": cuid.cuid(), "userId": user["id"], "poolId": pools[i % len(pools)].id, "score": i % 7}
+                    for i, user in enumerate(users)]
+    guesses = [{"id": cuid.cuid(), "participantId": participant["id"], "gameId": game.id,
+                "firstTeamPoints": i % 4, "secondTeamPoints": i % 3, "score": participant["score"]}
+               for i, participant in enumerate(participants)]
+    db.session.add_all([game, *pools])
+    db.session.execute(User.__table__.insert(), users)
+    db.session.execute(Participant.__table__.insert(), participants)
+    db.session.execute(Guess.__table__.insert(), guesses)
+    update_pools_rankings(db.session, [pool.id for pool in pools])
+    db.session.commit()
+
+    try:
+        # Notifying the recipients read from the database
+        measure("Database", game, iter_result_recipients(db.session, game.id))
+
+        # Notifying the recipients generated in memory, and measuring the memory peak on another run
+        notifications = measure("Memory", game, generate_recipients(memoryRecipients))
+        measure("Memory (traced)", game, generate_recipients(memoryRecipients), trace=True)
+        print(f"Dispatcher: {push.stats()}")
+        assert notifications == memoryRecipients, "Some notifications weren't queued"
+        print(f"Memory stayed bounded by {push.max_pending} pending notifications")
+
+    # Removing the rows created for the test
+    finally:
+        db.session.rollback()
+        participantIds = [participant["id"] for participant in participants]
+        for i in range(0, len(participantIds), 500):
+            chunk = participantIds[i:i + 500]
+            Guess.query.filter(Guess.participantId.in_(chunk)).delete(synchronize_session=False)
+            Ranking.query.filter(Ranking.participantId.in_(chunk)).delete(synchronize_session=False)
+            Participant.query.filter(Participant.id.in_(chunk)).delete(synchronize_session=False)
+            User.query.filter(User.id.in_([user["id"] for user in users[i:i + 500]])).delete(synchronize_session=False)
+        Pool.query.filter(Pool.id.in_([pool.id for pool in pools])).delete(synchronize_session=False)
+        Game.query.filter(Game.id == game.id).delete()
+        db.session.commit()
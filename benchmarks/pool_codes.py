@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Oct 21 15:20:18 2026
+
+@author: RenatoHenz
+
+Creates 1M pools with the codes allocator, in rounds of 100k, showing for each round how long the codes took to be
+allocated, how many generated codes were already taken and how many queries were needed to check them.
+The cost of each code must stay constant while the pools grow. At the end, it also times looking pools up by code
+(as when joining them). The pools created for the benchmark are removed at the end.
+It must be executed from the root directory, with the '.env' file set up (it runs on a temporary database):
+
+    (env) $ python -m benchmarks.pool_codes [number of pools]
+
+"""
+
+# SQLAlchemy functions
+from sqlalchemy import insert, delete, select
+
+# Other dependencies
+from datetime import datetime
+import random
+import sys
+import time
+import cuid
+
+# Import the database object, the codes allocator and the models
+from app import db
+from app.modules.pools.codes import CodeAllocator
+from app.modules.pools.models import Pool
+
+# Title of the pools created for the benchmark
+TITLE = "Codes benchmark"
+# Number of pools created on each round, and inserted at once
+ROUND_SIZE = 100000
+INSERT_SIZE = 10000
+
+# Running the benchmark
+if __name__ == "__main__":
+    # Getting the number of pools
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    allocator = CodeAllocator()
+    pools = Pool.__table__
+    codes = []
+    try:
+        print(f"{'Pools':>9} {'Allocation':>11} {'Per code':>9} {'Taken':>6} {'Queries':>8} {'Insertion':>10}")
+        created = 0
+        while created < size:
+            roundSize = min(ROUND_SIZE, size - created)
+            batches, taken = allocator.batches, allocator.taken
+
+            # Allocating the codes and inserting the pools of the round, a few thousands at once
+            allocation = insertion = 0
+            now = datetime.now()
+            for i in range(0, roundSize, INSERT_SIZE):
+                start = time.perf_counter()
+                insertCodes = allocator.take_many(db.session, min(INSERT_SIZE, roundSize - i))
+                allocation += time.perf_counter() - start
+                start = time.perf_counter()
+                db.session.execute(insert(pools), [
+                    {"id": cuid.cuid(), "title": TITLE, "code": code, "createdAt": now, "updatedAt": now}
+                    for code in insertCodes])
+                insertion += time.perf_counter() - start
+                codes.extend(insertCodes[:10])
+            start = time.perf_counter()
+            db.session.commit()
+            insertion += time.perf_counter() - start
+
+            created += roundSize
+            print(f"{created:>9} {allocation:>10.2f}s {allocation / roundSize * 1e6:>7.1f}us "
+                  f"{allocator.taken - taken:>6} {allocator.batches - batches:>8} {insertion:>9.2f}s")
+
+        # Looking pools up by code
+        lookups = random.sample(codes, min(len(codes), 1000))
+        start = time.perf_counter()
+        for code in lookups: db.session.execute(select(pools.c.id).where(pools.c.code == code)).one()
+        elapsed = time.perf_counter() - start
+        print(f"Lookup by code: {elapsed / len(lookups) * 1e6:.1f}us per pool")
+        print(f"Allocator: {allocator.stats()}")
+
+    # Removing the pools created for the benchmark
+    finally:
+        db.session.rollback()
+        db.session.execute(delete(pools).where(pools.c.title == TITLE))
+        db.session.commit()
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct 22 10:41:07 2026
+
+@author: RenatoHenz
+
+Compares getting a big pool ranking (100k participants by default) from the ranking route, which encodes the whole
+ranking at once, with the streamed export (NDJSON and JSON). For each one, it shows the time to the first byte,
+the total time and the memory peak (measured on another request, since tracing the memory makes it slower).
+It also reads the export page by page with the cursor, checking every participant is read once and in order.
+The rows created for the benchmark are removed at the end.
+It must be executed from the root directory, with the '.env' file set up (it runs on a temporary database):
+
+    (env) $ python -m benchmarks.ranking_export [number of participants] [page size]
+
+"""
+
+# Other dependencies
+from datetime import datetime
+import json
+import sys
+import time
+import tracemalloc
+import cuid
+
+# Import the application, the database object, the models and the rankings
+from app import app, db, limiter
+from app.modules.pools.models import Pool, Participant, Ranking
+from app.modules.pools.ranking import update_pools_rankings
+from app.modules.users.models import User
+from app.services.response_cache import invalidate
+
+# Function to get a route, reading its response chunk by chunk (as a client would)
+# Returns the time to the first byte, the total time and the body
+def get(client, url, headers):
+    start = time.perf_counter()
+    response = client.get(url, headers=headers, buffered=False)
+    firstByte, chunks = None, []
+    for chunk in response.response:
+        if firstByte is None: firstByte = time.perf_counter() - start
+        chunks.append(chunk)
+    response.close()
+    assert response.status_code == 200, f"{url} returned {response.status_code}"
+    return firstByte, time.perf_counter() - start, b"".join(chunks)
+
+# Function to get the memory peak while getting a route (without keeping the body)
+def get_memory_peak(client, url, headers):
+    tracemalloc.start()
+    response = client.get(url, headers=headers, buffered=False)
+    for _chunk in response.response: pass
+    response.close()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+# Running the benchmark
+if __name__ == "__main__":
+    # Getting the number of participants and the page size
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    pageSize = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+
+    # Disabling the rate limit, since all requests come from the same address
+    limiter.enabled = False
+
+    # Creating the pool, users and participants (with repeated scores, so the cursor must untie them)
+    now = datetime.now()
+    pool = Pool("Ranking export", cuid.cuid()[-6:].upper())
+    users = [{"id": cuid.cuid(), "name": f"Ranking export {i}", "email": f"{cuid.cuid()}@benchmark.local",
+              "createdAt": now, "updatedAt": now} for i in range(size)]
+    participants = [{"id": cuid.cuid(), "userId": user["id"], "poolId": pool.id, "score": i % 50,
+                     "createdAt": now, "updatedAt": now} for i, user in enumerate(users)]
+    db.session.add(pool)
+    db.session.execute(User.__table__.insert(), users)
+    db.session.execute(Participant.__table__.insert(), participants)
+    update_pools_rankings(db.session, [pool.id])
+    db.session.commit()
+    token = User.encode_auth_token(None, users[0]["id"])
+    headers = {"Authorization": f"Bearer {token}"}
+
+    try:
+        with app.test_client() as client:
+            # Getting the whole ranking with each route
+            routes = {
+                "Ranking route": f"/pools/{pool.id}/ranking",
+                "Export (NDJSON)": f"/pools/{pool.id}/ranking/export",
+                "Export (JSON)": f"/pools/{pool.id}/ranking/export?format=json",
+            }
+            print(f"{'Route':<16} {'First byte':>11} {'Total':>8} {'Size':>9} {'Memory peak':>12}")
+            for name, url in routes.items():
+                # The ranking route response is cached, so its cache is cleared before each request
+                invalidate(f"pool:{pool.id}")
+                firstByte, total, body = get(client, url, headers)
+                invalidate(f"pool:{pool.id}")
+                peak = get_memory_peak(client, url, headers)
+                print(f"{name:<16} {firstByte * 1000:>9.1f}ms {total:>7.2f}s {len(body) / 2 ** 20:>7.1f}MB "
+                      f"{peak / 2 ** 20:>10.1f}MB")
+
+            # Checking the exported participants are the same as the ranking ones
+            ranking = [row["id"] for row in json.loads(get(client, routes["Ranking route"], headers)[2])
+                       ["pool"]["participants"]]
+            exported = [json.loads(line)["id"] for line in
+                        get(client, routes["Export (NDJSON)"], headers)[2].splitlines()]
+            assert exported == ranking, "The export isn't sorted like the ranking"
+
+            # Reading the export page by page, following the next cursor
+            paged, pages, cursor = [], 0, ""
+            start = time.perf_counter()
+            while True:
+                data = json.loads(get(client, f"{routes['Export (JSON)']}&limit={pageSize}{cursor}", headers)[2])
+                paged.extend(row["id"] for row in data["pool"]["participants"])
+                pages += 1
+                if data["next"] is None: break
+                cursor = f"&after_score={data['next']['after_score']}&after_id={data['next']['after_id']}"
+            elapsed = time.perf_counter() - start
+            print(f"Pages of {pageSize}: {pages} pages in {elapsed:.2f}s ({elapsed / pages * 1000:.1f}ms per page)")
+            assert paged == ranking, "The pages don't match the ranking"
+            print("Every participant was exported once and in order")
+
+    # Removing the rows created for the benchmark
+    finally:
+        db.session.rollback()
+        Ranking.query.filter(Ranking.poolId == pool.id).delete()
+        Participant.query.filter(Participant.poolId == pool.id).delete()
+        userIds = [user["id"] for user in users]
+        for i in range(0, len(userIds), 500):
+            User.query.filter(User.id.in_(userIds[i:i + 500])).delete(synchronize_session=False)
+        Pool.query.filter(Pool.id == pool.id).delete()
+        db.session.commit()
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct 22 17:25:10 2026
+
+@author: RenatoHenz
+
+Compares setting the results of many games ending at the same time one request at a time
+(PUT /games/<id>/result) with setting all of them at once (PUT /games/results), showing the time and the number
+of statements sent to the database by each one. Both must end with the same participants scores and rankings.
+The rows created for the benchmark are removed at the end.
+It must be executed from the root directory, with the '.env' file set up (it runs on a temporary database):
+
+    (env) $ python -m benchmarks.results [number of participants] [number of games]
+
+"""
+
+# SQLAlchemy functions
+from sqlalchemy import event, update
+
+# Other dependencies
+from datetime import datetime, timedelta
+import sys
+import time
+import cuid
+
+# Import the application, the database object and the models
+from app import app, db, limiter
+from app.modules.pools.models import Pool, Participant, Game, Guess, Ranking
+from app.modules.pools.ranking import update_pools_rankings
+from app.modules.users.models import User
+
+# Number of participants on each pool
+POOL_SIZE = 1000
+
+# Function to reset the games results and the scores, so the results can be set again
+def reset_scores(gameIds, poolIds):
+    db.session.execute(update(Game.__table__).where(Game.__table__.c.id.in_(gameIds)).
+        values(firstTeamPoints=None, secondTeamPoints=None))
+    db.session.execute(update(Guess.__table__).where(Guess.__table__.c.gameId.in_(gameIds)).values(score=0))
+    db.session.execute(update(Participant.__table__).where(Participant.__table__.c.poolId.in_(poolIds)).values(score=0))
+    update_pools_rankings(db.session, poolIds)
+    db.session.commit()
+
+# Function to get the participants scores and rankings positions
+def get_scores(poolIds):
+    return sorted(db.session.query(Participant.id, Participant.score, Ranking.position).
+        join(Ranking, Ranking.participantId == Participant.id).filter(Participant.poolId.in_(poolIds)))
+
+# Running the benchmark
+if __name__ == "__main__":
+    # Getting the number of participants and games
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    gamesCount = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    # Disabling the rate limit, since all requests come from the same address
+    limiter.enabled = False
+
+    # Creating the users, pools, participants, games and a guess of each participant on each game
+    now = datetime.now()
+    users = [{"id": cuid.cuid(), "name": f"Results {i}", "email": f"{cuid.cuid()}@benchmark.local",
+              "createdAt": now, "updatedAt": now} for i in range(size)]
+    pools = [{"id": cuid.cuid(), "title": "Results benchmark", "code": cuid.cuid()[-6:].upper(),
+              "createdAt": now, "updatedAt": now} for _ in range(max(size // POOL_SIZE, 1))]
+    participants = [{"id": cuid.cuid(), "userId": user["id"], "poolId": pools[i % len(pools)]["id"], "score": 0,
+                     "createdAt": now, "updatedAt": now} for i, user in enumerate(users)]
+    games = [{"id": cuid.cuid(), "date": now - timedelta(hours=2), "firstTeamCountryCode": "RESULTS",
+              "secondTeamCountryCode": f"TEAM {i}", "createdAt": now, "updatedAt": now} for i in range(gamesCount)]
+    db.session.execute(User.__table__.insert(), users)
+    db.session.execute(Pool.__table__.insert(), pools)
+    db.session.execute(Participant.__table__.insert(), participants)
+    db.session.execute(Game.__table__.insert(), games)
+    for game in games:
+        db.session.execute(Guess.__table__.insert(), [
+            {"id": cuid.cuid(), "participantId": participant["id"], "gameId": game["id"], "firstTeamPoints": i % 4,
+             "secondTeamPoints": (i // 4) % 3, "score": 0, "createdAt": now, "updatedAt": now}
+            for i, participant in enumerate(participants)])
+    poolIds = [pool["id"] for pool in pools]
+    gameIds = [game["id"] for game in games]
+    update_pools_rankings(db.session, poolIds)
+    db.session.commit()
+    headers = {"Authorization": f"Bearer {User.encode_auth_token(None, users[0]['id'])}"}
+    results = [{"gameId": gameId, "firstTeamPoints": i % 3, "secondTeamPoints": (i + 1) % 2}
+               for i, gameId in enumerate(gameIds)]
+
+    # Counting the statements sent to the database
+    statements = [0]
+    @event.listens_for(db.engine, 'before_cursor_execute')
+    def count_statement(*args): statements[0] += 1
+
+    try:
+        print(f"{len(participants)} participants on {len(pools)} pools, with guesses on {gamesCount} games")
+        with app.test_client() as client:
+            # Setting the results one request at a time
+            statements[0] = 0
+            start = time.perf_counter()
+            for result in results:
+                response = client.put(f"/games/{result['gameId']}/result", headers=headers, json={
+                    "firstTeamPoints": result["firstTeamPoints"], "secondTeamPoints": result["secondTeamPoints"]})
+                assert response.status_code == 200
+            seconds = time.perf_counter() - start
+            print(f"{'One at a time':<14} {seconds:>7.2f}s {statements[0]:>6} statements")
+            sequential = get_scores(poolIds)
+            db.session.commit()
+
+            # Setting all of them at once
+            reset_scores(gameIds, poolIds)
+            statements[0] = 0
+            start = time.perf_counter()
+            response = client.put("/games/results", headers=headers, json={"results": results})
+            seconds = time.perf_counter() - start
+            assert response.status_code == 200
+            assert all(result["status"] == 200 for result in response.get_json()["results"])
+            print(f"{'All at once':<14} {seconds:>7.2f}s {statements[0]:>6} statements")
+            combined = get_scores(poolIds)
+
+        assert combined == sequential, "Scores differ between both ways"
+        print("Both ways ended with the same scores and rankings")
+
+    # Removing the rows created for the benchmark
+    finally:
+        db.session.rollback()
+        Guess.query.filter(Guess.gameId.in_(gameIds)).delete(synchronize_session=False)
+        participantIds = [participant["id"] for participant in participants]
+        for i in range(0, len(participantIds), 500):
+            chunk = participantIds[i:i + 500]
+            Ranking.query.filter(Ranking.participantId.in_(chunk)).delete(synchronize_session=False)
+            Participant.query.filter(Participant.id.in_(chunk)).delete(synchronize_session=False)
+            User.query.filter(User.id.in_([user["id"] for user in users[i:i + 500]])).delete(synchronize_session=False)
+        Pool.query.filter(Pool.id.in_(poolIds)).delete(synchronize_session=False)
+        Game.query.filter(Game.id.in_(gameIds)).delete(synchronize_session=False)
+        db.session.commit()
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 10:02:15 2026
+
+@author: RenatoHenz
+
+Benchmark comparing the per-object guess scoring with the vectorized one.
+It must be executed from the root directory, with the '.env' file set up:
+
+    (env) $ python -m benchmarks.scoring [number of guesses]
+
+"""
+
+# Other dependencies
+from collections import namedtuple
+import sys
+import time
+
+# NumPy for generating the guesses
+import numpy as np
+
+# Import the scoring functions
+from app.modules.pools.scoring import calculate_guess_score, score_guesses, get_scoring_rules
+
+# Lightweight objects with the same attributes as the models
+GuessRow = namedtuple('GuessRow', ['firstTeamPoints', 'secondTeamPoints'])
+GameRow = namedtuple('GameRow', ['firstTeamPoints', 'secondTeamPoints'])
+
+# Running the benchmark
+if __name__ == "__main__":
+    # Getting the number of guesses to be scored
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rules = get_scoring_rules()
+
+    # Generating random guesses and a game result
+    rng = np.random.default_rng(2022)
+    firstTeamPoints = rng.integers(0, 5, size)
+    secondTeamPoints = rng.integers(0, 5, size)
+    game = GameRow(2, 1)
+
+    # Scoring one object at a time
+    guesses = [GuessRow(int(f), int(s)) for f, s in zip(firstTeamPoints, secondTeamPoints)]
+    start = time.perf_counter()
+    expected = [calculate_guess_score(guess, game, rules) for guess in guesses]
+    perObject = time.perf_counter() - start
+
+    # Scoring all guesses at once
+    start = time.perf_counter()
+    scores = score_guesses(firstTeamPoints, secondTeamPoints, game.firstTeamPoints, game.secondTeamPoints, rules)
+    vectorized = time.perf_counter() - start
+
+    # Both approaches must give the same scores
+    assert np.array_equal(scores, np.asarray(expected)), "Scores don't match"
+
+    # Showing the results
+    print(f"Guesses scored: {size}")
+    print(f"Per-object: {perObject:.3f}s ({size / perObject:,.0f} guesses/s)")
+    print(f"Vectorized: {vectorized:.3f}s ({size / vectorized:,.0f} guesses/s)")
+    print(f"Speedup: {perObject / vectorized:.1f}x")
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 10:15:44 2026
+
+@author: RenatoHenz
+
+Benchmark comparing the reflective 'as_dict' previously copied on every model with the shared serializer.
+It must be executed from the root directory, with the '.env' file set up:
+
+    (env) $ python -m benchmarks.serializer [number of rows]
+
+"""
+
+# Other dependencies
+from datetime import datetime, timedelta
+import sys
+import time
+
+# Import the serializer and a model
+from app.serializer import serialize
+from app.modules.pools.models import Game
+
+# Function to format an object (like datetime/date) to a string, as previously done by the models
+def default_object_string(object):
+    if str(type(object)) == "<class 'datetime.datetime'>":
+        return object.isoformat()
+    elif str(type(object)) == "<class 'datetime.date'>":
+        return object.strftime("%Y-%m-%d")
+    return object
+
+# Returning data as dict, as previously done by the models
+def legacy_as_dict(self):
+    data = {c.name: default_object_string(getattr(self, c.name))
+            for c in self.__table__.columns
+            if c.name != "hashpass"}
+    for c in self.__dict__:
+        if 'app' in str(type(self.__dict__[c])):
+            data[c] = legacy_as_dict(self.__dict__[c])
+        if 'InstrumentedList' in str(type(self.__dict__[c])):
+            data[c+'_ids'] = [i.id for i in self.__dict__[c]]
+    return data
+
+# Running the benchmark
+if __name__ == "__main__":
+    # Getting the number of rows to be serialized
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    # Creating the games (not added to the database)
+    now = datetime.now()
+    games = []
+    for i in range(size):
+        game = Game(now + timedelta(minutes=i), 'BR', 'AR', i % 5, i % 3)
+        game.createdAt = game.updatedAt = now
+        games.append(game)
+
+    # Serializing with the reflective function
+    start = time.perf_counter()
+    expected = [legacy_as_dict(game) for game in games]
+    legacy = time.perf_counter() - start
+
+    # Serializing with the shared serializer
+    start = time.perf_counter()
+    serialized = [serialize(game) for game in games]
+    planned = time.perf_counter() - start
+
+    # Both approaches must give the same data
+    assert serialized == expected, "Serialized data doesn't match"
+
+    # Showing the results
+    print(f"Rows serialized: {size}")
+    print(f"Reflective: {legacy:.3f}s ({size / legacy:,.0f} rows/s)")
+    print(f"Planned: {planned:.3f}s ({size / planned:,.0f} rows/s)")
+    print(f"Speedup: {legacy / planned:.1f}x")
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 14:12:36 2026
+
+@author: RenatoHenz
+
+Local Socket.IO message queue, a stand-in for Redis when running many workers on a single machine
+(like on development and on the Socket.IO load test). It forwards every message received on the first
+port to all the processes subscribed on the second one, so they must use the same address on the
+'SOCKETIO_MESSAGE_QUEUE' variable ('zmq+tcp://host:port+port'). It requires the 'pyzmq' package:
+
+    (env) $ pip install pyzmq
+    (env) $ python broker.py [zmq+tcp://127.0.0.1:5555+5556]
+
+Refs:
+    * python-socketio ZmqManager: https://python-socketio.readthedocs.io/en/latest/api.html#zmqmanager
+    * ZeroMQ Proxy: https://pyzmq.readthedocs.io/en/latest/api/zmq.html#zmq.proxy
+
+"""
+
+# Other dependencies
+import re
+import sys
+import zmq
+
+# Default broker address
+DEFAULT_URL = 'zmq+tcp://127.0.0.1:5555+5556'
+
+# Function to get the host and the receiving and publishing ports from a message queue URL
+def parse_url(url):
+    match = re.match(r'^zmq\+tcp://(.+):(\d+)\+(\d+)$', url)
+    if match is None: raise ValueError(f"Unexpected message queue URL: {url}")
+    return match.group(1), int(match.group(2)), int(match.group(3))
+
+# Function to run the broker, forwarding the received messages to the subscribers until it's stopped
+def run_broker(url=DEFAULT_URL):
+    host, receiverPort, publisherPort = parse_url(url)
+    context = zmq.Context()
+    receiver = context.socket(zmq.PULL)
+    receiver.bind(f"tcp://{host}:{receiverPort}")
+    publisher = context.socket(zmq.PUB)
+    publisher.bind(f"tcp://{host}:{publisherPort}")
+    try: zmq.proxy(receiver, publisher)
+    finally:
+        receiver.close()
+        publisher.close()
+        context.term()
+
+# Running the broker
+if __name__ == "__main__":
+    url = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_URL
+    print(f"Message queue broker listening on {url}")
+    try: run_broker(url)
+    except KeyboardInterrupt: pass
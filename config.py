@@ -25,9 +25,98 @@ if os.environ.get('SQL_DRIVER') == 'sqlite':
 elif os.environ.get('SQL_DRIVER') == 'mysql':
     SQLALCHEMY_DATABASE_URI = os.environ.get('SQL_DRIVER') + '+pymysql://' + quote(os.environ.get('SQL_USER')) + ':' + quote(os.environ.get(
         'SQL_PASS')) + '@' + os.environ.get('SQL_HOST') + ':' + os.environ.get('SQL_PORT') + '/' + os.environ.get('SQL_DB')
+# Define the read replicas (optional), as comma separated database names for SQLite or 'host:port' for MySQL
+# (with the same credentials and database name as the primary database)
+# Safe requests (like GET) read from them, while writes go to the primary database
+# They require a shared 'CACHE_URL', where the users reading from the primary database are kept
+SQL_REPLICAS = [replica.strip() for replica in os.environ.get('SQL_REPLICAS', '').split(',') if replica.strip()]
+SQLALCHEMY_REPLICA_URIS = []
+if os.environ.get('SQL_DRIVER') == 'sqlite':
+    SQLALCHEMY_REPLICA_URIS = ['sqlite:///' + os.path.join(BASE_DIR, replica + '.db') + '?check_same_thread=False'
+                               for replica in SQL_REPLICAS]
+elif os.environ.get('SQL_DRIVER') == 'mysql':
+    SQLALCHEMY_REPLICA_URIS = [os.environ.get('SQL_DRIVER') + '+pymysql://' + quote(os.environ.get('SQL_USER')) + ':' + quote(os.environ.get(
+        'SQL_PASS')) + '@' + replica + '/' + os.environ.get('SQL_DB') for replica in SQL_REPLICAS]
+# Seconds during which a user who has written something reads from the primary database ("read your writes")
+# It should be longer than the replication lag, which also limits how long responses read from replicas are cached
+READ_YOUR_WRITES_SECONDS = int(os.environ.get('READ_YOUR_WRITES_SECONDS', 5))
 DATABASE_CONNECT_OPTIONS = {}
+# Database connection pool, shared by all the requests of a process
+# Its size and overflow should cover the concurrent requests of each worker (see the '/metrics' checkout waits)
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 20))
+DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+# Seconds to wait for a connection when all of them are checked out
+DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
 # Option to try avoiding problemas of connection with SQL server being lost
-SQLALCHEMY_ENGINE_OPTIONS = {'pool_size' : 100, 'pool_recycle' : 280, 'pool_pre_ping': True}
+DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 280))
+DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+SQLALCHEMY_ENGINE_OPTIONS = {'pool_recycle': DB_POOL_RECYCLE, 'pool_pre_ping': DB_POOL_PRE_PING,
+                             'connect_args': DATABASE_CONNECT_OPTIONS}
+# SQLite opens a new connection for each session, so it has no pool to be sized
+if os.environ.get('SQL_DRIVER') != 'sqlite':
+    SQLALCHEMY_ENGINE_OPTIONS.update({'pool_size': DB_POOL_SIZE, 'max_overflow': DB_MAX_OVERFLOW,
+                                      'pool_timeout': DB_POOL_TIMEOUT})
+# Logging every SQL statement (for debugging only)
+SQLALCHEMY_ECHO = os.environ.get('SQL_ECHO', 'false').lower() == 'true'
+
+# Cache backend shared by the application caches
+# 'memory://' keeps a cache on each process memory, while 'redis://host:port/db' shares it between processes
+CACHE_URL = os.environ.get('CACHE_URL', 'memory://')
+# Authenticated users cache (maximum number of users on a memory cache and time to live in seconds)
+USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', 10000))
+USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 300))
+# Read endpoints responses cache (maximum number of responses on a memory cache and time to live in seconds)
+# Responses are invalidated by the write endpoints, so on a shared cache the time to live only limits how long
+# unused ones are kept. A memory cache is only invalidated on the process which wrote the data, so other processes
+# (like other workers) keep serving the invalidated responses until they expire: its time to live is a few seconds
+RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 10000))
+RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 5 if CACHE_URL.startswith('memory://') else 3600))
+
+# JSON provider used to encode the API responses
+# 'fast' uses orjson (which encodes datetimes natively), while 'default' uses the standard library encoder
+JSON_PROVIDER = os.environ.get('JSON_PROVIDER', 'fast')
+
+# Socket.IO message queue, which shares the emits (and rooms deliveries) among the application processes,
+# so many workers can be run (like 'redis://localhost:6379/0', or 'zmq+tcp://localhost:5555+5556' with the local 'broker.py')
+# Without it, events only reach the clients connected to the process which emitted them
+SOCKETIO_MESSAGE_QUEUE = os.environ.get('SOCKETIO_MESSAGE_QUEUE') or None
+# Channel used on the message queue (applications sharing the same queue must use different channels)
+SOCKETIO_CHANNEL = os.environ.get('SOCKETIO_CHANNEL', 'nlw-copa')
+
+# Push notifications driver ('fcm', 'fake' to keep them in memory, or 'none' to disable them)
+# Without it the notifications are disabled, with a warning on startup
+PUSH_NOTIFICATION_DRIVER = os.environ.get('PUSH_NOTIFICATION_DRIVER') or 'none'
+# Background tasks sending the push notifications batches, and the retries (with exponential backoff,
+# starting at 'PUSH_BACKOFF' seconds) of the temporary failures
+PUSH_WORKERS = int(os.environ.get('PUSH_WORKERS', 4))
+PUSH_RETRIES = int(os.environ.get('PUSH_RETRIES', 3))
+PUSH_BACKOFF = float(os.environ.get('PUSH_BACKOFF', 1.0))
+# Maximum number of push notifications waiting to be sent while many of them are being queued (like results notifications)
+PUSH_MAX_PENDING = int(os.environ.get('PUSH_MAX_PENDING', 10000))
+
+# Interval (in seconds) the Socket.IO events background task waits for new events when its queue is empty
+EVENTS_INTERVAL = float(os.environ.get('EVENTS_INTERVAL', 0.05))
+
+# Background jobs (heavy writes, like setting games results), run by 'worker.py' from the job table
+# Heavy routes enqueue a job and return '202 Accepted' when 'JOBS_ASYNC' is enabled (or when the client sends
+# the 'Prefer: respond-async' header), otherwise they run inline
+JOBS_ASYNC = os.environ.get('JOBS_ASYNC', 'false').lower() == 'true'
+# Interval (in seconds) the worker waits for new jobs when there are none
+JOBS_INTERVAL = float(os.environ.get('JOBS_INTERVAL', 1.0))
+# Attempts of each job, waiting longer before each retry (starting at 'JOBS_BACKOFF' seconds)
+JOBS_MAX_ATTEMPTS = int(os.environ.get('JOBS_MAX_ATTEMPTS', 3))
+JOBS_BACKOFF = float(os.environ.get('JOBS_BACKOFF', 5.0))
+# Seconds after which a running job is considered lost (like when its worker was killed) and is run again
+JOBS_TIMEOUT = int(os.environ.get('JOBS_TIMEOUT', 600))
+
+# Points given for each kind of hit on a guess (missing rules fall back to the defaults)
+# 'exact': both team points, 'draw': a draw, 'winner': the match winner, 'oneSide': one of the teams points
+SCORING_RULES = {
+    'exact': int(os.environ.get('SCORING_EXACT', 5)),
+    'draw': int(os.environ.get('SCORING_DRAW', 3)),
+    'winner': int(os.environ.get('SCORING_WINNER', 2)),
+    'oneSide': int(os.environ.get('SCORING_ONE_SIDE', 1)),
+}
 
 # Available languages for internationalization/localization (i18n, l10n)
 LANGUAGES = {
@@ -52,6 +141,14 @@ CSRF_SESSION_KEY = os.environ.get('APP_SECRET')
 # Secret key for signing cookies
 SECRET_KEY = os.environ.get('APP_SECRET')
 
+# Secrets for the authentication tokens, loaded once at startup
+# New tokens are signed with 'APP_SECRET', while tokens signed with any of the comma separated
+# 'APP_PREVIOUS_SECRETS' are still accepted (allowing the secret to be rotated without logging users out)
+AUTH_SECRETS = [os.environ.get('APP_SECRET')] + \
+    [secret.strip() for secret in os.environ.get('APP_PREVIOUS_SECRETS', '').split(',') if secret.strip()]
+# Maximum number of verified authentication tokens kept on each process memory
+TOKEN_CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE', 50000))
+
 # Defining serve port number and host
 PORT = os.environ.get('PORT')
 HOST = os.environ.get('HOST')
@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 25 09:12:40 2026
+
+@author: RenatoHenz
+"""
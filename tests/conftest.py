@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 25 09:14:03 2026
+
+@author: RenatoHenz
+
+Fixtures shared by the tests, which run against a temporary SQLite database (never the one set on '.env'):
+
+    (env) $ python -m pytest
+
+Refs:
+    * pytest Fixtures: https://docs.pytest.org/en/7.1.x/how-to/fixtures.html
+    * Flask Testing: https://flask.palletsprojects.com/en/2.0.x/testing/
+
+"""
+
+# Other dependencies
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import atexit
+import os
+import shutil
+import tempfile
+
+# Pointing the application to a temporary database (and local services) before it's imported,
+# since the config is read on import ('.env' doesn't override the variables which are already set)
+TEST_DIR = tempfile.mkdtemp(prefix='nlw-copa-tests-')
+atexit.register(shutil.rmtree, TEST_DIR, ignore_errors=True)
+os.environ.update({
+    'SQL_DRIVER': 'sqlite',
+    'SQL_DB': os.path.join(TEST_DIR, 'test'),
+    'SQL_REPLICAS': '',
+    'SQL_ECHO': 'false',
+    'APP_SECRET': 'test-secret',
+    'APP_PREVIOUS_SECRETS': '',
+    'CACHE_URL': 'memory://',
+    'SOCKETIO_MESSAGE_QUEUE': '',
+    'PUSH_NOTIFICATION_DRIVER': 'fake',
+    'JOBS_ASYNC': 'false',
+    'JOBS_BACKOFF': '0',
+})
+
+# Test dependencies
+import pytest
+from sqlalchemy import event
+
+# Import the application, the database object and the models
+from app import app as flask_app, db, limiter
+from app.modules.users.models import User, token_cache
+from app.modules.pools.models import Pool, Participant, Game
+from app.modules.pools.codes import code_allocator
+from app.modules.pools.ranking import add_participant
+from app.middleware import user_cache
+from app.services.response_cache import response_cache, tag_versions
+from app.services.replicas import sticky_users
+
+# Caches kept on the process memory, which must not leak between the tests
+CACHES = (user_cache, token_cache, response_cache, tag_versions, sticky_users)
+
+# The application, without the rate limit (since all requests come from the same address)
+@pytest.fixture(scope='session')
+def app():
+    limiter.enabled = False
+    flask_app.config['TESTING'] = True
+    yield flask_app
+
+# Removing every row and cached data after each test, so the tests don't depend on each other
+@pytest.fixture(autouse=True)
+def clean_database(app):
+    yield
+    db.session.remove()
+    with db.engine.begin() as connection:
+        for table in reversed(db.metadata.sorted_tables): connection.execute(table.delete())
+    for cache in CACHES: cache.clear()
+
+# Client sending requests to the application
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+# Function to get the authorization headers of a user
+def auth_headers(userId):
+    return {"Authorization": f"Bearer {User.encode_auth_token(None, userId)}"}
+
+# Fixture to create users, returning their IDs
+@pytest.fixture
+def make_user(app):
+    count = [0]
+    def make(name=None, avatarUrl=None, fcmToken=None):
+        count[0] += 1
+        user = User(name or f"User {count[0]}", f"user{count[0]}@test.local", avatarUrl=avatarUrl, fcmToken=fcmToken)
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+    return make
+
+# Fixture to create pools (with a free code), joined by the given users on the same order
+# Returns the pool ID
+@pytest.fixture
+def make_pool(app):
+    def make(title="Test pool", userIds=()):
+        pool = code_allocator.create_pool(db.session, title, ownerId=userIds[0] if userIds else None)
+        for userId in userIds:
+            participant = Participant(userId, pool.id)
+            db.session.add(participant)
+            db.session.flush()
+            add_participant(db.session, participant, db.session.query(User).get(userId))
+        db.session.commit()
+        return pool.id
+    return make
+
+# Fixture to create games (tomorrow by default), returning their IDs
+@pytest.fixture
+def make_game(app):
+    count = [0]
+    def make(date=None, firstTeamCountryCode=None, secondTeamCountryCode='AR'):
+        count[0] += 1
+        game = Game(date or datetime.now() + timedelta(days=1), firstTeamCountryCode or f"T{count[0]}",
+                    secondTeamCountryCode)
+        db.session.add(game)
+        db.session.commit()
+        return game.id
+    return make
+
+# Fixture counting the statements sent to the database while its block runs
+@pytest.fixture
+def count_statements(app):
+    @contextmanager
+    def count():
+        statements = []
+        def listener(conn, cursor, statement, *args): statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try: yield statements
+        finally: event.remove(db.engine, 'before_cursor_execute', listener)
+    return count
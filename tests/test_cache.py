@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 25 16:02:09 2026
+
+@author: RenatoHenz
+"""
+
+# Other dependencies
+from datetime import timedelta
+
+# Test dependencies
+import pytest
+from sqlalchemy import update
+from tests.conftest import auth_headers
+
+# Getting config data
+from config import CACHE_URL, RESPONSE_CACHE_TTL
+
+# Import the database object, the models and the caches
+from app import db
+from app.unit_of_work import unit_of_work
+from app.modules.users.models import User, token_cache
+from app.modules.pools.models import Game
+from app.modules.pools.guesses import get_games_now
+from app.services.response_cache import response_cache
+from app.middleware import user_cache
+from app.services.cache import LRUCache
+
+# The memory cache evicts the least recently used entries and the expired ones
+def test_lru_cache():
+    cache = LRUCache('test', maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert (cache.get('a'), cache.get('b'), cache.get('c')) == (1, None, 3)
+    assert cache.stats()['evictions'] == 1
+
+    cache.set('d', 4, ttl=-1)
+    assert cache.get('d') is None
+
+# Verified tokens are kept, so they aren't verified again, and invalid ones are rejected
+def test_verified_tokens_are_cached(app, make_user):
+    userId = make_user()
+    token = User.encode_auth_token(None, userId)
+    hits = token_cache.hits
+
+    assert User.decode_auth_token(token) == userId
+    assert User.decode_auth_token(token) == userId
+    assert token_cache.hits == hits + 1
+    assert User.decode_auth_token(token[:-2] + 'xx') == 'Invalid token. Please log in again.'
+
+# Authenticated users are read from the cache, and changing them removes them from it
+def test_authenticated_users_are_cached(client, make_user, count_statements):
+    userId = make_user(name="Before")
+    headers = auth_headers(userId)
+    client.get('/me', headers=headers)
+
+    with count_statements() as statements:
+        response = client.get('/me', headers=headers)
+    assert response.get_json()['user']['name'] == "Before"
+    assert not any('FROM user' in statement for statement in statements)
+
+    with unit_of_work(): db.session.query(User).get(userId).name = "After"
+    assert user_cache.get(userId) is None
+    assert client.get('/me', headers=headers).get_json()['user']['name'] == "After"
+
+# Cached users are only removed once their changes are committed, and kept if they are rolled back
+def test_cached_users_are_invalidated_on_commit(client, make_user):
+    userId = make_user(name="Before")
+    client.get('/me', headers=auth_headers(userId))
+
+    with pytest.raises(RuntimeError):
+        with unit_of_work() as session:
+            session.query(User).get(userId).name = "Rolled back"
+            session.flush()
+            raise RuntimeError()
+    assert user_cache.get(userId)['name'] == "Before"
+
+    with unit_of_work() as session:
+        session.query(User).get(userId).name = "After"
+        session.flush()
+        assert user_cache.get(userId)['name'] == "Before"
+    assert user_cache.get(userId) is None
+
+# Cached responses are revalidated with their ETag, and writes invalidate them
+def test_cached_responses_are_invalidated(client, make_user):
+    headers = auth_headers(make_user())
+    first = client.get('/pools/count')
+    etag = first.headers['ETag']
+    assert first.get_json() == {"count": 0}
+
+    assert client.get('/pools/count', headers={"If-None-Match": etag}).status_code == 304
+    client.post('/pools', headers=headers, json={"title": "New pool"})
+
+    second = client.get('/pools/count', headers={"If-None-Match": etag})
+    assert second.status_code == 200 and second.get_json() == {"count": 1}
+    assert second.headers['ETag'] != etag
+
+# Responses depending on the user are cached for each user
+def test_per_user_responses(client, make_user, make_pool, make_game):
+    userIds = [make_user(), make_user()]
+    poolId = make_pool(userIds=userIds)
+    gameId = make_game()
+    client.get(f"/pools/{poolId}/games", headers=auth_headers(userIds[1]))
+    client.post(f"/pools/{poolId}/games/{gameId}/guesses", headers=auth_headers(userIds[0]),
+                json={"firstTeamPoints": 1, "secondTeamPoints": 0})
+
+    mine = client.get(f"/pools/{poolId}/games", headers=auth_headers(userIds[0])).get_json()['games']
+    theirs = client.get(f"/pools/{poolId}/games", headers=auth_headers(userIds[1])).get_json()['games']
+
+    assert mine[0]['guess'] is not None and theirs[0]['guess'] is None
+
+# Responses depending on the current time aren't cached, since no write invalidates them
+def test_time_relative_responses(client, make_user, make_pool, make_game):
+    userId = make_user()
+    poolId = make_pool(userIds=[userId])
+    gameId = make_game()
+    upcoming = lambda: client.get(f"/pools/{poolId}/games?status=upcoming", headers=auth_headers(userId))
+    assert [game['id'] for game in upcoming().get_json()['games']] == [gameId]
+
+    # The game starts, without any write invalidating the responses
+    db.session.execute(update(Game.__table__).where(Game.__table__.c.id == gameId).
+                       values(date=get_games_now() - timedelta(minutes=1)))
+    db.session.commit()
+
+    response = upcoming()
+    assert response.get_json()['games'] == [] and 'ETag' not in response.headers
+    assert 'ETag' in client.get(f"/pools/{poolId}/games", headers=auth_headers(userId)).headers
+
+# A memory cache is only invalidated on its own process, so its responses expire in a few seconds
+def test_memory_cache_ttl():
+    assert CACHE_URL == 'memory://' and response_cache.ttl == RESPONSE_CACHE_TTL <= 5
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 25 16:40:31 2026
+
+@author: RenatoHenz
+"""
+
+# Other dependencies
+from dataclasses import dataclass
+from datetime import datetime, date
+from decimal import Decimal
+import builtins
+import json
+import uuid
+
+# Markup (like the translated texts), encoded as its HTML
+from markupsafe import Markup
+
+# Test dependencies
+import pytest
+
+# Import the database object, the models, the serializer and the JSON encoding
+from app import db
+from app.modules.pools.models import Pool, Game
+from app.modules.users.models import User
+from app.serializer import serialize
+from app.encoding import Fragment, create_json_provider, OrjsonProvider, StdlibJSONProvider
+
+# Both JSON providers
+PROVIDERS = ['fast', 'default']
+
+# Models are serialized with all of their columns (datetimes as ISO 8601), and the relationships already loaded
+def test_serializer(app, make_user):
+    userId = make_user(name="Owner")
+    pool = Pool("Serialized", "SERIAL", userId)
+    db.session.add(pool)
+    db.session.commit()
+    pool = db.session.query(Pool).get(pool.id)
+    pool.owner
+
+    data = serialize(pool)
+
+    assert {key: data[key] for key in ('id', 'title', 'code', 'ownerId')} == \
+        {"id": pool.id, "title": "Serialized", "code": "SERIAL", "ownerId": userId}
+    assert data['createdAt'] == pool.createdAt.isoformat()
+    assert data['owner']['name'] == "Owner"
+    assert serialize(pool, fields=['id', 'code'], include=()) == {"id": pool.id, "code": "SERIAL"}
+    assert serialize(pool, fields=['id'], include={'owner': {'fields': ['name']}}) == \
+        {"id": pool.id, "owner": {"name": "Owner"}}
+    with pytest.raises(KeyError): serialize(pool, include=['missing'])
+
+# Games are serialized the same way by 'as_dict'
+def test_as_dict(app):
+    game = Game(datetime(2030, 6, 11, 16), 'BR', 'AR', 2, 1)
+    db.session.add(game)
+    db.session.commit()
+
+    data = game.as_dict()
+
+    assert data['date'] == "2030-06-11T16:00:00"
+    assert (data['firstTeamPoints'], data['secondTeamPoints']) == (2, 1)
+
+# Both providers encode the same values (datetimes, dates and UUIDs included) to the same JSON
+@pytest.mark.parametrize('name', PROVIDERS)
+def test_json_providers(name):
+    value = {"b": [1, 2.5, None, True], "a": "ção", "date": datetime(2030, 6, 11, 16, 30),
+             "day": date(2030, 6, 11), "id": uuid.UUID(int=1)}
+
+    encoded = create_json_provider(name).dumps(value)
+
+    assert json.loads(encoded) == {"b": [1, 2.5, None, True], "a": "ção", "date": "2030-06-11T16:30:00",
+                                   "day": "2030-06-11", "id": str(uuid.UUID(int=1))}
+    assert encoded.index(b'"a"') < encoded.index(b'"b"')
+
+# Define a dataclass, encoded as a dict
+@dataclass
+class Score():
+    points: int
+    average: Decimal
+
+# Both providers encode the values supported by Flask's encoder to the same JSON
+@pytest.mark.parametrize('name', PROVIDERS)
+def test_json_flask_values(name):
+    value = {"price": Decimal('0.10'), "score": Score(5, Decimal('2.5')), "html": Markup("<b>Friends</b>")}
+
+    encoded = create_json_provider(name).dumps(value)
+
+    assert json.loads(encoded) == {"price": "0.10", "score": {"points": 5, "average": "2.5"},
+                                   "html": "<b>Friends</b>"}
+
+# Without orjson, the fast provider falls back to the default one with a warning
+def test_json_provider_fallback(monkeypatch, caplog):
+    importModule = builtins.__import__
+    def import_without_orjson(name, *args, **kwargs):
+        if name == 'orjson': raise ImportError(name)
+        return importModule(name, *args, **kwargs)
+    monkeypatch.setattr(builtins, '__import__', import_without_orjson)
+
+    assert isinstance(create_json_provider('fast'), StdlibJSONProvider)
+    assert [record.levelname for record in caplog.records if record.name == 'app.encoding'] == ['WARNING']
+
+# Fragments are spliced into the encoded data as they are
+@pytest.mark.parametrize('name', PROVIDERS)
+def test_json_fragments(name):
+    provider = create_json_provider(name)
+
+    encoded = provider.dumps({"games": [Fragment(b'{"id":"x"}'), Fragment('{"id":"y"}')], "count": 2})
+
+    assert json.loads(encoded) == {"games": [{"id": "x"}, {"id": "y"}], "count": 2}
+
+# The provider is chosen by its name
+def test_json_provider_names():
+    assert isinstance(create_json_provider('fast'), OrjsonProvider)
+    assert isinstance(create_json_provider('default'), StdlibJSONProvider)
+    with pytest.raises(ValueError): create_json_provider('unknown')
+    with pytest.raises(TypeError): create_json_provider('default').dumps({"user": object()})
+
+# Responses are encoded by the application provider
+def test_json_responses(client, make_user):
+    response = client.get('/users/count')
+    assert response.mimetype == 'application/json'
+    assert response.get_json() == {"count": 0}
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 25 17:22:10 2026
+
+@author: RenatoHenz
+"""
+
+# Other dependencies
+from datetime import datetime, timedelta
+import jwt
+
+# Test dependencies
+import pytest
+
+# Import the authentication secrets
+from config import AUTH_SECRETS
+
+# Import the application, Socket.IO and the events queue
+from app import socketio, events
+
+# Shared test helpers
+from tests.conftest import auth_headers
+
+# Function to let the events queue background task emit the published events
+def wait_events():
+    socketio.sleep(events.interval * 4)
+
+# Function to get the received events by name
+def get_received(socketClient):
+    received = {}
+    for event in socketClient.get_received(): received.setdefault(event['name'], []).append(event['args'][0])
+    return received
+
+# Fixture with a pool of two users and a game, and Socket.IO clients for both users and an anonymous one
+@pytest.fixture
+def pool_sockets(app, client, make_user, make_pool, make_game):
+    userIds = [make_user(), make_user()]
+    poolId = make_pool(userIds=userIds)
+    gameId = make_game()
+    token = auth_headers(userIds[0])['Authorization'].split()[1]
+    sockets = [socketio.test_client(app, auth={'token': token}, flask_test_client=client),
+               socketio.test_client(app, headers=auth_headers(userIds[1]), flask_test_client=client),
+               socketio.test_client(app, flask_test_client=client)]
+    yield userIds, poolId, gameId, sockets
+    for socketClient in sockets: socketClient.disconnect()
+
+# Only authenticated participants can join a pool room
+def test_join_pool_room(pool_sockets):
+    userIds, poolId, gameId, (first, second, anonymous) = pool_sockets
+
+    assert first.emit('join_pool', {'poolId': poolId}, callback=True) == {"success": True}
+    assert second.emit('join_pool', {'poolId': poolId}, callback=True) == {"success": True}
+    assert anonymous.emit('join_pool', {'poolId': poolId}, callback=True)['success'] is False
+    assert first.emit('join_pool', {'poolId': 'missing'}, callback=True)['success'] is False
+    assert first.emit('join_pool', {}, callback=True)['success'] is False
+
+# Expired and invalid tokens can't join a pool room
+def test_join_pool_room_rejects_bad_tokens(app, client, make_user, make_pool):
+    userId = make_user()
+    poolId = make_pool(userIds=[userId])
+    expired = jwt.encode({"sub": userId, "iat": datetime.utcnow() - timedelta(days=2),
+                          "exp": datetime.utcnow() - timedelta(days=1)}, AUTH_SECRETS[0], algorithm='HS256')
+
+    for token in (expired, 'invalid', auth_headers(userId)['Authorization'].split()[1][:-2] + 'xx'):
+        socketClient = socketio.test_client(app, auth={'token': token}, flask_test_client=client)
+        response = socketClient.emit('join_pool', {'poolId': poolId}, callback=True)
+        socketClient.disconnect()
+        assert response == {"success": False, "message": "Authentication failed. Please login to access the resource."}
+
+# Guesses counts are coalesced, and results are sent to everyone with the ranking changes to the pool room
+def test_pool_events(client, pool_sockets):
+    userIds, poolId, gameId, (first, second, anonymous) = pool_sockets
+    for socketClient in (first, second): socketClient.emit('join_pool', {'poolId': poolId}, callback=True)
+    coalesced = events.stats()['coalesced']
+
+    for i in range(5):
+        response = client.post(f'/pools/{poolId}/games/{gameId}/guesses', json={'firstTeamPoints': i, 'secondTeamPoints': 1},
+                               headers=auth_headers(userIds[0]))
+        assert response.status_code == 201
+    wait_events()
+
+    received = get_received(first)
+    assert received['guesses_count'][-1] == {"poolId": poolId, "gameId": gameId, "count": 1}
+    assert len(received['guesses_count']) + events.stats()['coalesced'] - coalesced == 5
+    assert get_received(anonymous) == {}
+
+    client.post(f'/pools/{poolId}/games/{gameId}/guesses', json={'firstTeamPoints': 2, 'secondTeamPoints': 1},
+                headers=auth_headers(userIds[1]))
+    response = client.put(f'/games/{gameId}/result', json={'firstTeamPoints': 2, 'secondTeamPoints': 1},
+                          headers=auth_headers(userIds[0]))
+    assert response.status_code == 200
+    wait_events()
+
+    result = {"gameId": gameId, "firstTeamPoints": 2, "secondTeamPoints": 1}
+    received = get_received(second)
+    assert received['game_result'] == [result]
+    update, = received['ranking_update']
+    assert (update['poolId'], update['gameId']) == (poolId, gameId)
+    assert sorted((change['score'], change['position']) for change in update['changes']) == [(3, 2), (5, 1)]
+    assert get_received(anonymous) == {"game_result": [result]}
+
+# Events aren't emitted when the request fails
+def test_failed_requests_dont_publish(client, pool_sockets):
+    userIds, poolId, gameId, (first, second, anonymous) = pool_sockets
+    first.emit('join_pool', {'poolId': poolId}, callback=True)
+    published = events.stats()['published']
+
+    response = client.post(f'/pools/{poolId}/games/{gameId}/guesses', json={'firstTeamPoints': -1, 'secondTeamPoints': 1},
+                           headers=auth_headers(userIds[0]))
+    assert response.status_code == 400
+    wait_events()
+
+    assert events.stats()['published'] == published
+    assert get_received(first) == {}
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 25 15:20:44 2026
+
+@author: RenatoHenz
+"""
+
+# Other dependencies
+from datetime import datetime, timedelta
+import json
+
+# Test dependencies
+from tests.conftest import auth_headers
+
+# Import the database object and the models
+from app import db
+from app.modules.pools.models import Participant, Game
+from app.modules.pools import controllers
+from app.modules.pools.guesses import get_games_now
+
+# Function to get the games as stored, as a set of (date, first team, second team)
+def get_stored_games():
+    games = {(game.date, game.firstTeamCountryCode, game.secondTeamCountryCode) for game in db.session.query(Game)}
+    db.session.commit()
+    return games
+
+# The pool games are listed from the latest to the earliest, along with the user's guesses,
+# and can be filtered by status and paged with a cursor
+def test_pool_games_listing(client, make_user, make_pool, make_game):
+    userId = make_user()
+    poolId = make_pool(userIds=[userId])
+    now = datetime.now()
+    upcoming = [make_game(date=now + timedelta(days=i)) for i in (1, 2, 3)]
+    finished = make_game(date=now - timedelta(days=1))
+    headers = auth_headers(userId)
+    client.post(f"/pools/{poolId}/games/{upcoming[0]}/guesses", headers=headers,
+                json={"firstTeamPoints": 1, "secondTeamPoints": 0})
+    client.put(f"/games/{finished}/result", headers=headers, json={"firstTeamPoints": 0, "secondTeamPoints": 0})
+    url = f"/pools/{poolId}/games"
+
+    games = client.get(url, headers=headers).get_json()['games']
+    assert [game['id'] for game in games] == upcoming[::-1] + [finished]
+    assert games[2]['guess']['firstTeamPoints'] == 1 and games[0]['guess'] is None
+
+    assert [game['id'] for game in client.get(url + '?status=upcoming', headers=headers).get_json()['games']] == \
+        upcoming[::-1]
+    assert [game['id'] for game in client.get(url + '?status=finished', headers=headers).get_json()['games']] == \
+        [finished]
+
+    first = client.get(url + '?limit=3', headers=headers).get_json()
+    cursor = first['next']
+    second = client.get(url, headers=headers, query_string={"limit": 3, **cursor}).get_json()
+    assert [game['id'] for game in first['games'] + second['games']] == upcoming[::-1] + [finished]
+    assert second['next'] is None
+
+    assert client.get(url + '?status=started', headers=headers).status_code == 400
+    assert client.get("/pools/missing/games", headers=headers).status_code == 404
+
+# Upcoming games are the ones still open to guesses, using the same reference time (the games time zone)
+def test_upcoming_games_accept_guesses(client, make_user, make_pool, make_game):
+    userId = make_user()
+    poolId = make_pool(userIds=[userId])
+    now = get_games_now()
+    gameIds = [make_game(date=now + timedelta(hours=1)), make_game(date=now - timedelta(hours=1))]
+    headers = auth_headers(userId)
+
+    upcoming = client.get(f"/pools/{poolId}/games?status=upcoming", headers=headers).get_json()['games']
+    statuses = [client.post(f"/pools/{poolId}/games/{gameId}/guesses", headers=headers,
+                            json={"firstTeamPoints": 1, "secondTeamPoints": 0}).status_code for gameId in gameIds]
+
+    assert [game['id'] for game in upcoming] == gameIds[:1]
+    assert statuses[0] < 400 and statuses[1] == 400
+
+# Schedules sent as JSON are imported with a report of the invalid rows, and importing them again
+# doesn't create the games twice
+def test_import_json_schedule(client, make_user):
+    headers = auth_headers(make_user())
+    schedule = {"games": [
+        {"date": "2030-06-11T16:00:00+0000", "firstTeamCountryCode": "BR", "secondTeamCountryCode": "AR"},
+        {"date": "2030-06-12T16:00:00+00:00", "firstTeamCountryCode": "DE", "secondTeamCountryCode": "FR"},
+        {"date": "2030-06-12T16:00:00+00:00", "firstTeamCountryCode": "DE", "secondTeamCountryCode": "FR"},
+        {"date": "tomorrow", "firstTeamCountryCode": "ES", "secondTeamCountryCode": "PT"},
+        {"date": "2030-06-13T16:00:00+0000", "firstTeamCountryCode": "", "secondTeamCountryCode": "PT"},
+    ]}
+
+    report = client.post('/games/import', headers=headers, json=schedule).get_json()['report']
+    assert (report['rows'], report['created'], report['duplicates'], report['failed']) == (5, 2, 1, 2)
+    assert [error['row'] for error in report['errors']] == [4, 5]
+    assert list(report['errors'][0]['message']) == ['date']
+    assert get_stored_games() == {(datetime(2030, 6, 11, 16), 'BR', 'AR'), (datetime(2030, 6, 12, 16), 'DE', 'FR')}
+
+    again = client.post('/games/import', headers=headers, json=schedule).get_json()['report']
+    assert (again['created'], again['duplicates']) == (0, 3)
+    assert client.post('/games/import', headers=headers, json={"games": "none"}).status_code == 400
+
+# Imported dates keep their local time like the games created one by one, so those games aren't imported again
+def test_import_keeps_local_dates(client, make_user):
+    headers = auth_headers(make_user())
+    game = {"date": "2026-11-20T16:00:00-0300", "firstTeamCountryCode": "BR", "secondTeamCountryCode": "AR"}
+    assert client.post('/games', headers=headers, json=game).status_code == 201
+
+    report = client.post('/games/import', headers=headers, json=[game]).get_json()['report']
+
+    assert (report['created'], report['duplicates']) == (0, 1)
+    assert get_stored_games() == {(datetime(2026, 11, 20, 16), 'BR', 'AR')}
+
+# Schedules can also be sent as NDJSON and CSV, read line by line
+def test_import_ndjson_and_csv_schedules(client, make_user):
+    headers = auth_headers(make_user())
+    ndjson = "\n".join([
+        json.dumps({"date": "2030-06-11T16:00:00+0000", "firstTeamCountryCode": "BR", "secondTeamCountryCode": "AR"}),
+        "not json",
+        "",
+    ])
+    csv = "date,firstTeamCountryCode,secondTeamCountryCode\r\n" \
+          "2030-06-14T16:00:00+0000,ES,PT\r\n2030-06-11T16:00:00+0000,BR,AR\r\n"
+
+    first = client.post('/games/import', headers=headers, data=ndjson, content_type='application/x-ndjson').get_json()
+    second = client.post('/games/import', headers=headers, data=csv, content_type='text/csv').get_json()
+
+    assert (first['report']['created'], first['report']['failed']) == (1, 1)
+    assert (second['report']['created'], second['report']['duplicates']) == (1, 1)
+    assert len(get_stored_games()) == 2
+    assert client.post('/games/import', headers=headers, data="x", content_type='text/plain').status_code == 415
+
+# The import command reads the schedule from a file
+def test_import_games_command(app, tmp_path):
+    path = tmp_path / 'schedule.csv'
+    path.write_text("date,firstTeamCountryCode,secondTeamCountryCode\n2030-06-14T16:00:00+0000,ES,PT\n")
+
+    result = app.test_cli_runner().invoke(args=['import-games', str(path)])
+
+    assert result.exit_code == 0, result.output
+    assert "1 games created" in result.output
+    assert get_stored_games() == {(datetime(2030, 6, 14, 16), 'ES', 'PT')}
+
+# Setting many results at once ends with the same scores as setting them one at a time,
+# reporting the status of each result
+def test_bulk_results_match_single_results(client, make_user, make_pool, make_game):
+    userIds = [make_user() for _ in range(4)]
+    poolId = make_pool(userIds=userIds)
+    gameIds = [make_game() for _ in range(3)]
+    for i, userId in enumerate(userIds):
+        client.post(f"/pools/{poolId}/guesses", headers=auth_headers(userId), json={"guesses": [
+            {"gameId": gameId, "firstTeamPoints": (i + j) % 3, "secondTeamPoints": i % 2}
+            for j, gameId in enumerate(gameIds)]})
+    results = [{"gameId": gameId, "firstTeamPoints": j, "secondTeamPoints": 1 - j % 2}
+               for j, gameId in enumerate(gameIds)]
+    headers = auth_headers(userIds[0])
+
+    # Function to get the participants totals
+    def get_totals():
+        totals = dict(db.session.query(Participant.userId, Participant.score))
+        db.session.commit()
+        return totals
+
+    for result in results:
+        client.put(f"/games/{result['gameId']}/result", headers=headers, json=result)
+    single = get_totals()
+    for result in results:
+        client.put(f"/games/{result['gameId']}/result", headers=headers, json={"firstTeamPoints": 9, "secondTeamPoints": 9})
+
+    response = client.put('/games/results', headers=headers, json={"results": results + [
+        {"gameId": "missing", "firstTeamPoints": 1, "secondTeamPoints": 0},
+        {"gameId": gameIds[0], "firstTeamPoints": 1},
+    ]})
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [result['status'] for result in data['results']] == [200, 200, 200, 404, 400]
+    assert len(data['updatedGames']) == 3
+    assert get_totals() == single
+    assert client.put('/games/results', headers=headers, json={"results": []}).status_code == 400
+
+# Schedules imported as a job are limited, since they're kept on memory and on the job payload
+def test_async_import_limit(client, make_user, monkeypatch):
+    monkeypatch.setattr(controllers, 'MAX_ASYNC_IMPORT_GAMES', 3)
+    headers = {**auth_headers(make_user()), "Prefer": "respond-async"}
+    lines = [json.dumps({"date": f"2030-06-1{i}T16:00:00+0000", "firstTeamCountryCode": "BR",
+                         "secondTeamCountryCode": f"T{i}"}) for i in range(4)]
+    send = lambda lines: client.post('/games/import', headers=headers, data="\n".join(lines),
+                                     content_type='application/x-ndjson')
+
+    assert send(lines).status_code == 413
+    response = send(lines[:3])
+    assert response.status_code == 202 and response.get_json()['job']['status'] == 'queued'
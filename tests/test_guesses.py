@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 25 11:05:33 2026
+
+@author: RenatoHenz
+"""
+
+# Other dependencies
+from concurrent.futures import ThreadPoolExecutor
+import cuid
+from datetime import datetime, timedelta
+
+# Test dependencies
+from tests.conftest import auth_headers
+
+# Import the database object and the models
+from app import db
+from app.modules.pools.models import Participant, Guess
+from app.modules.pools import guesses as guesses_service
+
+# Function to get the guesses of a user on a pool, as a dict mapping the games IDs to their points
+def get_guesses(poolId, userId):
+    return {guess.gameId: (guess.firstTeamPoints, guess.secondTeamPoints) for guess in
+            db.session.query(Guess).join(Participant, Participant.id == Guess.participantId).
+            filter(Participant.poolId == poolId, Participant.userId == userId)}
+
+# Placing a guess again updates its points, instead of creating another one
+def test_guess_is_updated_when_placed_again(client, make_user, make_pool, make_game):
+    userId = make_user()
+    poolId, gameId = make_pool(userIds=[userId]), make_game()
+    url = f"/pools/{poolId}/games/{gameId}/guesses"
+
+    first = client.post(url, headers=auth_headers(userId), json={"firstTeamPoints": 1, "secondTeamPoints": 0})
+    second = client.post(url, headers=auth_headers(userId), json={"firstTeamPoints": 2, "secondTeamPoints": 2})
+
+    assert (first.status_code, second.status_code) == (201, 201)
+    assert get_guesses(poolId, userId) == {gameId: (2, 2)}
+
+# Guesses are only accepted from participants, for existing games which haven't started yet
+def test_guess_checks(client, make_user, make_pool, make_game):
+    userId, outsiderId = make_user(), make_user()
+    poolId = make_pool(userIds=[userId])
+    gameId, pastGameId = make_game(), make_game(date=datetime.now() - timedelta(days=1))
+    points = {"firstTeamPoints": 1, "secondTeamPoints": 0}
+
+    assert client.post(f"/pools/{poolId}/games/{gameId}/guesses", headers=auth_headers(outsiderId),
+                       json=points).status_code == 403
+    assert client.post(f"/pools/{poolId}/games/missing/guesses", headers=auth_headers(userId),
+                       json=points).status_code == 404
+    assert client.post(f"/pools/missing/games/{gameId}/guesses", headers=auth_headers(userId),
+                       json=points).status_code == 404
+    assert client.post(f"/pools/{poolId}/games/{pastGameId}/guesses", headers=auth_headers(userId),
+                       json=points).status_code == 400
+    assert get_guesses(poolId, userId) == {}
+
+# Parallel guesses for the same participant and game (like double-taps on the mobile app) keep a single guess
+def test_parallel_guesses_keep_a_single_guess(app, make_user, make_pool, make_game):
+    userId = make_user()
+    poolId, gameId = make_pool(userIds=[userId]), make_game()
+    url = f"/pools/{poolId}/games/{gameId}/guesses"
+    headers = auth_headers(userId)
+
+    # Function to send a guess, returning its status
+    def send_guess(i):
+        with app.test_client() as client:
+            return client.post(url, headers=headers, json={"firstTeamPoints": i % 10, "secondTeamPoints": 0}).status_code
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        statuses = list(executor.map(send_guess, range(32)))
+
+    assert statuses == [201] * 32
+    guesses = get_guesses(poolId, userId)
+    assert list(guesses) == [gameId] and guesses[gameId][0] in range(10)
+
+
+# Many guesses are placed at once, with the status of each one (invalid ones don't stop the others)
+def test_bulk_guesses(client, make_user, make_pool, make_game):
+    userId, outsiderId = make_user(), make_user()
+    poolId = make_pool(userIds=[userId])
+    gameIds = [make_game() for _ in range(3)]
+    pastGameId = make_game(date=datetime.now() - timedelta(days=1))
+    url = f"/pools/{poolId}/guesses"
+
+    response = client.post(url, headers=auth_headers(userId), json={"guesses": [
+        {"gameId": gameIds[0], "firstTeamPoints": 1, "secondTeamPoints": 0},
+        {"gameId": gameIds[1], "firstTeamPoints": 2, "secondTeamPoints": 2},
+        {"gameId": gameIds[1], "firstTeamPoints": 3, "secondTeamPoints": 2},
+        {"gameId": gameIds[2], "firstTeamPoints": 1},
+        {"gameId": pastGameId, "firstTeamPoints": 1, "secondTeamPoints": 0},
+        {"gameId": "missing", "firstTeamPoints": 1, "secondTeamPoints": 0},
+    ]})
+
+    assert response.status_code == 200
+    assert [result['status'] for result in response.get_json()['results']] == [201, 201, 201, 400, 400, 404]
+    # The last guess sent for the same game is kept
+    assert get_guesses(poolId, userId) == {gameIds[0]: (1, 0), gameIds[1]: (3, 2)}
+
+    assert client.post(url, headers=auth_headers(outsiderId), json={"guesses": [
+        {"gameId": gameIds[0], "firstTeamPoints": 1, "secondTeamPoints": 0}]}).status_code == 403
+    assert client.post(url, headers=auth_headers(userId), json={"guesses": []}).status_code == 400
+    assert client.post(url, headers=auth_headers(userId), json={"guesses": [
+        {"gameId": gameIds[0], "firstTeamPoints": 1, "secondTeamPoints": 0}] * 101}).status_code == 400
+
+# Function to get the participant of a user on a pool
+def get_participant_id(poolId, userId):
+    return db.session.query(Participant.id).filter_by(poolId=poolId, userId=userId).scalar()
+
+# Databases without an upsert statement create the missing guesses and update the placed ones
+def test_generic_guesses_upsert(app, make_user, make_pool, make_game):
+    userId = make_user()
+    poolId, gameIds = make_pool(userIds=[userId]), [make_game(), make_game()]
+    participantId = get_participant_id(poolId, userId)
+    guesses_service.upsert_guesses(db.session, [{"participantId": participantId, "gameId": gameIds[0],
+                                                 "firstTeamPoints": 1, "secondTeamPoints": 0}])
+
+    guesses_service.upsert_guesses_generic(db.session, [
+        {"id": cuid.cuid(), "score": 0, "participantId": participantId, "gameId": gameId,
+         "firstTeamPoints": 3, "secondTeamPoints": i} for i, gameId in enumerate(gameIds)])
+    db.session.commit()
+
+    assert get_guesses(poolId, userId) == {gameIds[0]: (3, 0), gameIds[1]: (3, 1)}
+
+# Guesses inserted by a concurrent request after they were selected are updated instead
+def test_generic_guesses_upsert_conflict(app, make_user, make_pool, make_game, monkeypatch):
+    userId = make_user()
+    poolId, gameId = make_pool(userIds=[userId]), make_game()
+    participantId = get_participant_id(poolId, userId)
+    guesses_service.upsert_guesses(db.session, [{"participantId": participantId, "gameId": gameId,
+                                                 "firstTeamPoints": 1, "secondTeamPoints": 0}])
+    # The first selection misses the guess, as if it was inserted right after it
+    selections = []
+    getPlacedGuesses = guesses_service.get_placed_guesses
+    def get_placed_guesses(session, rows):
+        selections.append(rows)
+        return set() if len(selections) == 1 else getPlacedGuesses(session, rows)
+    monkeypatch.setattr(guesses_service, 'get_placed_guesses', get_placed_guesses)
+
+    guesses_service.upsert_guesses_generic(db.session, [{"id": cuid.cuid(), "score": 0, "participantId": participantId,
+                                                         "gameId": gameId, "firstTeamPoints": 4, "secondTeamPoints": 4}])
+    db.session.commit()
+
+    assert len(selections) == 2
+    assert get_guesses(poolId, userId) == {gameId: (4, 4)}
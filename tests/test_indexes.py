@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 25 10:21:56 2026
+
+@author: RenatoHenz
+
+Checks the query plans (EXPLAIN QUERY PLAN) of the hot lookups, asserting that each one of them is read
+through its index. Some sample rows are added so the planner has data to choose from.
+
+Refs:
+    * SQLite EXPLAIN QUERY PLAN: https://www.sqlite.org/eqp.html
+
+"""
+
+# Test dependencies
+import pytest
+
+# SQLAlchemy functions
+from sqlalchemy import select, insert, func, or_
+
+# Other dependencies
+from datetime import datetime, timedelta
+import cuid
+
+# Import the database object, the models and the rankings ordering
+from app import db
+from app.modules.pools.models import Pool, Participant, Game, Guess, Ranking
+from app.modules.pools.ranking import ranking_order
+from app.modules.users.models import User
+
+# Tables of the hot lookups
+pools = Pool.__table__
+participants = Participant.__table__
+guesses = Guess.__table__
+games = Game.__table__
+rankings = Ranking.__table__
+
+# Function to add the sample rows
+def add_sample_rows(connection, users=200, poolsCount=50, size=20, gamesCount=100, guessesCount=5):
+    now = datetime.now()
+    userIds = [cuid.cuid() for _ in range(users)]
+    connection.execute(insert(pools.metadata.tables['user']), [
+        {"id": id, "name": f"user{i}", "email": f"user{i}@test.local", "createdAt": now, "updatedAt": now}
+        for i, id in enumerate(userIds)])
+    poolIds = [cuid.cuid() for _ in range(poolsCount)]
+    connection.execute(insert(pools), [
+        {"id": id, "title": f"Pool {i}", "code": f"IX{i:04d}", "createdAt": now, "updatedAt": now}
+        for i, id in enumerate(poolIds)])
+    gameIds = [cuid.cuid() for _ in range(gamesCount)]
+    connection.execute(insert(games), [
+        {"id": id, "date": now + timedelta(hours=i), "firstTeamCountryCode": "BR",
+         "secondTeamCountryCode": "AR", "createdAt": now, "updatedAt": now}
+        for i, id in enumerate(gameIds)])
+    rows = [{"id": cuid.cuid(), "poolId": poolId, "userId": userIds[(p * size + i) % users],
+             "score": i, "createdAt": now, "updatedAt": now}
+            for p, poolId in enumerate(poolIds) for i in range(size)]
+    connection.execute(insert(participants), rows)
+    connection.execute(insert(guesses), [
+        {"id": cuid.cuid(), "participantId": row["id"], "gameId": gameId, "firstTeamPoints": 1,
+         "secondTeamPoints": 0, "score": 0, "createdAt": now, "updatedAt": now}
+        for row in rows for gameId in gameIds[:guessesCount]])
+    connection.execute(insert(rankings), [
+        {"participantId": row["id"], "poolId": row["poolId"], "userId": row["userId"], "position": i % size + 1,
+         "score": row["score"], "userName": "user", "createdAt": now, "updatedAt": now}
+        for i, row in enumerate(rows)])
+    return rows[0], gameIds[0], now
+
+# Function to get the steps of a statement plan reading a table
+# SQLite shows a description of each step ('SEARCH table USING INDEX name (...)' or 'SCAN table')
+def get_plan_steps(connection, statement, table):
+    # Expanding the 'IN' lists, so the statement can be explained as it's sent to the database
+    compiled = statement.compile(dialect=connection.dialect, compile_kwargs={"render_postcompile": True})
+    params = tuple(compiled.params[name] for name in compiled.positiontup) \
+        if compiled.positional else compiled.params
+    plan = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + str(compiled), params).fetchall()
+    return [row[3] for row in plan if f" {table} " in f"{row[3]} "]
+
+# Function to get the name of the index SQLite creates for a unique column
+def get_unique_index(connection, table, column):
+    for row in connection.exec_driver_sql(f'PRAGMA index_list("{table}")'):
+        columns = [info[2] for info in connection.exec_driver_sql(f'PRAGMA index_info("{row[1]}")')]
+        if row[2] and columns == [column]: return row[1]
+
+# Sample rows, rolled back at the end of each check
+@pytest.fixture
+def sample(app):
+    with db.engine.connect() as connection:
+        transaction = connection.begin()
+        participant, gameId, now = add_sample_rows(connection)
+        yield connection, participant, gameId, now
+        transaction.rollback()
+
+# Hot lookups, with the table which must be read through the given index
+# (the pools codes use the index SQLite creates for their unique column, given by the column name)
+LOOKUPS = {
+    "pool by code": (pools, 'code',
+        lambda participant, gameId, now: select(pools.c.id).where(pools.c.code == "IX0001")),
+    "taken pool codes": (pools, 'code',
+        lambda participant, gameId, now: select(pools.c.code).where(pools.c.code.in_(["IX0001", "IX0002", "ZZZZZZ"]))),
+    "participant by pool and user": (participants, 'uq_participant_poolId_userId',
+        lambda participant, gameId, now: select(participants.c.id).where(
+            participants.c.poolId == participant["poolId"], participants.c.userId == participant["userId"])),
+    "participants of a user": (participants, 'ix_participant_userId',
+        lambda participant, gameId, now: select(participants.c.poolId).where(
+            participants.c.userId == participant["userId"])),
+    "participants sorted by score": (participants, 'ix_participant_poolId_score',
+        lambda participant, gameId, now: select(participants.c.id,
+            func.row_number().over(partition_by=participants.c.poolId, order_by=ranking_order())).
+            where(participants.c.poolId == participant["poolId"])),
+    "guess by participant and game": (guesses, 'uq_guess_participantId_gameId',
+        lambda participant, gameId, now: select(guesses.c.id).where(
+            guesses.c.participantId == participant["id"], guesses.c.gameId == gameId)),
+    "guesses of a game": (guesses, 'ix_guess_gameId',
+        lambda participant, gameId, now: select(guesses.c.id, guesses.c.participantId).where(
+            guesses.c.gameId == gameId)),
+    "games since a date": (games, 'ix_game_date',
+        lambda participant, gameId, now: select(games.c.id).where(games.c.date >= now).
+            order_by(games.c.date.desc(), games.c.id.desc()).limit(20)),
+    "ranking positions": (rankings, 'ix_ranking_poolId_position',
+        lambda participant, gameId, now: select(rankings.c.participantId).where(
+            rankings.c.poolId == participant["poolId"], rankings.c.position.between(1, 10))),
+    "ranking after a cursor": (rankings, 'ix_ranking_poolId_score_participantId',
+        lambda participant, gameId, now: select(rankings.c.participantId).where(
+            rankings.c.poolId == participant["poolId"], rankings.c.score <= 10,
+            or_(rankings.c.score < 10, rankings.c.participantId > participant["id"])).
+            order_by(rankings.c.score.desc(), rankings.c.participantId.asc()).limit(100)),
+}
+
+# Each hot lookup must search its table through its index, instead of scanning it
+@pytest.mark.parametrize('name', LOOKUPS)
+def test_lookup_uses_index(sample, name):
+    connection, participant, gameId, now = sample
+    table, index, build = LOOKUPS[name]
+    if index in table.c: index = get_unique_index(connection, table.name, index)
+
+    steps = get_plan_steps(connection, build(participant, gameId, now), table.name)
+
+    assert steps, f"{name} doesn't read '{table.name}'"
+    assert all(f" INDEX {index} " in f"{step} " for step in steps), steps
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 25 18:31:14 2026
+
+@author: RenatoHenz
+"""
+
+# Other dependencies
+from datetime import datetime, timedelta
+import json
+
+# Test dependencies
+from sqlalchemy.dialects import mysql
+
+# Import the database object, the models and the jobs runner
+from app import db, events, push
+from app.modules.pools.models import Game
+from app.modules.jobs.models import Job, QUEUED, RUNNING, SUCCEEDED, FAILED
+from app.modules.jobs.runner import job_handler, enqueue_job, claim_job, recover_lost_jobs, run_job, run_worker
+
+# Shared test helpers
+from tests.conftest import auth_headers
+
+# Headers asking for the heavy work to run as a job
+ASYNC = {"Prefer": "respond-async"}
+
+# Job failing on every attempt
+@job_handler('test_failing')
+def run_failing(session, payload):
+    session.add(Game(datetime.now(), 'XX', 'YY'))
+    raise RuntimeError(payload['message'])
+
+# Function to run the due jobs, like the worker does (with the application context)
+def run_due_jobs(app):
+    with app.app_context(): run_worker(0, once=True, workerId='test')
+
+# Function to get a job, as shown to the users
+def get_job(client, userId, jobId):
+    return client.get(f'/jobs/{jobId}', headers=auth_headers(userId))
+
+# Results sent with 'Prefer: respond-async' are queued as a job, and set once the worker runs it
+def test_async_results(app, client, make_user, make_game):
+    userId = make_user()
+    gameId = make_game()
+
+    response = client.put(f'/games/{gameId}/result', json={'firstTeamPoints': 2, 'secondTeamPoints': 1},
+                          headers={**auth_headers(userId), **ASYNC})
+    assert response.status_code == 202
+    job = response.get_json()['job']
+    assert job['status'] == QUEUED
+    assert response.headers['Location'].endswith(f"/jobs/{job['id']}")
+    assert db.session.query(Game).get(gameId).firstTeamPoints is None
+
+    run_due_jobs(app)
+
+    job = get_job(client, userId, job['id']).get_json()['job']
+    assert (job['status'], job['attempts'], job['error']) == (SUCCEEDED, 1, None)
+    assert [game['id'] for game in job['result']['updatedGames']] == [gameId]
+    db.session.remove()
+    assert db.session.query(Game).get(gameId).firstTeamPoints == 2
+    assert get_job(client, make_user(), job['id']).status_code == 404
+
+# Requests sent again with the same idempotency key get the same job, and different ones are rejected
+# Keys are scoped by the user and the type of job
+def test_idempotency_key(client, make_user, make_game):
+    userIds = [make_user(), make_user()]
+    gameId = make_game()
+    send = lambda userId, key, points=1: client.put(f'/games/{gameId}/result',
+        json={'firstTeamPoints': points, 'secondTeamPoints': 1},
+        headers={**auth_headers(userId), **ASYNC, "Idempotency-Key": key})
+
+    first, again, other, otherUser = send(userIds[0], 'a'), send(userIds[0], 'a'), send(userIds[0], 'b'), send(userIds[1], 'a')
+    otherType = client.post('/games/import', json=[], headers={**auth_headers(userIds[0]), **ASYNC, "Idempotency-Key": 'a'})
+
+    jobIds = [response.get_json()['job']['id'] for response in (first, again, other, otherUser, otherType)]
+    assert jobIds[0] == jobIds[1]
+    assert len(set(jobIds)) == 4
+    assert send(userIds[0], 'a', points=2).status_code == 422
+    assert send(userIds[0], 'x' * 256).status_code == 400
+
+# Failing jobs are rolled back and retried (with backoff) until they have no attempts left
+def test_failing_job(app, make_user):
+    userId = make_user()
+    job, created = enqueue_job(db.session, 'test_failing', {"message": "Broken"}, userId=userId)
+    db.session.commit()
+    jobId = job.id
+
+    run_due_jobs(app)
+
+    db.session.remove()
+    job = db.session.query(Job).get(jobId)
+    assert created
+    assert (job.status, job.attempts, job.error) == (FAILED, job.maxAttempts, "RuntimeError: Broken")
+    assert db.session.query(Game).count() == 0
+
+# A job taken by another worker (after being considered lost) isn't finished by the first one, which rolls back its work
+def test_lost_job_isnt_finished(app, make_game):
+    gameId = make_game()
+    jobId = enqueue_job(db.session, 'games_results',
+                        {"results": [{"gameId": gameId, "firstTeamPoints": 1, "secondTeamPoints": 0}]})[0].id
+    db.session.commit()
+    job = claim_job(db.session, 'first')
+    db.session.query(Job).filter(Job.id == jobId).update({"lockedBy": 'second'})
+    db.session.commit()
+
+    with app.app_context(): assert run_job(job, 'first') is False
+
+    db.session.remove()
+    job = db.session.query(Job).get(jobId)
+    assert (job.status, job.lockedBy, job.result) == (RUNNING, 'second', None)
+    assert db.session.query(Game).get(gameId).firstTeamPoints is None
+
+# Running the worker once sends the Socket.IO events and push notifications of the jobs before returning
+def test_worker_once_drains_events_and_notifications(app, client, make_user, make_pool, make_game):
+    userId = make_user(fcmToken='drained')
+    poolId = make_pool(userIds=[userId])
+    gameId = make_game()
+    client.post(f'/pools/{poolId}/games/{gameId}/guesses', json={'firstTeamPoints': 1, 'secondTeamPoints': 0},
+                headers=auth_headers(userId))
+    client.put(f'/games/{gameId}/result', json={'firstTeamPoints': 1, 'secondTeamPoints': 0},
+               headers={**auth_headers(userId), **ASYNC})
+    processed = events.stats()['processed']
+
+    run_due_jobs(app)
+
+    assert events.stats()['processed'] > processed and events.stats()['queued'] == 0
+    assert [message.token for message in push.client.sent if message.token == 'drained'] == ['drained']
+
+# Payloads and results are stored as 'LONGTEXT' on MySQL, since 'TEXT' only holds 64KB
+def test_long_text_columns():
+    for column in (Job.__table__.c.payload, Job.__table__.c.result):
+        assert column.type.compile(dialect=mysql.dialect()) == 'LONGTEXT'
+
+# Unknown jobs fail without being retried
+def test_unknown_job(app):
+    job = enqueue_job(db.session, 'missing', {})[0]
+    db.session.commit()
+    jobId = job.id
+
+    run_due_jobs(app)
+
+    db.session.remove()
+    job = db.session.query(Job).get(jobId)
+    assert (job.status, job.attempts) == (FAILED, 1)
+
+# Jobs are claimed by a single worker, and the ones lost by their workers are queued again
+def test_claim_and_recover(app):
+    jobId = enqueue_job(db.session, 'test_failing', {"message": "Lost"})[0].id
+    db.session.commit()
+
+    assert claim_job(db.session, 'first').id == jobId
+    assert claim_job(db.session, 'second') is None
+    assert recover_lost_jobs(db.session) == 0
+
+    db.session.query(Job).filter(Job.id == jobId).update({"lockedAt": datetime.now() - timedelta(days=1)})
+    db.session.commit()
+    assert recover_lost_jobs(db.session) == 1
+    job = db.session.query(Job).get(jobId)
+    assert (job.status, job.lockedBy) == (QUEUED, None)
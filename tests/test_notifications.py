@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 25 18:02:37 2026
+
+@author: RenatoHenz
+"""
+
+# Other dependencies
+import time
+import os
+
+# Translations compiler
+from babel.messages.pofile import read_po
+from babel.messages.mofile import write_mo
+
+# Test dependencies
+import pytest
+
+# Import the application, the database object, Socket.IO and the push notifications dispatcher
+from app import app as application, db, socketio, push
+
+# Import the models, the push notifications services and the results notifications
+from app.modules.users.models import User
+from app.modules.pools.models import Game
+from app.modules.pools.notifications import queue_result_notifications, iter_result_recipients, notify_game_result
+from app.modules.users import controllers as users_controllers
+from app.migrations import upgrade_database
+from app.services.push_notification import PushDispatcher, FakePushClient, create_push_client
+
+# Shared test helpers
+from tests.conftest import auth_headers
+
+# Fixture to compile the portuguese translations, so the tests don't depend on 'pybabel compile'
+@pytest.fixture
+def translations(app, tmp_path, monkeypatch):
+    folder = tmp_path / 'pt' / 'LC_MESSAGES'
+    folder.mkdir(parents=True)
+    with open(os.path.join(application.root_path, 'translations', 'pt', 'LC_MESSAGES', 'messages.po'), 'rb') as po:
+        catalog = read_po(po)
+    with open(folder / 'messages.mo', 'wb') as mo: write_mo(mo, catalog)
+    monkeypatch.setitem(app.config, 'BABEL_TRANSLATION_DIRECTORIES', str(tmp_path))
+
+# Function to let the dispatcher workers run until the expected messages were handled (or a timeout)
+def wait_dispatcher(dispatcher, handled, timeout=2):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        stats = dispatcher.stats()
+        if stats['sent'] + stats['failed'] + stats['invalid'] >= handled: return stats
+        socketio.sleep(0.01)
+    return dispatcher.stats()
+
+# Messages are coalesced and sent in batches, invalid tokens are removed and temporary failures are retried
+def test_push_dispatcher(app):
+    removed = []
+    client = FakePushClient(invalid={'gone'}, unavailable=1)
+    dispatcher = PushDispatcher(app, socketio, client, on_invalid_tokens=removed.extend, workers=1, batch_size=2,
+                                backoff=0, interval=0.01)
+
+    dispatcher.enqueue(['a', 'b', 'gone'], "Title", "Body", {"type": "test"})
+    dispatcher.enqueue(['a', 'c'], "Title", "Body", {"type": "test"})
+    stats = wait_dispatcher(dispatcher, 4)
+
+    assert (stats['queued'], stats['coalesced'], stats['sent'], stats['invalid'], stats['failed']) == (4, 1, 3, 1, 0)
+    assert stats['retried'] == 2
+    assert sorted(message.token for message in client.sent) == ['a', 'b', 'c']
+    assert client.sent[0].data == (('type', 'test'),)
+    assert removed == ['gone']
+
+# Messages still failing after the retries are given up, and the failures are logged
+def test_push_dispatcher_gives_up(app, caplog):
+    dispatcher = PushDispatcher(app, socketio, FakePushClient(unavailable=10), workers=1, retries=2, backoff=0,
+                                interval=0.01)
+
+    dispatcher.enqueue(['a'], "Title", "Body")
+    stats = wait_dispatcher(dispatcher, 1)
+
+    assert (stats['batches'], stats['retried'], stats['failed'], stats['sent']) == (3, 2, 1, 0)
+    assert [record.levelname for record in caplog.records
+            if record.name == 'app.services.push_notification'] == ['WARNING'] * 3
+
+# Missing and unknown drivers disable the push notifications with a warning, instead of failing
+def test_create_push_client(monkeypatch, caplog):
+    assert isinstance(create_push_client('fake'), FakePushClient)
+    for driver in ('none', None, 'apns'): assert create_push_client(driver) is None
+    assert [record.levelname for record in caplog.records
+            if record.name == 'app.services.push_notification'] == ['WARNING'] * 3
+    monkeypatch.delenv('FCM_CREDS_JSON_FILE', raising=False)
+    with pytest.raises(ValueError, match='FCM_CREDS_JSON_FILE'): create_push_client('fcm')
+
+# Participants who placed a guess (with a token) are notified of their points and position, once the result is set
+def test_result_notifications(client, make_user, make_pool, make_game):
+    userIds = [make_user(fcmToken='first'), make_user(fcmToken='second'), make_user()]
+    poolId = make_pool("Friends", userIds=userIds)
+    gameId = make_game(firstTeamCountryCode='BR')
+    for userId, points in zip(userIds, (2, 0, 2)):
+        client.post(f'/pools/{poolId}/games/{gameId}/guesses', json={'firstTeamPoints': points, 'secondTeamPoints': 1},
+                    headers=auth_headers(userId))
+    sent = len(push.client.sent)
+
+    response = client.put(f'/games/{gameId}/result', json={'firstTeamPoints': 2, 'secondTeamPoints': 1},
+                          headers=auth_headers(userIds[0]))
+    assert response.status_code == 200
+    wait_dispatcher(push, push.stats()['sent'] + 2)
+
+    messages = {message.token: message for message in push.client.sent[sent:]}
+    assert set(messages) == {'first', 'second'}
+    assert messages['first'].title == "BR 2 x 1 AR"
+    assert messages['first'].body == "You scored 5 points on Friends and you're now #1"
+    assert messages['second'].body == "You scored 1 points on Friends and you're now #3"
+    assert dict(messages['second'].data) == {"type": "game_result", "gameId": gameId, "poolId": poolId}
+
+# Recipients are read page by page, and all of them are queued
+def test_result_recipients_pages(client, make_user, make_pool, make_game):
+    userIds = [make_user(fcmToken=f'token{i}') for i in range(5)]
+    poolId = make_pool(userIds=userIds)
+    gameId = make_game()
+    for userId in userIds:
+        client.post(f'/pools/{poolId}/games/{gameId}/guesses', json={'firstTeamPoints': 1, 'secondTeamPoints': 1},
+                    headers=auth_headers(userId))
+    game = db.session.query(Game).get(gameId)
+
+    result = queue_result_notifications(game, iter_result_recipients(db.session, gameId, pageSize=2))
+
+    assert (result['gameId'], result['notifications']) == (gameId, 5)
+
+# Invalid tokens are removed from the users
+def test_invalid_tokens_removed(app, make_user):
+    userId = make_user(fcmToken='gone')
+
+    User.remove_fcm_tokens(['gone'])
+
+    db.session.remove()
+    assert db.session.query(User).get(userId).fcmToken is None
+
+# Each recipient gets the texts in their own language, and the default one when it isn't known
+def test_result_notifications_locales(app, translations, make_user, make_pool, make_game, client):
+    userIds = [make_user(fcmToken='pt'), make_user(fcmToken='en'), make_user(fcmToken='default')]
+    for userId, locale in zip(userIds, ('pt', 'en', None)): db.session.query(User).get(userId).locale = locale
+    db.session.commit()
+    poolId = make_pool("Friends", userIds=userIds)
+    gameId = make_game(firstTeamCountryCode='BR')
+    for userId in userIds:
+        client.post(f'/pools/{poolId}/games/{gameId}/guesses', json={'firstTeamPoints': 2, 'secondTeamPoints': 1},
+                    headers=auth_headers(userId))
+    game = db.session.query(Game).get(gameId)
+    game.firstTeamPoints, game.secondTeamPoints = 2, 1
+    db.session.commit()
+    sent = len(push.client.sent)
+
+    result = notify_game_result(gameId)
+    assert result['notifications'] == 3
+    wait_dispatcher(push, push.stats()['sent'] + 3)
+
+    bodies = {message.token: message.body for message in push.client.sent[sent:]}
+    assert bodies['pt'].startswith("Você fez 0 pontos no Friends")
+    assert bodies['en'].startswith("You scored 0 points on Friends")
+    assert bodies['default'].startswith("You scored 0 points on Friends")
+
+# Notifying a missing game returns nothing
+def test_notify_missing_game(app):
+    assert notify_game_result(0) is None
+
+# Signing in keeps the user's language from the request
+def test_sign_in_keeps_locale(app, client, monkeypatch):
+    class GoogleResponse():
+        ok = True
+        text = '{"id": "google", "name": "User", "email": "user@test.local", "picture": null}'
+    monkeypatch.setattr(users_controllers.requests, 'get', lambda *args, **kwargs: GoogleResponse())
+
+    response = client.post('/users', json={'access_token': 'token'}, headers={'Accept-Language': 'pt-BR,pt;q=0.9'})
+    assert response.status_code == 200
+
+    db.session.remove()
+    assert db.session.query(User).filter(User.googleId == 'google').one().locale == 'pt'
+
+# Upgrading an existing database adds the users locale column
+def test_upgrade_adds_locale_column(app, make_user):
+    userId = make_user()
+    db.session.execute('ALTER TABLE user DROP COLUMN locale')
+    db.session.commit()
+
+    echoed = []
+    upgrade_database(echo=echoed.append)
+    assert "Added column user.locale" in echoed
+    db.session.remove()
+    assert db.session.query(User).get(userId).locale is None
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 25 09:40:27 2026
+
+@author: RenatoHenz
+"""
+
+# Test dependencies
+from tests.conftest import auth_headers
+
+# Import the database object, the models and the pools codes
+from app import db
+from app.modules.pools.models import Pool, Participant
+from app.modules.pools import models as pools_models
+from app.modules.pools.codes import CodeAllocator, CODE_ALPHABET, CODE_LENGTH
+
+# Function to count the statements of a user's pools listing
+def count_pools_statements(client, count_statements, userId):
+    headers = auth_headers(userId)
+    # Warming the user and token caches, so only the listing queries are counted
+    client.get('/pools', headers=headers)
+    with count_statements() as statements:
+        response = client.get('/pools', headers=headers)
+    assert response.status_code == 200
+    return len(statements), response.get_json()['pools']
+
+# The pools listing takes the same number of queries, no matter how many pools the user has joined
+def test_pools_listing_query_count_doesnt_grow(client, make_user, make_pool, count_statements):
+    single, others = make_user(), [make_user() for _ in range(5)]
+    many = make_user()
+    make_pool(userIds=[single] + others)
+    for i in range(8):
+        make_pool(title=f"Pool {i}", userIds=[many] + [userId for userId in others[:i % 4 + 1]])
+
+    singleCount, singlePools = count_pools_statements(client, count_statements, single)
+    manyCount, manyPools = count_pools_statements(client, count_statements, many)
+
+    assert len(singlePools) == 1 and len(manyPools) == 8
+    assert singleCount == manyCount
+
+# The pools summaries bring the participants count, the first participants and the owner
+def test_pools_listing_summaries(client, make_user, make_pool):
+    userIds = [make_user(avatarUrl=f"http://avatar/{i}") for i in range(6)]
+    poolId = make_pool(userIds=userIds)
+
+    pools = client.get('/pools', headers=auth_headers(userIds[0])).get_json()['pools']
+
+    assert [pool['id'] for pool in pools] == [poolId]
+    assert pools[0]['_count'] == {"participants": 6}
+    assert [participant['user']['avatarUrl'] for participant in pools[0]['participants']] == \
+        [f"http://avatar/{i}" for i in range(4)]
+    assert pools[0]['owner']['id'] == userIds[0]
+
+# Pools are created with a free code, and users join them with it (in any case), only once
+def test_create_and_join_pool(client, make_user):
+    ownerId, userId = make_user(), make_user()
+
+    response = client.post('/pools', headers=auth_headers(ownerId), json={"title": "Friends"})
+    assert response.status_code == 201
+    code = response.get_json()['code']
+    assert len(code) == CODE_LENGTH and set(code) <= set(CODE_ALPHABET)
+
+    assert client.post('/pools/join', headers=auth_headers(userId), json={"code": f" {code.lower()} "}).status_code == 201
+    assert client.post('/pools/join', headers=auth_headers(userId), json={"code": code}).status_code == 400
+    assert client.post('/pools/join', headers=auth_headers(userId), json={"code": "ZZZZZZ"}).status_code == 404
+    pools = client.get('/pools', headers=auth_headers(userId)).get_json()['pools']
+    assert [pool['code'] for pool in pools] == [code]
+    assert pools[0]['ownerId'] == ownerId and pools[0]['_count'] == {"participants": 2}
+
+# Joining a pool only reports an existing participant when the user has really joined it
+def test_join_pool_other_integrity_errors(client, make_user, monkeypatch):
+    ownerId, userId = make_user(), make_user()
+    code = client.post('/pools', headers=auth_headers(ownerId), json={"title": "Friends"}).get_json()['code']
+    # The new participant gets the ID of the owner's one, breaking the primary key instead of the (pool, user) index
+    ownerParticipantId = db.session.query(Participant.id).filter_by(userId=ownerId).scalar()
+    monkeypatch.setattr(pools_models.cuid, 'cuid', lambda: ownerParticipantId)
+
+    response = client.post('/pools/join', headers=auth_headers(userId), json={"code": code})
+
+    assert response.status_code == 500
+    assert response.get_json()['message'] != "You've already joined this pool"
+
+# The allocator never hands out a code which is taken (or already handed out)
+def test_code_allocator_skips_taken_codes(app):
+    allocator = CodeAllocator(batch_size=20)
+    taken = allocator.take_many(db.session, 30)
+    for code in taken: db.session.add(Pool("Taken", code))
+    db.session.commit()
+
+    codes = allocator.take_many(db.session, 200)
+
+    assert len(set(codes)) == 200
+    assert not set(codes) & set(taken)
+    assert allocator.stats()['allocated'] == 230
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 25 14:37:50 2026
+
+@author: RenatoHenz
+"""
+
+# Other dependencies
+import json
+import random
+
+# Test dependencies
+import pytest
+from tests.conftest import auth_headers
+
+# Import the database object, the models and the rankings
+from app import db
+from app.modules.pools.models import Participant, Ranking
+from app.modules.pools.ranking import ranking_order, update_participants_rankings, update_pools_rankings, \
+    get_pool_with_ranking_size
+from app.migrations import upgrade_database
+
+# Function to get a pool ranking as stored, as a list of (user ID, score, position)
+def get_stored_ranking(poolId):
+    rows = db.session.query(Ranking.userId, Ranking.score, Ranking.position).\
+        filter(Ranking.poolId == poolId).order_by(Ranking.position).all()
+    db.session.commit()
+    return [tuple(row) for row in rows]
+
+# Function to get a pool ranking calculated from the participants scores
+def get_expected_ranking(poolId):
+    rows = db.session.query(Participant.userId, Participant.score).\
+        filter(Participant.poolId == poolId).order_by(*ranking_order()).all()
+    db.session.commit()
+    return [(userId, score, position) for position, (userId, score) in enumerate(rows, start=1)]
+
+# Pool with participants who guessed a game, and a function to set its result
+@pytest.fixture
+def ranked_pool(client, make_user, make_pool, make_game):
+    userIds = [make_user(name=f"Player {i}") for i in range(6)]
+    poolId = make_pool(userIds=userIds)
+    gameId = make_game()
+    for userId, (first, second) in zip(userIds, [(0, 0), (2, 1), (1, 1), (3, 1), (2, 1), (0, 2)]):
+        client.post(f"/pools/{poolId}/games/{gameId}/guesses", headers=auth_headers(userId),
+                    json={"firstTeamPoints": first, "secondTeamPoints": second})
+    def set_result(first, second):
+        response = client.put(f"/games/{gameId}/result", headers=auth_headers(userIds[0]),
+                              json={"firstTeamPoints": first, "secondTeamPoints": second})
+        assert response.status_code == 200
+    return poolId, userIds, set_result
+
+# Participants join at the end of the ranking, and results keep it sorted by score
+def test_ranking_follows_the_results(client, make_user, ranked_pool):
+    poolId, userIds, set_result = ranked_pool
+    assert [position for _, _, position in get_stored_ranking(poolId)] == list(range(1, 7))
+
+    set_result(2, 1)
+    assert get_stored_ranking(poolId) == get_expected_ranking(poolId)
+    assert {userId for userId, _, _ in get_stored_ranking(poolId)[:2]} == {userIds[1], userIds[4]}
+    assert [score for _, score, _ in get_stored_ranking(poolId)] == [5, 5, 3, 1, 0, 0]
+
+    # Changing the result moves the participants
+    set_result(0, 0)
+    assert get_stored_ranking(poolId) == get_expected_ranking(poolId)
+    assert get_stored_ranking(poolId)[0][:2] == (userIds[0], 5)
+
+    # New participants join at the end
+    newUserId = make_user()
+    code = client.get(f"/pools/{poolId}", headers=auth_headers(userIds[0])).get_json()['pool']['code']
+    assert client.post('/pools/join', headers=auth_headers(newUserId), json={"code": code}).status_code == 201
+    assert get_stored_ranking(poolId)[-1] == (newUserId, 0, 7)
+
+# The ranking route brings the whole ranking, the top positions, a page or the positions around the user
+def test_ranking_route_filters(client, ranked_pool):
+    poolId, userIds, set_result = ranked_pool
+    set_result(2, 1)
+    headers = auth_headers(userIds[3])
+    url = f"/pools/{poolId}/ranking"
+
+    # Function to get the positions returned by the route
+    def get_positions(query=''):
+        response = client.get(url + query, headers=headers)
+        assert response.status_code == 200
+        return [participant['position'] for participant in response.get_json()['pool']['participants']]
+
+    whole = client.get(url, headers=headers).get_json()['pool']
+    assert whole['_count'] == {"participants": 6}
+    assert [participant['score'] for participant in whole['participants']] == [5, 5, 3, 1, 0, 0]
+    assert get_positions('?top=2') == [1, 2]
+    assert get_positions('?page=2&per_page=4') == [5, 6]
+    # The user (with 3 points) is on the 3rd position
+    assert get_positions('?around=me&k=1') == [2, 3, 4]
+    assert client.get(url + '?top=0', headers=headers).status_code == 400
+    assert client.get(url + '?page=1', headers=headers).status_code == 400
+    assert client.get(f"/pools/missing/ranking", headers=headers).status_code == 404
+
+# The export streams the whole ranking (as NDJSON or JSON), on the same order as the positions
+def test_ranking_export(client, ranked_pool):
+    poolId, userIds, set_result = ranked_pool
+    set_result(2, 1)
+    headers = auth_headers(userIds[0])
+    url = f"/pools/{poolId}/ranking/export"
+
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200 and response.mimetype == 'application/x-ndjson'
+    rows = [json.loads(line) for line in response.get_data().splitlines()]
+    assert [row['position'] for row in rows] == list(range(1, 7))
+    assert [row['score'] for row in rows] == [5, 5, 3, 1, 0, 0]
+
+    data = client.get(url + '?format=json', headers=headers).get_json()
+    assert data['pool']['participants'] == rows
+    assert data['pool']['_count'] == {"participants": 6}
+    assert data['next'] is None
+
+# The export can be paged with the cursor of each page, without repeating or skipping participants
+def test_ranking_export_cursor(client, ranked_pool):
+    poolId, userIds, set_result = ranked_pool
+    set_result(2, 1)
+    headers = auth_headers(userIds[0])
+    url = f"/pools/{poolId}/ranking/export?format=json&limit=4"
+
+    first = client.get(url, headers=headers).get_json()
+    cursor = first['next']
+    assert len(first['pool']['participants']) == 4 and cursor is not None
+    second = client.get(f"{url}&after_score={cursor['after_score']}&after_id={cursor['after_id']}",
+                        headers=headers).get_json()
+    assert [row['position'] for row in first['pool']['participants'] + second['pool']['participants']] == \
+        list(range(1, 7))
+    assert second['next'] is None
+    assert client.get(url + '&after_score=1', headers=headers).status_code == 400
+    assert client.get(f"/pools/{poolId}/ranking/export?format=xml", headers=headers).status_code == 400
+
+# Only the positions within the scores band of the changed participants are updated, matching the whole ranking
+def test_incremental_rankings(make_user, make_pool):
+    userIds = [make_user() for i in range(12)]
+    poolId = make_pool(userIds=userIds)
+    participants = db.session.query(Participant).filter(Participant.poolId == poolId).order_by(Participant.id).all()
+    randomizer = random.Random(5)
+
+    userIdsById = {participant.id: participant.userId for participant in participants}
+
+    for round in range(20):
+        before = set(get_stored_ranking(poolId))
+        changed = randomizer.sample(participants, randomizer.randint(1, 4))
+        for participant in changed: participant.score = randomizer.randint(0, 10)
+        db.session.flush()
+        changes = update_participants_rankings(db.session, [participant.id for participant in changed])
+        db.session.commit()
+
+        assert get_stored_ranking(poolId) == get_expected_ranking(poolId)
+        assert update_pools_rankings(db.session, [poolId]) == []
+        # Only the rows which changed are written
+        assert {(userIdsById[change['participantId']], change['score'], change['position']) for change in changes} == \
+            set(get_stored_ranking(poolId)) - before
+
+# Participants changed without being passed are caught by the stored rows, updating the whole ranking
+def test_incremental_rankings_fallback(make_user, make_pool):
+    userIds = [make_user() for i in range(4)]
+    poolId = make_pool(userIds=userIds)
+    participants = db.session.query(Participant).filter(Participant.poolId == poolId).order_by(Participant.id).all()
+    participants[0].score, participants[1].score = 3, 4
+    db.session.flush()
+
+    update_participants_rankings(db.session, [participants[0].id])
+    db.session.commit()
+
+    assert get_stored_ranking(poolId) == get_expected_ranking(poolId)
+
+# Positions are never repeated or skipped, so the last one is the number of participants
+def test_joined_positions(client, make_user, make_pool):
+    ownerId = make_user()
+    poolId = make_pool(userIds=[ownerId])
+    code = client.get(f"/pools/{poolId}", headers=auth_headers(ownerId)).get_json()['pool']['code']
+
+    for i in range(5): client.post('/pools/join', headers=auth_headers(make_user()), json={"code": code})
+
+    assert [position for _, _, position in get_stored_ranking(poolId)] == list(range(1, 7))
+    assert get_pool_with_ranking_size(poolId).size == 6
+
+# Reading a ranking never writes, and the missing rankings are built by the database upgrade
+def test_missing_rankings_are_built_on_upgrade(client, make_user, make_pool, count_statements):
+    userIds = [make_user(), make_user()]
+    poolId = make_pool(userIds=[userIds[0]])
+    db.session.add(Participant(userIds[1], poolId))
+    db.session.commit()
+    db.session.execute(Ranking.__table__.delete())
+    db.session.commit()
+    url = f"/pools/{poolId}/ranking"
+
+    with count_statements() as statements: response = client.get(url, headers=auth_headers(userIds[0]))
+    assert response.get_json()['pool']['_count'] == {"participants": 0}
+    assert not [statement for statement in statements if statement.startswith(('INSERT', 'UPDATE', 'DELETE'))]
+
+    echoed = []
+    upgrade_database(echo=echoed.append)
+    assert "Built the rankings of 1 pool(s)" in echoed
+    response = client.get(url, headers=auth_headers(userIds[0]))
+    assert response.get_json()['pool']['_count'] == {"participants": 2}
+    upgrade_database(echo=echoed.append)
+    assert echoed.count("Built the rankings of 1 pool(s)") == 1
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 26 09:12:40 2026
+
+@author: RenatoHenz
+"""
+
+# Test dependencies
+import pytest
+
+# Flask and SQLAlchemy dependencies
+from flask import Flask, g
+from sqlalchemy import Table, Column, String, select, insert
+
+# Other dependencies
+import time
+
+# Import the read replicas services and the caches
+from app.services import replicas
+from app.services.replicas import RoutingSQLAlchemy, check_sticky_cache, stick_to_primary
+from app.services.cache import RedisCache
+from config import READ_YOUR_WRITES_SECONDS
+
+# Define a local stand-in for the Redis client, shared like a Redis server would be, with a clock moved by the tests
+class FakeRedis():
+    def __init__(self):
+        self.data = {}
+        self.now = time.time()
+
+    def get(self, key):
+        value, expiration = self.data.get(key, (None, None))
+        return value if expiration is None or expiration > self.now else None
+
+    def set(self, key, value, ex=None):
+        self.data[key] = (value, self.now + ex if ex is not None else None)
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def scan_iter(self, match):
+        return [key for key in list(self.data) if key.startswith(match.rstrip('*'))]
+
+# Fixture with a database on a primary and a replica SQLite files, each with a row naming it, and
+# a shared stickiness cache. Returns the application, its database object, the marks table and the cache client
+@pytest.fixture
+def routed(tmp_path, monkeypatch):
+    primaryUri, replicaUri = (f"sqlite:///{tmp_path / name}.db" for name in ('primary', 'replica'))
+    app = Flask('replicas')
+    app.config.update(SQLALCHEMY_DATABASE_URI=primaryUri, SQLALCHEMY_REPLICA_URIS=[replicaUri],
+                      SQLALCHEMY_TRACK_MODIFICATIONS=False)
+    db = RoutingSQLAlchemy(app)
+    marks = Table('mark', db.metadata, Column('name', String(16)))
+    with app.app_context():
+        for engine, name in ((db.engine, 'primary'), (db.replicas[0], 'replica')):
+            db.metadata.create_all(engine)
+            with engine.begin() as connection: connection.execute(insert(marks), {"name": name})
+    client = FakeRedis()
+    monkeypatch.setattr(replicas, 'SQLALCHEMY_REPLICA_URIS', [replicaUri])
+    monkeypatch.setattr(replicas, 'sticky_users', RedisCache('sticky-user', client=client, ttl=READ_YOUR_WRITES_SECONDS))
+    yield app, db, marks, client
+    for engine in [db.engine] + db.replicas: engine.dispose()
+
+# Function to read the names of the marks on the database a request of a user is routed to
+def read_marks(app, db, marks, method='GET', userId=None):
+    with app.test_request_context('/', method=method):
+        g.userId = userId
+        try: return [name for (name,) in db.session.execute(select(marks.c.name))]
+        finally: db.session.remove()
+
+# Replicas require a cache shared by the workers, where the users reading from the primary database are kept
+def test_replicas_require_shared_cache():
+    replicas = ['sqlite:///replica.db']
+
+    for cacheUrl in ('memory://', None):
+        with pytest.raises(ValueError, match='CACHE_URL'): check_sticky_cache(replicas, cacheUrl)
+
+    check_sticky_cache(replicas, 'redis://localhost:6379/1')
+    check_sticky_cache([], 'memory://')
+
+# Safe requests read from the replica, while the other requests read and write on the primary database
+def test_requests_routing(routed):
+    app, db, marks, _ = routed
+
+    assert read_marks(app, db, marks, userId='reader') == ['replica']
+    assert read_marks(app, db, marks, method='POST', userId='writer') == ['primary']
+    with app.test_request_context('/', method='POST'):
+        db.session.execute(insert(marks), {"name": "written"})
+        db.session.commit()
+        db.session.remove()
+    assert read_marks(app, db, marks, method='POST') == ['primary', 'written']
+    assert read_marks(app, db, marks) == ['replica']
+
+# Users who have just written something read from the primary database during the stickiness window
+def test_users_read_their_writes(routed):
+    app, db, marks, client = routed
+
+    with app.test_request_context('/', method='POST'): stick_to_primary('writer')
+
+    assert read_marks(app, db, marks, userId='writer') == ['primary']
+    assert read_marks(app, db, marks, userId='reader') == ['replica']
+    client.now += READ_YOUR_WRITES_SECONDS + 1
+    assert read_marks(app, db, marks, userId='writer') == ['replica']
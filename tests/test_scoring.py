@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 25 14:02:18 2026
+
+@author: RenatoHenz
+"""
+
+# Other dependencies
+from collections import namedtuple
+import itertools
+
+# Test dependencies
+import pytest
+from tests.conftest import auth_headers
+
+# Import the database object, the models and the scoring engine
+from app import db
+from app.modules.pools.models import Participant, Guess
+from app.modules.pools.scoring import calculate_guess_score, score_guesses, DEFAULT_SCORING_RULES
+
+# Points of a guess or a game result
+Points = namedtuple('Points', ['firstTeamPoints', 'secondTeamPoints'])
+
+# Every guess and result with up to 3 points for each team
+COMBINATIONS = list(itertools.product(range(4), repeat=4))
+
+# The vectorized scorer gives the same scores as the single guess one, with the default and custom rules
+@pytest.mark.parametrize('rules', [None, {'exact': 10, 'draw': 4, 'winner': 3, 'oneSide': 0}, {'exact': 7}])
+def test_vectorized_scores_match_single_guess_scores(rules):
+    guesses = [Points(a, b) for a, b, _, _ in COMBINATIONS]
+    games = [Points(c, d) for _, _, c, d in COMBINATIONS]
+
+    scores = score_guesses([guess.firstTeamPoints for guess in guesses], [guess.secondTeamPoints for guess in guesses],
+                           [game.firstTeamPoints for game in games], [game.secondTeamPoints for game in games], rules)
+
+    assert scores.tolist() == [calculate_guess_score(guess, game, rules) for guess, game in zip(guesses, games)]
+
+# Guesses score nothing while their game has no result
+def test_games_without_result_score_zero():
+    assert score_guesses([1, 2], [1, 0], None, None).tolist() == [0, 0]
+    assert calculate_guess_score(Points(1, 1), Points(None, None)) == 0
+
+# Each kind of hit gives its points, and an exact guess replaces the others
+def test_scoring_rules():
+    rules = DEFAULT_SCORING_RULES
+    assert calculate_guess_score(Points(2, 1), Points(2, 1)) == rules['exact']
+    assert calculate_guess_score(Points(1, 1), Points(2, 2)) == rules['draw']
+    assert calculate_guess_score(Points(3, 0), Points(1, 0)) == rules['winner'] + rules['oneSide']
+    assert calculate_guess_score(Points(0, 2), Points(0, 0)) == rules['oneSide']
+    assert calculate_guess_score(Points(0, 2), Points(3, 1)) == 0
+
+# Setting a game result rescores its guesses and the participants totals, and setting it again
+# only applies the difference (without touching the guesses of other games)
+def test_game_result_rescores_guesses(client, make_user, make_pool, make_game):
+    userIds = [make_user() for _ in range(3)]
+    poolId = make_pool(userIds=userIds)
+    gameId, otherGameId = make_game(), make_game()
+    for userId, (first, second) in zip(userIds, [(2, 1), (1, 1), (0, 3)]):
+        for id in (gameId, otherGameId):
+            client.post(f"/pools/{poolId}/games/{id}/guesses", headers=auth_headers(userId),
+                        json={"firstTeamPoints": first, "secondTeamPoints": second})
+
+    # Function to get the participants totals, on the same order as the users
+    def get_totals():
+        totals = dict(db.session.query(Participant.userId, Participant.score))
+        db.session.commit()
+        return [totals[userId] for userId in userIds]
+
+    response = client.put(f"/games/{gameId}/result", headers=auth_headers(userIds[0]),
+                          json={"firstTeamPoints": 2, "secondTeamPoints": 1})
+    assert response.status_code == 200
+    assert response.get_json()['updatedGame']['firstTeamPoints'] == 2
+    assert get_totals() == [5, 1, 0]
+
+    client.put(f"/games/{gameId}/result", headers=auth_headers(userIds[0]),
+               json={"firstTeamPoints": 1, "secondTeamPoints": 1})
+    assert get_totals() == [1, 5, 0]
+    assert {score for (score,) in db.session.query(Guess.score).filter(Guess.gameId == otherGameId)} == {0}
+
+# Results of missing games are reported as not found
+def test_game_result_of_missing_game(client, make_user):
+    response = client.put("/games/missing/result", headers=auth_headers(make_user()),
+                          json={"firstTeamPoints": 1, "secondTeamPoints": 0})
+    assert response.status_code == 404
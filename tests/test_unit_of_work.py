@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 25 17:05:48 2026
+
+@author: RenatoHenz
+"""
+
+# Test dependencies
+import pytest
+from sqlalchemy import event
+
+# Import the database object, the models and the unit of work
+from app import db
+from app.modules.users.models import User
+from app.modules.pools.models import Pool
+from app.unit_of_work import after_commit, commit, commit_request, unit_of_work
+
+# Shared test helpers
+from tests.conftest import auth_headers
+
+# Function to count the users on a new session
+def count_users():
+    return db.session.query(User).count()
+
+# The block is committed when it ends, running the functions waiting for the commit
+def test_unit_of_work_commits(app):
+    called = []
+    with unit_of_work() as session:
+        session.add(User("Committed", "committed@test.local"))
+        after_commit(called.append, 'committed')
+        assert called == []
+
+    assert called == ['committed']
+    db.session.remove()
+    assert count_users() == 1
+
+# The block is rolled back when something goes wrong, and the functions waiting for the commit don't run
+def test_unit_of_work_rolls_back(app):
+    called = []
+    with pytest.raises(RuntimeError):
+        with unit_of_work() as session:
+            session.add(User("Rolled back", "rolledback@test.local"))
+            session.flush()
+            after_commit(called.append, 'committed')
+            raise RuntimeError()
+
+    assert called == []
+    db.session.remove()
+    assert count_users() == 0
+
+# Sessions without writes aren't committed
+def test_read_only_commit(app, count_statements):
+    count_users()
+    with count_statements() as statements: assert commit() is False
+    assert statements == []
+
+# Requests are committed once, after the response
+def test_request_commit(client, make_user):
+    userId = make_user()
+    commits = []
+    listener = lambda connection: commits.append(connection)
+    event.listen(db.engine, 'commit', listener)
+    try: response = client.post('/pools', json={'title': "Committed"}, headers=auth_headers(userId))
+    finally: event.remove(db.engine, 'commit', listener)
+
+    assert response.status_code == 201
+    assert len(commits) == 1
+    db.session.remove()
+    assert db.session.query(Pool).filter(Pool.title == "Committed").count() == 1
+
+# Failed requests are rolled back, even after they have written something
+def test_failed_request_rollback(app):
+    with app.test_request_context():
+        db.session.add(User("Rolled back", "rolledback@test.local"))
+        db.session.flush()
+        after_commit(pytest.fail, "The request wasn't rolled back")
+        response = commit_request(app.response_class(status=400))
+    assert response.status_code == 400
+    db.session.remove()
+    assert count_users() == 0
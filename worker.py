@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 23 11:48:05 2026
+
+@author: RenatoHenz
+
+Jobs worker, running the heavy work queued by the routes (like setting games results and importing
+games schedules, see 'app.modules.jobs'). Many workers can run at once, on any machine using the same
+database, since each job is claimed by a single worker. Once a job is done, its cached responses are
+invalidated and its Socket.IO events are sent, so the web processes must share the 'CACHE_URL' and
+'SOCKETIO_MESSAGE_QUEUE' with it:
+
+    (env) $ python worker.py [--once]
+
+"""
+
+# Importing config data
+from config import JOBS_INTERVAL, CACHE_URL, SOCKETIO_MESSAGE_QUEUE
+
+# Making the standard library cooperative with eventlet when using the Socket.IO message queue,
+# so its client (like Redis) doesn't block the worker
+if SOCKETIO_MESSAGE_QUEUE:
+    import eventlet
+    eventlet.monkey_patch()
+
+# Other dependencies
+import sys
+
+# Importing the app and the jobs runner
+from app import app
+from app.modules.jobs.runner import run_worker, get_worker_id
+
+# Running the worker
+if __name__ == "__main__":
+    # Without shared ones, the web processes keep their cached responses and don't get the events
+    if CACHE_URL.startswith('memory://'):
+        print("Warning: 'CACHE_URL' isn't shared, so the web processes cached responses won't be invalidated")
+    if not SOCKETIO_MESSAGE_QUEUE:
+        print("Warning: 'SOCKETIO_MESSAGE_QUEUE' isn't set, so the Socket.IO events won't reach the clients")
+    workerId = get_worker_id()
+    print(f"Worker {workerId} waiting for jobs")
+    with app.app_context():
+        try: run_worker(JOBS_INTERVAL, once='--once' in sys.argv[1:], workerId=workerId)
+        except KeyboardInterrupt: pass
@@ -6,7 +6,13 @@ Created on Thu Aug 19 11:29:11 2021
 """
 
 # Importing config data
-from config import PORT, HOST
+from config import PORT, HOST, SOCKETIO_MESSAGE_QUEUE
+
+# Making the standard library cooperative with eventlet when using the Socket.IO message queue,
+# so its client (like Redis) doesn't block the server (gunicorn's eventlet workers already do it)
+if SOCKETIO_MESSAGE_QUEUE:
+    import eventlet
+    eventlet.monkey_patch()
 # Importing the app
 from app import app, socketio
 